@@ -0,0 +1,5 @@
+"""
+Benchmarks of PDF Toolkit. Every `bench_*` module can be run directly, e.g.:
+
+    python -m benchmarks.bench_scheduler --help
+"""
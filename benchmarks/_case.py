@@ -0,0 +1,95 @@
+"""
+Run a single benchmark case headless and print its measurements as a json line. It is meant to be started in a fresh
+process by `benchmarks.run`, so that the peak RSS and the CPU time of a case are not mixed with the other cases:
+
+    python -m benchmarks._case '{"tool": "pdf2images", "pages": 32, "kwargs": {...}}'
+"""
+
+import json
+import os
+import sys
+import time
+
+RESULT_PREFIX = "BENCHMARK_RESULT "
+
+
+def _run_tool(tool: str, kwargs: dict) -> dict | None:
+    # return the summary of the run, if the tool gives one
+    if tool == "pdf2images":
+        from pdftoolkit.tools.pdf2images._api import pdf2images
+        from pdftoolkit.tools.pdf2images._constants import DuplicatePolicy, DedupMode
+
+        # enums are passed by value in json
+        if "duplicate_policy" in kwargs:
+            kwargs["duplicate_policy"] = DuplicatePolicy(kwargs["duplicate_policy"])
+        if "dedup" in kwargs:
+            kwargs["dedup"] = DedupMode(kwargs["dedup"])
+        return pdf2images(**kwargs)
+    elif tool == "images2pdf":
+        from pdftoolkit.tools.images2pdf._impl import images2pdf
+
+        return images2pdf(**kwargs)
+    elif tool == "pdfmerger":
+        from pdftoolkit.tools.pdfmerger._impl import pdfmerger
+
+        return pdfmerger(**kwargs)
+    else:
+        raise ValueError(f"unknown tool: {tool}")
+
+
+def _peak_rss_mb(maxrss: int) -> float:
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    if sys.platform == "darwin":
+        return maxrss / 1024 / 1024
+    return maxrss / 1024
+
+
+def _usage() -> dict:
+    """CPU time and peak RSS of this process and of its (terminated) children, such as the worker processes."""
+    try:
+        import resource
+    except ImportError:
+        # Windows
+        times = os.times()
+        return {
+            "cpu_seconds": times.user + times.system,
+            "peak_rss_mb": None,
+            "children_peak_rss_mb": None,
+        }
+    usage_self = resource.getrusage(resource.RUSAGE_SELF)
+    usage_children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return {
+        "cpu_seconds": usage_self.ru_utime
+        + usage_self.ru_stime
+        + usage_children.ru_utime
+        + usage_children.ru_stime,
+        "peak_rss_mb": _peak_rss_mb(usage_self.ru_maxrss),
+        "children_peak_rss_mb": _peak_rss_mb(usage_children.ru_maxrss),
+    }
+
+
+def main():
+    case = json.loads(sys.argv[1])
+    # import everything before the clock starts, only the work of the tool is measured
+    from pdftoolkit.tools.commons.worker_pool import shutdown_worker_pool
+
+    cpu_start = _usage()["cpu_seconds"]
+    time_start = time.perf_counter()
+    summary = _run_tool(case["tool"], case["kwargs"])
+    wall_seconds = time.perf_counter() - time_start
+    # the workers are reaped here, their usage becomes visible in RUSAGE_CHILDREN
+    shutdown_worker_pool()
+    usage = _usage()
+    usage["cpu_seconds"] -= cpu_start
+    result = {
+        "wall_seconds": wall_seconds,
+        "pages_per_second": case["pages"] / wall_seconds if wall_seconds else None,
+        **usage,
+        # statistics of each stage (open, rasterize, encode...) reported by the tool
+        "stages": (summary or {}).get("stages", None),
+    }
+    print(RESULT_PREFIX + json.dumps(result), flush=True)
+
+
+if __name__ == "__main__":
+    main()
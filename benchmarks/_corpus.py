@@ -0,0 +1,141 @@
+"""
+Helpers to generate synthetic documents for the benchmarks. Everything is generated from fixed seeds, so the same
+corpus is produced on every run.
+"""
+
+import random
+from os import PathLike
+from pathlib import Path
+
+import pymupdf
+
+A4_WIDTH = 595
+A4_HEIGHT = 842
+
+
+def _draw_text_page(page: pymupdf.Page, lines: int = 50):
+    text = "\n".join(
+        f"{i:03d} The quick brown fox jumps over the lazy dog." for i in range(lines)
+    )
+    page.insert_text((36, 48), text, fontsize=10)
+
+
+def _draw_vector_page(page: pymupdf.Page, shapes: int, seed: int):
+    rnd = random.Random(seed)
+    shape = page.new_shape()
+    for _ in range(shapes):
+        x = rnd.uniform(0, page.rect.width)
+        y = rnd.uniform(0, page.rect.height)
+        shape.draw_circle((x, y), rnd.uniform(2, 40))
+        shape.finish(
+            color=(rnd.random(), rnd.random(), rnd.random()),
+            fill=(rnd.random(), rnd.random(), rnd.random()),
+            fill_opacity=0.5,
+        )
+    shape.commit()
+
+
+def make_mixed_pdf(
+    filepath: PathLike | str,
+    page_count: int = 64,
+    heavy_ratio: float = 0.25,
+    heavy_shapes: int = 2000,
+) -> list[int]:
+    """
+    Make a PDF where the first `heavy_ratio` of the pages are expensive vector pages (like the scanned or drawn parts
+    of a real document) and the rest are cheap text pages. Return the indexes of the heavy pages.
+    """
+    doc = pymupdf.open()
+    heavy_count = int(page_count * heavy_ratio)
+    for i in range(page_count):
+        page = doc.new_page(width=A4_WIDTH, height=A4_HEIGHT)
+        if i < heavy_count:
+            _draw_vector_page(page, heavy_shapes, seed=i)
+        else:
+            _draw_text_page(page)
+    doc.save(filepath)
+    doc.close()
+    return list(range(heavy_count))
+
+
+def make_text_pdf(filepath: PathLike | str, page_count: int = 64):
+    """Make a PDF of text pages, cheap to render but with many glyphs."""
+    make_mixed_pdf(filepath, page_count, heavy_ratio=0.0)
+
+
+def make_vector_pdf(filepath: PathLike | str, page_count: int = 64, shapes: int = 500):
+    """Make a PDF of vector pages with transparent shapes, expensive to render."""
+    make_mixed_pdf(filepath, page_count, heavy_ratio=1.0, heavy_shapes=shapes)
+
+
+def _make_picture(
+    width: int, height: int, seed: int, shapes: int = 100
+) -> pymupdf.Pixmap:
+    # render a vector page into a picture with photo-like gradients and edges
+    doc = pymupdf.open()
+    page = doc.new_page(width=width, height=height)
+    _draw_vector_page(page, shapes, seed=seed)
+    pixmap = page.get_pixmap(alpha=False)
+    doc.close()
+    return pixmap
+
+
+def make_image_pdf(
+    filepath: PathLike | str,
+    page_count: int = 64,
+    image_width: int = 1240,
+    image_height: int = 1754,
+):
+    """Make a PDF where every page is a full-page JPEG image, like a scanned document."""
+    doc = pymupdf.open()
+    for i in range(page_count):
+        page = doc.new_page(width=A4_WIDTH, height=A4_HEIGHT)
+        picture = _make_picture(image_width, image_height, seed=i)
+        page.insert_image(page.rect, stream=picture.tobytes("jpeg", jpg_quality=85))
+    doc.save(filepath)
+    doc.close()
+
+
+def make_image_set(
+    directory: PathLike | str,
+    count: int = 32,
+    image_format: str = "jpeg",
+    width: int = 1240,
+    height: int = 1754,
+) -> list[str]:
+    """Make a set of images ("jpeg" or "png") in the directory, return their paths in order."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    ext = "jpg" if image_format == "jpeg" else image_format
+    filepaths = []
+    for i in range(count):
+        filepath = directory / f"image-{i:04d}.{ext}"
+        picture = _make_picture(width, height, seed=i)
+        if image_format == "jpeg":
+            filepath.write_bytes(picture.tobytes("jpeg", jpg_quality=85))
+        else:
+            picture.save(filepath)
+        filepaths.append(filepath.as_posix())
+    return filepaths
+
+
+def make_repetitive_pdf(
+    filepath: PathLike | str,
+    page_count: int = 64,
+    unique_ratio: float = 0.25,
+    shapes: int = 500,
+):
+    """
+    Make a PDF where only the first `unique_ratio` of the pages differ, the others repeat a vector page drawn from the
+    same content stream, like the separators and forms of a scanned batch.
+    """
+    doc = pymupdf.open()
+    unique_count = max(int(page_count * unique_ratio), 1)
+    for i in range(unique_count):
+        page = doc.new_page(width=A4_WIDTH, height=A4_HEIGHT)
+        _draw_vector_page(page, shapes, seed=i)
+    # the copies repeat the content stream and the resources of the last unique page
+    for _ in range(page_count - unique_count):
+        doc.fullcopy_page(unique_count - 1)
+    doc.save(filepath)
+    doc.close()
@@ -0,0 +1,79 @@
+"""
+Print a table of encoding throughput (pages/sec) against output size for the output formats of pdf2images, so that a
+throughput/size tradeoff can be chosen per job. The pages are rendered once up front, only the encoding and writing
+are measured (on a single thread).
+
+    python -m benchmarks.bench_codecs --pages 8 --dpi 300
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import pymupdf
+
+from pdftoolkit.tools.pdf2images._codecs import (
+    EncodeOptions,
+    save_pixmap,
+    file_extension,
+)
+from pdftoolkit.tools.pdf2images._paramconf import ImageFormat
+from ._corpus import make_mixed_pdf
+
+CASES = (
+    ("png (mupdf)", None),
+    ("png level 0", EncodeOptions(ImageFormat.PNG, png_compress_level=0)),
+    ("png level 1", EncodeOptions(ImageFormat.PNG, png_compress_level=1)),
+    ("png level 3", EncodeOptions(ImageFormat.PNG, png_compress_level=3)),
+    ("png level 6", EncodeOptions(ImageFormat.PNG, png_compress_level=6)),
+    ("png level 9", EncodeOptions(ImageFormat.PNG, png_compress_level=9)),
+    ("jpeg q95", EncodeOptions(ImageFormat.JPEG, quality=95)),
+    ("jpeg q75", EncodeOptions(ImageFormat.JPEG, quality=75)),
+    ("webp q80", EncodeOptions(ImageFormat.WEBP, quality=80)),
+    ("pnm", EncodeOptions(ImageFormat.PNM)),
+    ("tiff raw", EncodeOptions(ImageFormat.TIFF)),
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=8)
+    parser.add_argument("--dpi", type=int, default=300)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        input_file = tmp / "mixed.pdf"
+        make_mixed_pdf(input_file, args.pages, heavy_ratio=0.25, heavy_shapes=300)
+        doc = pymupdf.open(input_file)
+        # noinspection PyUnresolvedReferences
+        pixmaps = [page.get_pixmap(dpi=args.dpi) for page in doc]
+
+        print(f"pages: {args.pages}; dpi: {args.dpi}")
+        print(f"{'format':<14}{'pages/sec':>10}{'KiB/page':>12}")
+        for name, options in CASES:
+            ext = (
+                file_extension(options.image_format, False, "RGB")
+                if options
+                else ".png"
+            )
+            total_bytes = 0
+            time_start = time.perf_counter()
+            for i, pixmap in enumerate(pixmaps):
+                output_file = tmp / f"{i}{ext}"
+                if options is None:
+                    pixmap.save(output_file)
+                else:
+                    save_pixmap(pixmap, output_file, options)
+            elapsed = time.perf_counter() - time_start
+            for i in range(len(pixmaps)):
+                total_bytes += (tmp / f"{i}{ext}").stat().st_size
+            print(
+                f"{name:<14}{len(pixmaps) / elapsed:>10.2f}{total_bytes / len(pixmaps) / 1024:>12.0f}"
+            )
+        doc.close()
+
+
+if __name__ == "__main__":
+    main()
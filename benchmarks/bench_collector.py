@@ -0,0 +1,74 @@
+"""
+Measure the CPU time burned by the parent process while it waits for the outputs of its workers, comparing the old
+busy-polling loop (`read_output_until_empty(block=False)` in a tight loop) with `iter_outputs()`.
+
+The workers only sleep between outputs, so the wall time is the same for both and any CPU time used by the parent
+is pure overhead of the collection loop.
+
+    python -m benchmarks.bench_collector --workers 4 --outputs 50 --interval 0.02
+"""
+
+import argparse
+import time
+
+from py_multitasking import TaskContext, with_process_pool_executor, Scopes
+
+from pdftoolkit.tools.commons import iter_outputs
+
+
+def _slow_task(ctx: TaskContext, outputs: int, interval: float) -> int:
+    for i in range(outputs):
+        time.sleep(interval)
+        ctx.write_output(i, block=False)
+    return outputs
+
+
+def _busy_poll(session) -> int:
+    received = 0
+    while True:
+        if session.all_done:
+            break
+        received += len(session.context.read_output_until_empty(block=False))
+    received += len(session.context.read_output_until_empty(block=False))
+    return received
+
+
+def _blocking(session) -> int:
+    return sum(1 for _ in iter_outputs(session))
+
+
+def _measure(manager, collect, workers: int, outputs: int, interval: float):
+    args = [outputs] * workers, [interval] * workers
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    session = manager.map("bench-", _slow_task, Scopes.Session(), *args)
+    received = collect(session)
+    session.wait_for_all()
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    assert received == workers * outputs, f"{received} != {workers * outputs}"
+    return wall, cpu
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--outputs", type=int, default=50)
+    parser.add_argument("--interval", type=float, default=0.02)
+    args = parser.parse_args()
+
+    with with_process_pool_executor(max_workers=args.workers) as manager:
+        # warm up the pool so that process startup is not measured
+        _measure(manager, _blocking, args.workers, 1, 0)
+        print(
+            f"{'collector':<12}{'wall (s)':>10}{'parent cpu (s)':>16}{'cpu/wall':>10}"
+        )
+        for name, collect in (("busy-poll", _busy_poll), ("blocking", _blocking)):
+            wall, cpu = _measure(
+                manager, collect, args.workers, args.outputs, args.interval
+            )
+            print(f"{name:<12}{wall:>10.3f}{cpu:>16.3f}{cpu / wall:>10.1%}")
+
+
+if __name__ == "__main__":
+    main()
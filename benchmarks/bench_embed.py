@@ -0,0 +1,70 @@
+"""
+Print the throughput (images/sec) of images2pdf putting photos on pages, converted with `convert_to_pdf()` as before
+against embedded as they are (pass-through), and the size of the resulting document. The photos are generated up
+front, each image is read, turned into a page and appended to a chunk document, on a single thread.
+
+    python -m benchmarks.bench_embed --images 1000
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import pymupdf
+
+from pdftoolkit.tools.images2pdf._core import (
+    _ImageData,
+    _append_page,
+    _produce_image_data,
+)
+from pdftoolkit.utils import close_safely
+from ._corpus import make_image_set
+
+
+def _convert(image_path: str, page_index: int) -> _ImageData:
+    img_doc = pymupdf.open(image_path)
+    try:
+        return _ImageData(index=page_index, data=img_doc.convert_to_pdf())
+    finally:
+        close_safely(img_doc)
+
+
+CASES = (
+    ("convert", _convert),
+    ("pass-through", _produce_image_data),
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--images", type=int, default=1000)
+    parser.add_argument("--width", type=int, default=1024)
+    parser.add_argument("--height", type=int, default=768)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        image_files = make_image_set(
+            tmp / "photos", args.images, "jpeg", args.width, args.height
+        )
+
+        print(f"images: {args.images}; size: {args.width}x{args.height}")
+        print(f"{'path':<14}{'images/sec':>12}{'KiB/page':>12}")
+        for name, produce in CASES:
+            doc = pymupdf.Document()
+            time_start = time.perf_counter()
+            for i, image_file in enumerate(image_files):
+                _append_page(doc, produce(image_file, i))
+            elapsed = time.perf_counter() - time_start
+            output_file = tmp / f"{name}.pdf"
+            doc.save(output_file)
+            doc.close()
+            print(
+                f"{name:<14}{len(image_files) / elapsed:>12.2f}"
+                f"{output_file.stat().st_size / len(image_files) / 1024:>12.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Print the time and the size of saving output PDFs with each save profile (`commons.save_profiles`), to choose the
+profile of a job. The documents are built in memory as the tools build them, then saved once per profile:
+
+- images2pdf of JPEG photos (embedded as they are) and of PNG images (converted, compressed already);
+- pdfmerger of text and of vector documents whose content streams are not compressed, the case where compressing
+  costs the most (and saves the most).
+
+    python -m benchmarks.bench_save --pages 64 --images 64
+"""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+import pymupdf
+
+from pdftoolkit.tools.commons.constants import SaveProfile
+from pdftoolkit.tools.commons.save_profiles import save_document
+from pdftoolkit.tools.images2pdf._core import _append_page, _produce_image_data
+from ._corpus import make_image_set, make_text_pdf, make_vector_pdf
+
+# how many times the document is merged with itself
+MERGE_COPIES = 3
+
+
+def _images2pdf(image_files: list[str]) -> Callable[[], pymupdf.Document]:
+    def build() -> pymupdf.Document:
+        doc = pymupdf.Document()
+        for i, image_file in enumerate(image_files):
+            _append_page(doc, _produce_image_data(image_file, i))
+        return doc
+
+    return build
+
+
+def _merge(pdf_file: Path) -> Callable[[], pymupdf.Document]:
+    def build() -> pymupdf.Document:
+        doc = pymupdf.Document()
+        for _ in range(MERGE_COPIES):
+            source = pymupdf.open(pdf_file)
+            doc.insert_pdf(source)
+            source.close()
+        return doc
+
+    return build
+
+
+def _uncompressed(pdf_file: Path) -> Path:
+    # the same document with all its streams decompressed
+    filepath = pdf_file.with_name(pdf_file.stem + "-uncompressed.pdf")
+    doc = pymupdf.open(pdf_file)
+    doc.save(filepath, expand=True)
+    doc.close()
+    return filepath
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=64)
+    parser.add_argument("--images", type=int, default=64)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        make_text_pdf(tmp / "text.pdf", args.pages)
+        make_vector_pdf(tmp / "vector.pdf", args.pages)
+        cases = {
+            "images2pdf jpeg": _images2pdf(
+                make_image_set(tmp / "jpeg", args.images, "jpeg")
+            ),
+            "images2pdf png": _images2pdf(
+                make_image_set(tmp / "png", args.images, "png")
+            ),
+            "merge text": _merge(_uncompressed(tmp / "text.pdf")),
+            "merge vector": _merge(_uncompressed(tmp / "vector.pdf")),
+        }
+
+        print(f"pages: {args.pages}; images: {args.images}")
+        print(f"{'document':<18}{'profile':<10}{'save (s)':>10}{'size (MB)':>11}")
+        for name, build in cases.items():
+            for profile in SaveProfile:
+                doc = build()
+                output_file = tmp / "output.pdf"
+                time_start = time.perf_counter()
+                save_document(doc, output_file, profile)
+                elapsed = time.perf_counter() - time_start
+                doc.close()
+                print(
+                    f"{name:<18}{profile.value:<10}{elapsed:>10.3f}"
+                    f"{output_file.stat().st_size / 1e6:>11.2f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Compare the wall-clock time of the static split (`distribute_evenly()`, one contiguous slice per worker) with the
+dynamic batch scheduler (`tools.commons.scheduler`) when rendering a document whose pages vary a lot in cost.
+
+    python -m benchmarks.bench_scheduler --pages 64 --workers 4 --dpi 150
+"""
+
+import argparse
+import shutil
+import tempfile
+import time
+from functools import partial
+from pathlib import Path
+
+from py_multitasking import with_process_pool_executor, Scopes, Scope
+
+from pdftoolkit.tools.commons import (
+    distribute_evenly,
+    suggest_batch_size,
+    split_into_batches,
+    dispatch_batches,
+)
+from pdftoolkit.tools.pdf2images._codecs import EncodeOptions
+from pdftoolkit.tools.pdf2images._impl import pdf2images_task
+from pdftoolkit.tools.pdf2images._paramconf import DuplicatePolicy
+from ._corpus import make_mixed_pdf
+
+
+def _run(output_dir: Path, batches: list, worker_count: int, dpi: int):
+    shutil.rmtree(output_dir, ignore_errors=True)
+    output_dir.mkdir(parents=True)
+    scopes = Scopes(
+        input_queue=Scope.Session,
+        output_queue=Scope.Null,
+        cancel_event=Scope.Session,
+        output_queue_lock=Scope.Null,
+    )
+    task_func = partial(
+        pdf2images_task,
+        duplicate_policy=DuplicatePolicy.Overwrite,
+        profiles=[(dpi, EncodeOptions())],
+        alpha=False,
+        rotation=0,
+        colorspace="RGB",
+        annots=True,
+    )
+    with with_process_pool_executor(max_workers=worker_count) as manager:
+        time_start = time.perf_counter()
+        session = dispatch_batches(
+            manager, "bench-", task_func, scopes, batches, worker_count
+        )
+        session.wait_for_all()
+        elapsed = time.perf_counter() - time_start
+        for name, result in session.results().items():
+            if not result.successful:
+                raise RuntimeError(f"{name} failed: {result.exception}")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=64)
+    parser.add_argument("--heavy-ratio", type=float, default=0.25)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--dpi", type=int, default=150)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        input_file = (tmp / "mixed.pdf").as_posix()
+        make_mixed_pdf(input_file, args.pages, args.heavy_ratio)
+        output_dir = tmp / "output"
+        outputs = [
+            (input_file, i, ((output_dir / f"page-{i + 1}.png").as_posix(),))
+            for i in range(args.pages)
+        ]
+        # with one slice per worker, every worker takes exactly one batch from the queue, which is the static split
+        static_batches = distribute_evenly(outputs, args.workers)
+        batch_size = suggest_batch_size(len(outputs), args.workers)
+        dynamic_batches = split_into_batches(outputs, batch_size)
+
+        results = {"static": [], "dynamic": []}
+        for _ in range(args.repeat):
+            results["static"].append(
+                _run(output_dir, static_batches, args.workers, args.dpi)
+            )
+            results["dynamic"].append(
+                _run(output_dir, dynamic_batches, args.workers, args.dpi)
+            )
+
+    static_best = min(results["static"])
+    dynamic_best = min(results["dynamic"])
+    print(
+        f"pages: {args.pages}; heavy ratio: {args.heavy_ratio}; workers: {args.workers}; dpi: {args.dpi}"
+    )
+    print(f"static split:              {static_best:.3f}s (best of {args.repeat})")
+    print(
+        f"dynamic (batch size {batch_size:>2}): {dynamic_best:.3f}s (best of {args.repeat})"
+    )
+    print(f"speedup:                   {static_best / dynamic_best:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
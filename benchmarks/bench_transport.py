@@ -0,0 +1,103 @@
+"""
+Print the throughput (MB/s) of handing payloads from the workers over to the parent, pickled through the output queue
+as before against through the transport of `commons.transport` (shared memory slots, spool files for the payloads
+larger than a slot), and the CPU time of the parent. The parent writes each payload to the null device, as the archive
+writer of pdf2images writes it to the archive.
+
+    python -m benchmarks.bench_transport --workers 4 --total 512 --sizes 256,1024,4096,16384
+"""
+
+import argparse
+import os
+import time
+
+from py_multitasking import TaskContext, Scopes
+
+from pdftoolkit.tools.commons.collector import iter_outputs
+from pdftoolkit.tools.commons.transport import (
+    DEFAULT_SLOTS_PER_WORKER,
+    PayloadSender,
+    PayloadTransport,
+)
+from pdftoolkit.tools.commons.worker_pool import get_worker_pool
+
+
+def _send_task(
+    ctx: TaskContext, payloads: int, size: int, sender: PayloadSender | None
+) -> int:
+    data = os.urandom(size)
+    for _ in range(payloads):
+        if sender is None:
+            ctx.write_output(data, block=True)
+        else:
+            ctx.write_output(sender.send(data), block=True)
+    return payloads
+
+
+def _measure(
+    manager, workers: int, payloads: int, size: int, use_transport: bool
+) -> tuple[float, float]:
+    transport = None
+    if use_transport:
+        transport = PayloadTransport.create(manager, workers * DEFAULT_SLOTS_PER_WORKER)
+    try:
+        sender = transport.sender if transport else None
+        cpu_start = time.process_time()
+        wall_start = time.perf_counter()
+        session = manager.map(
+            "bench-",
+            _send_task,
+            Scopes.Session(),
+            [payloads] * workers,
+            [size] * workers,
+            [sender] * workers,
+        )
+        received = 0
+        with open(os.devnull, "wb") as sink:
+            for output in iter_outputs(session):
+                if transport is None:
+                    sink.write(output)
+                else:
+                    with transport.open(output) as data:
+                        sink.write(data)
+                received += 1
+        session.wait_for_all()
+        wall = time.perf_counter() - wall_start
+        cpu = time.process_time() - cpu_start
+    finally:
+        if transport is not None:
+            transport.close()
+    assert received == workers * payloads, f"{received} != {workers * payloads}"
+    return wall, cpu
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument(
+        "--total", type=int, default=512, help="MiB sent for each payload size"
+    )
+    parser.add_argument(
+        "--sizes", default="256,1024,4096,16384", help="payload sizes in KiB"
+    )
+    args = parser.parse_args()
+    sizes = [int(size) * 1024 for size in args.sizes.split(",") if size.strip()]
+
+    manager = get_worker_pool()
+    # warm up the pool so that process startup is not measured
+    _measure(manager, args.workers, 1, 1024, True)
+    print(
+        f"{'size (KiB)':>10}{'path':>11}{'MB/s':>10}{'wall (s)':>10}{'parent cpu (s)':>16}"
+    )
+    for size in sizes:
+        payloads = max(args.total * 1024 * 1024 // size // args.workers, 1)
+        for name, use_transport in (("queue", False), ("transport", True)):
+            wall, cpu = _measure(manager, args.workers, payloads, size, use_transport)
+            throughput = args.workers * payloads * size / wall / 1e6
+            print(
+                f"{size // 1024:>10}{name:>11}{throughput:>10.1f}{wall:>10.3f}{cpu:>16.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Output format regression check of pdf2images. Before Pillow encoded the pages, every file extension `pixmap.save()`
+knows was written by MuPDF. A page is rendered in each colorspace, with and without alpha, and saved through
+`save_pixmap()` and `encode_pixmap()` (`ImageFormat.Auto`, the extension decides) to each of these extensions. Where
+`pixmap.save()` succeeds, they must succeed as well:
+
+    python -m benchmarks.check_formats
+
+The exit code is 1 if an output which `pixmap.save()` writes fails.
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+import pymupdf
+
+from pdftoolkit.tools.pdf2images._codecs import (
+    EncodeOptions,
+    encode_pixmap,
+    save_pixmap,
+)
+
+# the extensions pixmap.save() accepts
+MUPDF_EXTENSIONS = (
+    ".png",
+    ".pnm",
+    ".pgm",
+    ".ppm",
+    ".pbm",
+    ".pam",
+    ".psd",
+    ".ps",
+    ".jpg",
+    ".jpeg",
+)
+COLORSPACES = (pymupdf.csGRAY, pymupdf.csRGB, pymupdf.csCMYK)
+OK = "ok"
+# pixmap.save() cannot write it either, nothing to check
+SKIPPED = "skipped"
+
+
+def _render(colorspace: pymupdf.Colorspace, alpha: bool) -> pymupdf.Pixmap:
+    doc = pymupdf.Document()
+    page = doc.new_page(width=120, height=80)
+    page.insert_text((10, 40), "pdftoolkit", fontsize=18)
+    page.draw_rect(pymupdf.Rect(60, 10, 110, 70), color=(1, 0, 0), fill=(0, 0, 1))
+    pixmap = page.get_pixmap(colorspace=colorspace, alpha=alpha)
+    doc.close()
+    return pixmap
+
+
+def _check(pixmap: pymupdf.Pixmap, filepath: Path) -> str:
+    try:
+        pixmap.save(filepath.with_stem(filepath.stem + "-mupdf"))
+    except Exception:
+        return SKIPPED
+    try:
+        save_pixmap(pixmap, filepath, EncodeOptions())
+    except Exception as e:
+        return f"save_pixmap() {type(e).__name__}: {e}"
+    try:
+        content = encode_pixmap(pixmap, filepath, EncodeOptions())
+    except Exception as e:
+        return f"encode_pixmap() {type(e).__name__}: {e}"
+    if filepath.stat().st_size == 0 or not content:
+        return "empty output"
+    return OK
+
+
+def main():
+    failures = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'extension':<11}{'colorspace':<12}{'alpha':<7}result")
+        for extension in MUPDF_EXTENSIONS:
+            for colorspace in COLORSPACES:
+                for alpha in (False, True):
+                    if alpha and colorspace == pymupdf.csCMYK:
+                        continue
+                    pixmap = _render(colorspace, alpha)
+                    filepath = Path(tmp) / f"page-{colorspace.name}-{alpha}{extension}"
+                    result = _check(pixmap, filepath)
+                    failures += result not in (OK, SKIPPED)
+                    print(
+                        f"{extension:<11}{colorspace.name:<12}{str(alpha):<7}"
+                        f"{result}"
+                    )
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
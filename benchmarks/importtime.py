@@ -0,0 +1,162 @@
+"""
+Import-time regression check. Each entry point is started in a fresh interpreter with `-X importtime`, the time spent
+importing modules is summed up and compared with its budget. Modules an entry point must not load at startup (Qt for
+the command line, pymupdf and py_multitasking for the GUI, whose tools import them on first run) are checked too:
+
+    python -m benchmarks.importtime
+    python -m benchmarks.importtime --scale 2 --budget gui=2500
+
+The exit code is 1 if an entry point is over its budget or loads a forbidden module.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+# "-X importtime" writes lines of "import time: <self us> | <cumulative us> | <nesting><name>"
+_IMPORTTIME_PREFIX = "import time:"
+_QT_MODULES = ("PySide6", "PySide2", "PyQt5", "PyQt6", "qtpy")
+
+
+@dataclass(frozen=True)
+class EntryPoint(object):
+    name: str
+    code: str
+    # in milliseconds, on a typical development machine
+    budget_ms: float
+    forbidden_modules: tuple[str, ...] = ()
+
+
+ENTRY_POINTS = (
+    EntryPoint(
+        "cli",
+        "import pdftoolkit.cli as cli; cli.build_parser()",
+        budget_ms=150,
+        forbidden_modules=(*_QT_MODULES, "pyguiadapter.adapter", "pymupdf"),
+    ),
+    EntryPoint(
+        "gui",
+        "import pdftoolkit.application as app\n"
+        "from pyguiadapter.adapter import GUIAdapter\n"
+        "app.use_tools(GUIAdapter())",
+        budget_ms=1500,
+        forbidden_modules=("pymupdf", "py_multitasking", "PIL"),
+    ),
+)
+
+
+def _parse_importtime(stderr: str) -> tuple[float, set[str]]:
+    # return the total import time in milliseconds and the names of the imported modules
+    total_us = 0
+    modules = set()
+    for line in stderr.splitlines():
+        if not line.startswith(_IMPORTTIME_PREFIX):
+            continue
+        _, cumulative, name = line[len(_IMPORTTIME_PREFIX) :].split("|")
+        if cumulative.strip() == "cumulative":
+            # the header line
+            continue
+        # top-level imports have no nesting, their cumulative times add up to the total
+        if not name[1:].startswith(" "):
+            total_us += int(cumulative)
+        modules.add(name.strip())
+    return total_us / 1000, modules
+
+
+def _measure(entry_point: EntryPoint) -> tuple[float, set[str]]:
+    env = {
+        **os.environ,
+        "QT_QPA_PLATFORM": os.environ.get("QT_QPA_PLATFORM", "offscreen"),
+        "PYTHONPATH": os.pathsep.join(
+            filter(None, [Path.cwd().as_posix(), os.environ.get("PYTHONPATH", "")])
+        ),
+    }
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", entry_point.code],
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+    if process.returncode != 0:
+        raise RuntimeError(
+            f"{entry_point.name} failed (exit code {process.returncode}):\n{process.stderr[-2000:]}"
+        )
+    return _parse_importtime(process.stderr)
+
+
+def _is_forbidden(module: str, forbidden_modules: tuple[str, ...]) -> bool:
+    return any(
+        module == forbidden or module.startswith(forbidden + ".")
+        for forbidden in forbidden_modules
+    )
+
+
+def _budget(value: str) -> tuple[str, float]:
+    name, _, budget_ms = value.partition("=")
+    return name.strip(), float(budget_ms)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="runs of each entry")
+    parser.add_argument(
+        "--scale", type=float, default=1.0, help="multiply the budgets, for slow hosts"
+    )
+    parser.add_argument(
+        "--budget",
+        type=_budget,
+        action="append",
+        default=[],
+        help="override the budget of an entry point, e.g. gui=2000 (ms)",
+    )
+    parser.add_argument("--output", default="", help="json report file")
+    args = parser.parse_args()
+    budgets = dict(args.budget)
+
+    failures = []
+    results = []
+    print(f"{'entry':<10}{'import(ms)':>12}{'budget(ms)':>12}  forbidden modules")
+    for entry_point in ENTRY_POINTS:
+        runs = [_measure(entry_point) for _ in range(max(args.repeat, 1))]
+        # the fastest run is the least disturbed one, the modules are the same in every run
+        import_ms = min(run[0] for run in runs)
+        modules = runs[0][1]
+        budget_ms = budgets.get(entry_point.name, entry_point.budget_ms) * args.scale
+        forbidden = sorted(
+            module
+            for module in modules
+            if _is_forbidden(module, entry_point.forbidden_modules)
+        )
+        print(
+            f"{entry_point.name:<10}{import_ms:>12.1f}{budget_ms:>12.1f}  {', '.join(forbidden) or '-'}"
+        )
+        if import_ms > budget_ms:
+            failures.append(
+                f"{entry_point.name}: {import_ms:.1f}ms > {budget_ms:.1f}ms"
+            )
+        if forbidden:
+            failures.append(f"{entry_point.name}: loads {', '.join(forbidden)}")
+        results.append(
+            {
+                "name": entry_point.name,
+                "import_ms": import_ms,
+                "budget_ms": budget_ms,
+                "forbidden_modules": forbidden,
+            }
+        )
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2), encoding="utf-8")
+    if failures:
+        print("\n".join(failures))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
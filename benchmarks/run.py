@@ -0,0 +1,290 @@
+"""
+Benchmark suite of the tools. A synthetic corpus (text-heavy, vector-heavy and image-heavy PDFs, a PDF of repeated
+pages for the deduplication modes, JPEG and PNG image sets) is generated with fixed seeds, then every tool is run headless across the given worker counts, DPIs and
+colorspaces. Each case runs in a fresh process, its wall time, CPU time (including the worker processes), peak RSS and
+pages/sec are written to a json report. A report can be compared with a previous one (the baseline), for example
+before and after upgrading pymupdf or py_multitasking:
+
+    python -m benchmarks.run --output baseline.json
+    python -m benchmarks.run --output current.json --baseline baseline.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from importlib import metadata
+from pathlib import Path
+
+from ._case import RESULT_PREFIX
+from ._corpus import (
+    make_text_pdf,
+    make_vector_pdf,
+    make_image_pdf,
+    make_image_set,
+    make_repetitive_pdf,
+)
+
+PDF_CORPORA = ("text", "vector", "image")
+IMAGE_SETS = ("jpeg", "png")
+# the deduplication modes of pdf2images, run on a document where most pages repeat
+DEDUP_MODES = ("off", "content", "raster")
+# lower pages/sec than the baseline by more than this ratio is reported as a regression
+DEFAULT_TOLERANCE = 0.1
+
+
+def _int_list(value: str) -> list[int]:
+    return [int(item) for item in value.split(",") if item.strip()]
+
+
+def _str_list(value: str) -> list[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def _make_corpus(corpus_dir: Path, pages: int, images: int) -> dict[str, object]:
+    corpus_dir.mkdir(parents=True, exist_ok=True)
+    corpus = {}
+    makers = {
+        "text": make_text_pdf,
+        "vector": make_vector_pdf,
+        "image": make_image_pdf,
+    }
+    for name in PDF_CORPORA:
+        filepath = corpus_dir / f"{name}.pdf"
+        makers[name](filepath, pages)
+        corpus[name] = filepath.as_posix()
+    filepath = corpus_dir / "repetitive.pdf"
+    make_repetitive_pdf(filepath, pages)
+    corpus["repetitive"] = filepath.as_posix()
+    for image_format in IMAGE_SETS:
+        corpus[image_format] = make_image_set(
+            corpus_dir / image_format, images, image_format
+        )
+    return corpus
+
+
+def _cases(args: argparse.Namespace, corpus: dict, output_dir: Path) -> list[dict]:
+    cases = []
+    for name in PDF_CORPORA:
+        for worker_count in args.workers:
+            for dpi in args.dpis:
+                for colorspace in args.colorspaces:
+                    case_name = f"pdf2images/{name}/w{worker_count}/dpi{dpi}/{colorspace.lower()}"
+                    cases.append(
+                        {
+                            "name": case_name,
+                            "tool": "pdf2images",
+                            "pages": args.pages,
+                            "kwargs": {
+                                "input_file": corpus[name],
+                                "output_dir": (output_dir / case_name).as_posix(),
+                                # every run of a case renders all the pages again
+                                "duplicate_policy": "overwrite",
+                                "dpi": dpi,
+                                "colorspace": colorspace,
+                                "worker_count": worker_count,
+                                "verbose": False,
+                                "open_output_dir": False,
+                            },
+                        }
+                    )
+    for dedup in DEDUP_MODES:
+        for worker_count in args.workers:
+            case_name = f"pdf2images/repetitive/w{worker_count}/dedup-{dedup}"
+            cases.append(
+                {
+                    "name": case_name,
+                    "tool": "pdf2images",
+                    "pages": args.pages,
+                    "kwargs": {
+                        "input_file": corpus["repetitive"],
+                        "output_dir": (output_dir / case_name).as_posix(),
+                        "duplicate_policy": "overwrite",
+                        "dpi": max(args.dpis),
+                        "dedup": dedup,
+                        "worker_count": worker_count,
+                        "verbose": False,
+                        "open_output_dir": False,
+                    },
+                }
+            )
+    for image_format in IMAGE_SETS:
+        for worker_count in args.workers:
+            case_name = f"images2pdf/{image_format}/w{worker_count}"
+            cases.append(
+                {
+                    "name": case_name,
+                    "tool": "images2pdf",
+                    "pages": args.images,
+                    "kwargs": {
+                        "image_files": corpus[image_format],
+                        "dest_file": (output_dir / case_name / "output.pdf").as_posix(),
+                        # overwrite, never ask
+                        "duplicate_policy": 2,
+                        "worker_count": worker_count,
+                        "verbose": False,
+                        "open_output_dir": False,
+                    },
+                }
+            )
+    cases.append(
+        {
+            "name": "pdfmerger/all",
+            "tool": "pdfmerger",
+            "pages": args.pages * len(PDF_CORPORA),
+            "kwargs": {
+                "pdf_files": [corpus[name] for name in PDF_CORPORA],
+                "output_file": (output_dir / "pdfmerger" / "merged.pdf").as_posix(),
+            },
+        }
+    )
+    return cases
+
+
+def _run_case(case: dict) -> dict:
+    if "output_dir" in case["kwargs"]:
+        Path(case["kwargs"]["output_dir"]).mkdir(parents=True, exist_ok=True)
+    for key in ("dest_file", "output_file"):
+        if key in case["kwargs"]:
+            Path(case["kwargs"][key]).parent.mkdir(parents=True, exist_ok=True)
+    env = {
+        **os.environ,
+        "QT_QPA_PLATFORM": os.environ.get("QT_QPA_PLATFORM", "offscreen"),
+    }
+    process = subprocess.run(
+        [sys.executable, "-m", "benchmarks._case", json.dumps(case)],
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+    for line in process.stdout.splitlines():
+        if line.startswith(RESULT_PREFIX):
+            return json.loads(line[len(RESULT_PREFIX) :])
+    raise RuntimeError(
+        f"case {case['name']} failed (exit code {process.returncode}):\n{process.stderr[-2000:]}"
+    )
+
+
+def _best_of(results: list[dict]) -> dict:
+    # the fastest run is the least disturbed one
+    return min(results, key=lambda result: result["wall_seconds"])
+
+
+def _environment() -> dict:
+    versions = {}
+    for package in ("pymupdf", "py-multitasking", "pillow", "pyguiadapter"):
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "packages": versions,
+        "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+
+def _compare(report: dict, baseline: dict, tolerance: float) -> list[str]:
+    baseline_results = {result["name"]: result for result in baseline["results"]}
+    regressions = []
+    print(f"\n{'case':<44}{'baseline':>10}{'current':>10}{'ratio':>8}")
+    for result in report["results"]:
+        previous = baseline_results.get(result["name"], None)
+        if not previous or not previous.get("pages_per_second"):
+            continue
+        if not result.get("pages_per_second"):
+            print(
+                f"{result['name']:<44}{previous['pages_per_second']:>10.2f}{'failed':>10}"
+            )
+            regressions.append(result["name"])
+            continue
+        ratio = result["pages_per_second"] / previous["pages_per_second"]
+        mark = ""
+        if ratio < 1 - tolerance:
+            mark = "  <- regression"
+            regressions.append(result["name"])
+        print(
+            f"{result['name']:<44}{previous['pages_per_second']:>10.2f}"
+            f"{result['pages_per_second']:>10.2f}{ratio:>8.2f}{mark}"
+        )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--pages", type=int, default=16, help="pages of each PDF")
+    parser.add_argument("--images", type=int, default=16, help="images of each set")
+    parser.add_argument("--workers", type=_int_list, default=[1, os.cpu_count() or 1])
+    parser.add_argument("--dpis", type=_int_list, default=[72, 150])
+    parser.add_argument("--colorspaces", type=_str_list, default=["RGB", "GRAY"])
+    parser.add_argument("--repeat", type=int, default=3, help="runs of each case")
+    parser.add_argument("--filter", default="", help="only run cases containing it")
+    parser.add_argument("--output", default="", help="json report file")
+    parser.add_argument("--baseline", default="", help="json report to compare with")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args()
+    args.workers = sorted(set(args.workers))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        print("generating corpus...")
+        corpus = _make_corpus(tmp / "corpus", args.pages, args.images)
+        cases = [
+            case
+            for case in _cases(args, corpus, tmp / "output")
+            if args.filter in case["name"]
+        ]
+        results = []
+        print(
+            f"{'case':<44}{'pages/s':>10}{'wall(s)':>10}{'cpu(s)':>10}{'rss(MB)':>10}{'workers rss(MB)':>17}"
+        )
+        for case in cases:
+            try:
+                result = _best_of([_run_case(case) for _ in range(max(args.repeat, 1))])
+            except RuntimeError as e:
+                # a failed case is kept in the report, the other cases still run
+                results.append(
+                    {"name": case["name"], "pages": case["pages"], "error": str(e)}
+                )
+                print(f"{case['name']:<44}{'failed':>10}", file=sys.stderr)
+                print(e, file=sys.stderr)
+                continue
+            result = {"name": case["name"], "pages": case["pages"], **result}
+            results.append(result)
+            children_rss = result["children_peak_rss_mb"]
+            print(
+                f"{case['name']:<44}{result['pages_per_second']:>10.2f}{result['wall_seconds']:>10.3f}"
+                f"{result['cpu_seconds']:>10.3f}{result['peak_rss_mb'] or 0:>10.1f}{children_rss or 0:>17.1f}"
+            )
+
+    report = {
+        "environment": _environment(),
+        "settings": {
+            "pages": args.pages,
+            "images": args.images,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"report saved: {args.output}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        regressions = _compare(report, baseline, args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} regression(s) beyond {args.tolerance:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
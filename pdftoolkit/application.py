@@ -12,10 +12,9 @@ from qtpy.QtWidgets import QApplication
 
 from pdftoolkit.widgets import rect_tuple_t, RectSelect
 from pdftoolkit import logme
-from pdftoolkit.configuration import GlobalConfig, get_theme_safely
-from pdftoolkit.tools import select_window, pdfmerger
-from pdftoolkit.tools import pdf2images
-from pdftoolkit.tools import images2pdf
+from pdftoolkit.configuration import global_config, get_theme_safely
+from pdftoolkit.tools import select_window
+from pdftoolkit.tools.registry import use_tools
 from pdftoolkit.utils import unused
 
 _L = logme.new(__name__)
@@ -27,18 +26,20 @@ def register_parameter_widgets():
 
 def on_app_start(app: QApplication):
     unused(app)
-    theme, ok = get_theme_safely(GlobalConfig.theme)
+    config = global_config()
+    theme, ok = get_theme_safely(config.theme)
     if not ok:
-        GlobalConfig.theme = theme
-        GlobalConfig.save()
+        config.theme = theme
+        config.save()
     qdarktheme.setup_theme(theme)
 
 
 def process_first_run():
-    if GlobalConfig.first_run:
+    config = global_config()
+    if config.first_run:
         _L.info("application is running for the first time")
-        GlobalConfig.first_run = False
-        GlobalConfig.save()
+        config.first_run = False
+        config.save()
 
 
 def main():
@@ -47,17 +48,19 @@ def main():
     # process first run if necessary
     process_first_run()
     adapter = GUIAdapter(on_app_start=on_app_start)
-    pdf2images.use(adapter)
-    images2pdf.use(adapter)
-    pdfmerger.use(adapter)
+    use_tools(adapter)
     adapter.run(
         show_select_window=True,
         select_window_config=select_window.WINDOW_CONFIG,
         select_window_listener=select_window.WINDOW_LISTENER,
-        select_window_menus=select_window.WINDOW_MENUS,
+        select_window_menus=select_window.create_window_menus(),
     )
     # always save the config before exiting
-    GlobalConfig.save()
+    global_config().save()
+    # stop the worker processes kept warm between tool runs, the pool module is only loaded if a tool was run
+    from pdftoolkit.tools.commons.worker_pool import shutdown_worker_pool
+
+    shutdown_worker_pool()
     _L.info("application exited")
 
 
@@ -0,0 +1,461 @@
+"""
+The headless command line of PDFToolKit, for servers and scripts:
+
+    pdftoolkit pdf2images input.pdf -o output/ --dpi 150 --workers 0
+    pdftoolkit pdf2images docs/ --recursive -o '$indir/output/$instem/'
+    pdftoolkit images2pdf *.jpg -o album.pdf --overwrite
+    pdftoolkit merge a.pdf b.pdf -o merged.pdf
+
+Only pymupdf and the implementation of the tools are imported, the GUI (and Qt) is not. The progress and the result
+are written to stdout as JSON lines, one object per line with an "event" key:
+
+    {"event": "start", "tool": "pdf2images"}
+    {"event": "progress", "value": 3, "total": 10}
+    {"event": "page", "input_file": "...", "page_index": 2, "output_path": "...", "operation": "created", "error": null}
+    {"event": "message", "text": "..."}
+    {"event": "result", "tool": "pdf2images", "cancelled": false, "result": {"elapsed_seconds": 1.2, "stages": {...}}}
+    {"event": "error", "type": "ParameterError", "parameter": "dpi", "message": "..."}
+
+The exit code is 0 on success, 1 on error, 2 on invalid parameters and 130 if interrupted (SIGINT or SIGTERM), in
+which case the running tool stops after the pages in progress.
+"""
+
+import argparse
+import json
+import signal
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Callable, TextIO
+
+from pyguiadapter.exceptions import ParameterError
+
+from .tools.commons.reporter import Reporter, set_reporter
+
+EXIT_OK = 0
+EXIT_ERROR = 1
+EXIT_PARAMETER_ERROR = 2
+EXIT_CANCELLED = 130
+
+
+class JsonReporter(Reporter):
+    """Write the progress, the messages and the events of a tool to a stream as JSON lines."""
+
+    def __init__(self, stream: TextIO, messages: bool = True):
+        self._stream = stream
+        self._messages = messages
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+        self._total = 0
+
+    def write(self, event: str, **data: Any):
+        line = json.dumps({"event": event, **data}, default=str, ensure_ascii=False)
+        with self._lock:
+            self._stream.write(line + "\n")
+            self._stream.flush()
+
+    def cancel(self):
+        self._cancelled.set()
+
+    def show_progressbar(self, min_value: int, max_value: int):
+        self._total = max_value
+
+    def update_progress(self, value: int):
+        # the tools reset the progress to 0 when they finish
+        if value > 0:
+            self.write("progress", value=value, total=self._total)
+
+    def is_cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def print(self, *args, sep: str = " ", end: str = "\n", **kwargs):
+        if self._messages:
+            self.write("message", text=sep.join(str(arg) for arg in args))
+
+    def event(self, name: str, **data: Any):
+        self.write(name, **data)
+
+
+def _run_pdf2images(args: argparse.Namespace) -> Any:
+    from .tools.pdf2images._constants import (
+        DuplicatePolicy,
+        ArchiveFormat,
+        DedupMode,
+        BlankPagePolicy,
+        ImageFormat,
+        DEFAULT_OUTPUT_DIR,
+        DEFAULT_BATCH_OUTPUT_DIR,
+    )
+
+    kwargs = dict(
+        filename_format=args.filename_format,
+        image_format=ImageFormat(args.image_format),
+        extra_profiles="\n".join(args.profile),
+        duplicate_policy=DuplicatePolicy(args.duplicate_policy),
+        archive_format=ArchiveFormat(args.archive),
+        page_ranges=args.pages,
+        dpi=args.dpi,
+        alpha=args.alpha,
+        rotation=args.rotation,
+        colorspace=args.colorspace,
+        annots=not args.no_annots,
+        png_compress_level=args.png_compress_level,
+        quality=args.quality,
+        encoder_threads=args.encoder_threads,
+        raster_memory_limit=args.raster_memory_limit,
+        dedup=DedupMode(args.dedup),
+        dedup_hardlink=args.dedup_hardlink,
+        blank_page_policy=BlankPagePolicy(args.blank_pages),
+        blank_threshold=args.blank_threshold,
+        worker_count=args.workers,
+        verbose=args.verbose,
+        open_output_dir=False,
+    )
+    if len(args.inputs) == 1 and Path(args.inputs[0]).is_file():
+        from .tools.pdf2images._api import pdf2images
+
+        return pdf2images(
+            input_file=args.inputs[0],
+            output_dir=args.output_dir or DEFAULT_OUTPUT_DIR,
+            **kwargs,
+        )
+
+    from .tools.pdf2images._api import pdf2images_batch
+
+    return pdf2images_batch(
+        input_paths=args.inputs,
+        recursive=args.recursive,
+        output_dir=args.output_dir or DEFAULT_BATCH_OUTPUT_DIR,
+        **kwargs,
+    )
+
+
+def _run_images2pdf(args: argparse.Namespace) -> Any:
+    from .tools.commons.constants import SaveProfile
+    from .tools.commons.validators import ensure_in_range
+    from .tools.images2pdf._constants import (
+        PageSize,
+        ColorMode,
+        MIN_MEMORY_LIMIT,
+        MAX_MEMORY_LIMIT,
+        MIN_TARGET_DPI,
+        MAX_TARGET_DPI,
+        MIN_QUALITY,
+        MAX_QUALITY,
+    )
+    from .tools.images2pdf._core import resolve_dest_file, convert_images
+
+    ensure_in_range("worker_count", args.workers, 1, None)
+    ensure_in_range(
+        "memory_limit", args.memory_limit, MIN_MEMORY_LIMIT, MAX_MEMORY_LIMIT
+    )
+    ensure_in_range(
+        "target_dpi",
+        args.target_dpi,
+        MIN_TARGET_DPI,
+        MAX_TARGET_DPI,
+        include_maximum=True,
+    )
+    ensure_in_range(
+        "quality", args.quality, MIN_QUALITY, MAX_QUALITY, include_maximum=True
+    )
+    dest_file_path = resolve_dest_file(args.output, len(args.images))
+    # there is no one to ask, an existing file is only replaced if allowed
+    if dest_file_path.is_file() and not args.overwrite:
+        raise ParameterError(
+            "dest_file",
+            f"{dest_file_path.as_posix()} already exists, use --overwrite to replace it",
+        )
+    return convert_images(
+        args.images,
+        dest_file_path,
+        worker_count=args.workers,
+        verbose=args.verbose,
+        memory_limit=args.memory_limit,
+        page_size=PageSize(args.page_size),
+        target_dpi=args.target_dpi,
+        quality=args.quality,
+        color_mode=ColorMode(args.color_mode),
+        save_profile=SaveProfile(args.save_profile),
+    )
+
+
+def _run_merge(args: argparse.Namespace) -> Any:
+    from .tools.commons.constants import SaveProfile
+    from .tools.pdfmerger._impl import pdfmerger
+
+    return pdfmerger(args.pdfs, args.output, SaveProfile(args.save_profile))
+
+
+def _add_pdf2images_parser(subparsers):
+    from .tools.commons.constants import DEFAULT_WORKER_COUNT
+    from .tools.pdf2images._constants import (
+        DuplicatePolicy,
+        ArchiveFormat,
+        DedupMode,
+        BlankPagePolicy,
+        ImageFormat,
+        CS_RGB,
+        CS_GRAY,
+        CS_CMYK,
+        DEFAULT_FILENAME_FORMAT,
+        DEFAULT_IMAGE_FORMAT,
+        DEFAULT_DUPLICATE_POLICY,
+        DEFAULT_ARCHIVE_FORMAT,
+        DEFAULT_PAGE_RANGES,
+        DEFAULT_DPI,
+        DEFAULT_ROTATION,
+        DEFAULT_COLORSPACE,
+        DEFAULT_PNG_COMPRESS_LEVEL,
+        DEFAULT_QUALITY,
+        DEFAULT_ENCODER_THREADS,
+        DEFAULT_RASTER_MEMORY_LIMIT,
+        DEFAULT_DEDUP,
+        DEFAULT_BLANK_PAGE_POLICY,
+        DEFAULT_BLANK_THRESHOLD,
+    )
+
+    parser = subparsers.add_parser(
+        "pdf2images",
+        help="render the pages of PDF files to images",
+        description="Render the pages of PDF files to images. A single file is converted on its own, several files, "
+        "directories or glob patterns are scheduled on one worker pool.",
+    )
+    parser.add_argument("inputs", nargs="+", help="PDF files, directories or globs")
+    parser.add_argument(
+        "-o",
+        "--output-dir",
+        default=None,
+        help="output directory, variables such as $indir and $instem are expanded",
+    )
+    parser.add_argument("-f", "--filename-format", default=DEFAULT_FILENAME_FORMAT)
+    parser.add_argument(
+        "--image-format",
+        choices=[image_format.value for image_format in ImageFormat],
+        default=DEFAULT_IMAGE_FORMAT.value,
+    )
+    parser.add_argument(
+        "--profile",
+        action="append",
+        default=[],
+        help="extra render profile '<dpi> <filename_format> [<image_format>]', can be repeated",
+    )
+    parser.add_argument(
+        "--duplicate-policy",
+        choices=[policy.value for policy in DuplicatePolicy],
+        default=DEFAULT_DUPLICATE_POLICY.value,
+    )
+    parser.add_argument(
+        "--archive",
+        choices=[archive_format.value for archive_format in ArchiveFormat],
+        default=DEFAULT_ARCHIVE_FORMAT.value,
+        help="write the pages of each file into one archive <output-dir>/<instem>.zip|tar, "
+        "a partial archive is resumed unless the duplicate policy is overwrite",
+    )
+    parser.add_argument("-p", "--pages", default=DEFAULT_PAGE_RANGES)
+    parser.add_argument("--dpi", type=int, default=DEFAULT_DPI)
+    parser.add_argument("--alpha", action="store_true")
+    parser.add_argument("--rotation", type=int, default=DEFAULT_ROTATION)
+    parser.add_argument(
+        "--colorspace", choices=[CS_RGB, CS_GRAY, CS_CMYK], default=DEFAULT_COLORSPACE
+    )
+    parser.add_argument("--no-annots", action="store_true")
+    parser.add_argument(
+        "--png-compress-level", type=int, default=DEFAULT_PNG_COMPRESS_LEVEL
+    )
+    parser.add_argument("--quality", type=int, default=DEFAULT_QUALITY)
+    parser.add_argument("--encoder-threads", type=int, default=DEFAULT_ENCODER_THREADS)
+    parser.add_argument(
+        "--raster-memory-limit",
+        type=int,
+        default=DEFAULT_RASTER_MEMORY_LIMIT,
+        help="in MB, larger pages are rendered in tiles, 0 for no limit",
+    )
+    parser.add_argument(
+        "--dedup",
+        choices=[mode.value for mode in DedupMode],
+        default=DEFAULT_DEDUP.value,
+        help="write identical pages once, found by their content or by their raster",
+    )
+    parser.add_argument(
+        "--dedup-mapping-only",
+        dest="dedup_hardlink",
+        action="store_false",
+        help="record duplicates in dedup.json only, instead of hardlinking them",
+    )
+    parser.add_argument(
+        "--blank-pages",
+        choices=[policy.value for policy in BlankPagePolicy],
+        default=DEFAULT_BLANK_PAGE_POLICY.value,
+        help="probe pages at low resolution, flag or skip the blank ones",
+    )
+    parser.add_argument(
+        "--blank-threshold",
+        type=float,
+        default=DEFAULT_BLANK_THRESHOLD,
+        help="ink coverage (%%) up to which a page is blank",
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKER_COUNT,
+        help="number of workers, 0 to choose it from the available memory",
+    )
+    parser.add_argument(
+        "-r", "--recursive", action="store_true", help="search directories recursively"
+    )
+    parser.set_defaults(run=_run_pdf2images)
+    return parser
+
+
+def _add_save_profile_argument(parser: argparse.ArgumentParser, default: Any):
+    from .tools.commons.constants import SaveProfile
+
+    parser.add_argument(
+        "--save-profile",
+        choices=[profile.value for profile in SaveProfile],
+        default=default.value,
+        help="how the output PDF is saved: as it is, with unused objects removed and streams compressed, "
+        "or with duplicates merged too",
+    )
+
+
+def _add_images2pdf_parser(subparsers):
+    from .tools.commons.constants import DEFAULT_WORKER_COUNT, DEFAULT_SAVE_PROFILE
+    from .tools.images2pdf._constants import (
+        PageSize,
+        ColorMode,
+        DEFAULT_MEMORY_LIMIT,
+        DEFAULT_PAGE_SIZE,
+        DEFAULT_TARGET_DPI,
+        DEFAULT_QUALITY,
+        DEFAULT_COLOR_MODE,
+    )
+
+    parser = subparsers.add_parser(
+        "images2pdf", help="put images into a PDF, one image per page"
+    )
+    parser.add_argument("images", nargs="+", help="image files, in page order")
+    parser.add_argument("-o", "--output", required=True, help="output PDF file")
+    parser.add_argument(
+        "--overwrite", action="store_true", help="replace the output file if it exists"
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKER_COUNT,
+        help="number of workers",
+    )
+    parser.add_argument(
+        "--memory-limit",
+        type=int,
+        default=DEFAULT_MEMORY_LIMIT,
+        help="in MB, workers pause while the converted images not merged yet exceed it, 0 for no limit",
+    )
+    parser.add_argument(
+        "--page-size",
+        choices=[page_size.value for page_size in PageSize],
+        default=DEFAULT_PAGE_SIZE.value,
+        help="fit the images into pages of this size, centered, landscape for landscape images",
+    )
+    parser.add_argument(
+        "--target-dpi",
+        type=int,
+        default=DEFAULT_TARGET_DPI,
+        help="downsample the images above this resolution on their page, 0 to keep them",
+    )
+    parser.add_argument(
+        "--quality",
+        type=int,
+        default=DEFAULT_QUALITY,
+        help="JPEG quality of the downsampled or converted images",
+    )
+    parser.add_argument(
+        "--color-mode",
+        choices=[color_mode.value for color_mode in ColorMode],
+        default=DEFAULT_COLOR_MODE.value,
+        help="convert the images to gray, or to black and white (fax compressed)",
+    )
+    _add_save_profile_argument(parser, DEFAULT_SAVE_PROFILE)
+    parser.set_defaults(run=_run_images2pdf)
+    return parser
+
+
+def _add_merge_parser(subparsers):
+    from .tools.commons.constants import SaveProfile
+
+    parser = subparsers.add_parser("merge", help="merge PDF files into one")
+    parser.add_argument("pdfs", nargs="+", help="PDF files, in order")
+    parser.add_argument("-o", "--output", default="merged.pdf", help="output PDF file")
+    # as fast as before by default, the pages are copied as they are
+    _add_save_profile_argument(parser, SaveProfile.Fast)
+    parser.set_defaults(run=_run_merge)
+    return parser
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="pdftoolkit",
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    subparsers = parser.add_subparsers(dest="tool", required=True)
+    for add_parser in (
+        _add_pdf2images_parser,
+        _add_images2pdf_parser,
+        _add_merge_parser,
+    ):
+        subparser = add_parser(subparsers)
+        subparser.add_argument(
+            "-q",
+            "--quiet",
+            dest="verbose",
+            action="store_false",
+            help="do not report the messages of the tool, only the events",
+        )
+    return parser
+
+
+def _install_signal_handlers(cancel: Callable[[], None]):
+    def _handler(_signum, _frame):
+        cancel()
+
+    signal.signal(signal.SIGINT, _handler)
+    signal.signal(signal.SIGTERM, _handler)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    reporter = JsonReporter(sys.stdout, messages=args.verbose)
+    previous_reporter = set_reporter(reporter)
+    _install_signal_handlers(reporter.cancel)
+
+    reporter.write("start", tool=args.tool)
+    try:
+        result = args.run(args)
+    except ParameterError as e:
+        reporter.write(
+            "error",
+            type=type(e).__name__,
+            parameter=e.parameter_name,
+            message=e.message,
+        )
+        return EXIT_PARAMETER_ERROR
+    except Exception as e:
+        reporter.write("error", type=type(e).__name__, parameter=None, message=str(e))
+        return EXIT_ERROR
+    finally:
+        from .tools.commons.worker_pool import shutdown_worker_pool
+
+        shutdown_worker_pool()
+        set_reporter(previous_reporter)
+
+    cancelled = reporter.is_cancelled()
+    reporter.write("result", tool=args.tool, cancelled=cancelled, result=result)
+    return EXIT_CANCELLED if cancelled else EXIT_OK
+
+
+if __name__ == "__main__":
+    sys.exit(main())
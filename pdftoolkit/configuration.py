@@ -1,6 +1,7 @@
 """
 This module contains the implementation of the AppConfig class, which is used to store and retrieve application
-configurations. A global instance of AppConfig is created in this module and can be accessed anywhere in the code.
+configurations. A global instance of AppConfig is loaded from the config file on first use and can be accessed anywhere in
+the code with `global_config()`.
 
 @author: zimolab
 @created: 2024-12-11
@@ -97,4 +98,19 @@ def get_language_map(user_lang_map: dict[str, str]) -> dict[str, str]:
     return lang_map
 
 
-GlobalConfig = AppConfig.load()
+_global_config: AppConfig | None = None
+
+
+def global_config() -> AppConfig:
+    """Return the configuration of the application, it is loaded from the config file on first call."""
+    global _global_config
+    if _global_config is None:
+        _global_config = AppConfig.load()
+    return _global_config
+
+
+def __getattr__(name: str):
+    # `GlobalConfig` was created on import, it is now loaded on first access
+    if name == "GlobalConfig":
+        return global_config()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,30 +1,76 @@
-from py_multitasking import Event, TaskContext
+"""
+The helpers shared by the tools.
 
-from .workloads_distributor import distribute_evenly
-from .page_iterator import (
-    PageIterator,
-    ALL_PAGES,
-    ODD_PAGES,
-    EVEN_PAGES,
-    LAST_PAGE,
-    InvalidPageRangeError,
-)
-from .name_generator import NameGenerator, FilterFunc
+The names below are imported from their modules on first access, so that importing a light module of this package
+(such as `winconf` or `constants`, which the GUI needs at startup) does not load pymupdf and py_multitasking.
+"""
 
+import importlib
+from typing import TYPE_CHECKING, Any
 
-def check_cancel_event(ctx: TaskContext | None) -> bool:
+if TYPE_CHECKING:
+    from py_multitasking import TaskContext
+
+    from .workloads_distributor import distribute_evenly
+    from .scheduler import (
+        suggest_batch_size,
+        split_into_batches,
+        feed_batches,
+        iter_batches,
+        dispatch_batches,
+    )
+    from .page_iterator import PageIterator, InvalidPageRangeError
+    from .constants import ALL_PAGES, ODD_PAGES, EVEN_PAGES, LAST_PAGE, SaveProfile
+    from .name_generator import NameGenerator, CompiledNameTemplate, FilterFunc
+    from .collector import iter_outputs
+    from .timing import StageTimer, merge_samples, summarize, format_summary
+    from .flow_control import ByteBudget
+    from .transport import Payload, PayloadSender, PayloadTransport
+    from .save_profiles import save_document
+
+# name -> module it is imported from
+_LAZY_EXPORTS = {
+    "distribute_evenly": ".workloads_distributor",
+    "suggest_batch_size": ".scheduler",
+    "split_into_batches": ".scheduler",
+    "feed_batches": ".scheduler",
+    "iter_batches": ".scheduler",
+    "dispatch_batches": ".scheduler",
+    "PageIterator": ".page_iterator",
+    "InvalidPageRangeError": ".page_iterator",
+    "ALL_PAGES": ".constants",
+    "ODD_PAGES": ".constants",
+    "EVEN_PAGES": ".constants",
+    "LAST_PAGE": ".constants",
+    "SaveProfile": ".constants",
+    "save_document": ".save_profiles",
+    "NameGenerator": ".name_generator",
+    "CompiledNameTemplate": ".name_generator",
+    "FilterFunc": ".name_generator",
+    "iter_outputs": ".collector",
+    "StageTimer": ".timing",
+    "merge_samples": ".timing",
+    "summarize": ".timing",
+    "format_summary": ".timing",
+    "ByteBudget": ".flow_control",
+    "Payload": ".transport",
+    "PayloadSender": ".transport",
+    "PayloadTransport": ".transport",
+}
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_EXPORTS.get(name, None)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    # later accesses do not go through __getattr__()
+    globals()[name] = value
+    return value
+
+
+def check_cancel_event(ctx: "TaskContext | None") -> bool:
     return ctx is not None and ctx.has_cancel_event() and ctx.is_cancel_event_set()
 
 
-__all__ = [
-    "distribute_evenly",
-    "PageIterator",
-    "ALL_PAGES",
-    "ODD_PAGES",
-    "EVEN_PAGES",
-    "LAST_PAGE",
-    "InvalidPageRangeError",
-    "NameGenerator",
-    "FilterFunc",
-    "check_cancel_event",
-]
+__all__ = [*_LAZY_EXPORTS, "check_cancel_event"]
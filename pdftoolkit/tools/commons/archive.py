@@ -0,0 +1,263 @@
+"""
+This module contains streaming writers of ZIP and TAR archives, for the tools which output many small files.
+
+Writing one archive instead of thousands of files saves the metadata operations of the file system (which are slow on
+network shares), and moving or copying the output later. Entries are appended one by one by a single writer, and
+stored without compression: the images written by the tools are compressed already, and the writer has to keep up with
+all the workers.
+
+An interrupted writer leaves a partial archive behind. With `resume=True`, the complete entries of an existing archive
+are recovered, the incomplete tail is truncated, and new entries are appended after the recovered ones. A ZIP archive
+is recovered by scanning the headers of its entries, so that the central directory, which is written at the end, is not
+needed. `names` holds the names of the entries the archive already has.
+"""
+
+import io
+import os
+import shutil
+import struct
+import tarfile
+import time
+import zipfile
+from pathlib import Path
+
+# the file mode of the entries
+_ENTRY_MODE = 0o644
+_COPY_BUFFER_SIZE = 1024 * 1024
+
+# signature, version, flags, method, time, date, crc, compressed size, size, name length, extra length
+_ZIP_LOCAL_HEADER = struct.Struct("<4sHHHHHIIIHH")
+_ZIP_LOCAL_HEADER_SIGNATURE = b"PK\x03\x04"
+_ZIP_FLAG_DATA_DESCRIPTOR = 0x08
+_ZIP_FLAG_UTF8 = 0x800
+_ZIP64_EXTRA_ID = 0x0001
+_ZIP64_SIZE_MARK = 0xFFFFFFFF
+
+
+class ArchiveWriter(object):
+    def __init__(self, filepath: Path | str):
+        self._filepath = Path(filepath)
+        self.names: set[str] = set()
+
+    @property
+    def filepath(self) -> Path:
+        return self._filepath
+
+    def add(self, name: str, data: bytes | memoryview):
+        """Append an entry with the data."""
+        raise NotImplementedError()
+
+    def add_file(self, name: str, filepath: Path | str):
+        """Append an entry with the content of the file, which is copied in chunks."""
+        raise NotImplementedError()
+
+    def close(self):
+        raise NotImplementedError()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def _zip64_sizes(extra: bytes) -> tuple[int, int] | None:
+    # (size, compressed size) in the zip64 extra field of a local header
+    offset = 0
+    while offset + 4 <= len(extra):
+        field_id, field_size = struct.unpack_from("<HH", extra, offset)
+        if field_id == _ZIP64_EXTRA_ID and field_size >= 16:
+            return struct.unpack_from("<QQ", extra, offset + 4)
+        offset += 4 + field_size
+    return None
+
+
+def _scan_zip(filepath: Path) -> tuple[list[zipfile.ZipInfo], int]:
+    """
+    Return the complete entries of a (partial) ZIP archive written by `ZipArchiveWriter` and the offset where they end.
+    `zipfile` writes the sizes into the header of an entry once its data is written, an entry whose header is not
+    updated yet has no compressed size.
+    """
+    entries = []
+    end = 0
+    file_size = filepath.stat().st_size
+    with open(filepath, "rb") as file:
+        while True:
+            file.seek(end)
+            header = file.read(_ZIP_LOCAL_HEADER.size)
+            if len(header) < _ZIP_LOCAL_HEADER.size:
+                break
+            (
+                signature,
+                _,
+                flags,
+                method,
+                dos_time,
+                dos_date,
+                crc,
+                compress_size,
+                size,
+                name_length,
+                extra_length,
+            ) = _ZIP_LOCAL_HEADER.unpack(header)
+            if (
+                signature != _ZIP_LOCAL_HEADER_SIGNATURE
+                or method != zipfile.ZIP_STORED
+                or flags & _ZIP_FLAG_DATA_DESCRIPTOR
+            ):
+                # the central directory, or not written by us
+                break
+            name = file.read(name_length)
+            extra = file.read(extra_length)
+            if len(name) < name_length or len(extra) < extra_length:
+                break
+            if size == _ZIP64_SIZE_MARK or compress_size == _ZIP64_SIZE_MARK:
+                sizes = _zip64_sizes(extra)
+                if sizes is None:
+                    break
+                size, compress_size = sizes
+            data_offset = end + _ZIP_LOCAL_HEADER.size + name_length + extra_length
+            if compress_size != size or data_offset + size > file_size:
+                # interrupted while its data was written
+                break
+            entry = zipfile.ZipInfo(
+                name.decode("utf-8" if flags & _ZIP_FLAG_UTF8 else "cp437"),
+                date_time=(
+                    (dos_date >> 9) + 1980,
+                    (dos_date >> 5) & 0x0F,
+                    dos_date & 0x1F,
+                    dos_time >> 11,
+                    (dos_time >> 5) & 0x3F,
+                    (dos_time & 0x1F) * 2,
+                ),
+            )
+            entry.header_offset = end
+            entry.flag_bits = flags
+            entry.compress_type = zipfile.ZIP_STORED
+            entry.CRC = crc
+            entry.compress_size = compress_size
+            entry.file_size = size
+            entry.extra = extra
+            entry.external_attr = _ENTRY_MODE << 16
+            entries.append(entry)
+            end = data_offset + size
+    return entries, end
+
+
+class ZipArchiveWriter(ArchiveWriter):
+    def __init__(self, filepath: Path | str, resume: bool = False):
+        super().__init__(filepath)
+        entries = []
+        if resume and self._filepath.is_file():
+            entries, end = _scan_zip(self._filepath)
+            self._file = open(self._filepath, "r+b")
+            # the central directory is written again when the archive is closed
+            self._file.truncate(end)
+            self._file.seek(end)
+        else:
+            self._file = open(self._filepath, "wb")
+        try:
+            self._zip = zipfile.ZipFile(
+                self._file, "w", compression=zipfile.ZIP_STORED, allowZip64=True
+            )
+        except Exception:
+            self._file.close()
+            raise
+        for entry in entries:
+            self._zip.filelist.append(entry)
+            self._zip.NameToInfo[entry.filename] = entry
+            self.names.add(entry.filename)
+
+    def _entry(self, name: str, size: int) -> zipfile.ZipInfo:
+        entry = zipfile.ZipInfo(name, date_time=time.localtime()[:6])
+        entry.compress_type = zipfile.ZIP_STORED
+        entry.external_attr = _ENTRY_MODE << 16
+        entry.file_size = size
+        return entry
+
+    def add(self, name: str, data: bytes | memoryview):
+        self._zip.writestr(self._entry(name, len(data)), data)
+        self.names.add(name)
+
+    def add_file(self, name: str, filepath: Path | str):
+        size = os.path.getsize(filepath)
+        # an entry larger than 4GB needs a zip64 header, which cannot be added afterward
+        force_zip64 = size * 1.05 > zipfile.ZIP64_LIMIT
+        with open(filepath, "rb") as source, self._zip.open(
+            self._entry(name, size), "w", force_zip64=force_zip64
+        ) as dest:
+            shutil.copyfileobj(source, dest, _COPY_BUFFER_SIZE)
+        self.names.add(name)
+
+    def close(self):
+        # the file was passed to ZipFile, which does not close it
+        try:
+            self._zip.close()
+        finally:
+            self._file.close()
+
+
+def _scan_tar(filepath: Path) -> tuple[set[str], int]:
+    # return the names of the complete members of a (partial) TAR archive and the offset where they end
+    names = set()
+    end = 0
+    file_size = filepath.stat().st_size
+    try:
+        with tarfile.open(filepath, "r:") as tar:
+            for member in tar:
+                blocks, remainder = divmod(member.size, tarfile.BLOCKSIZE)
+                member_end = (
+                    member.offset_data + (blocks + (remainder > 0)) * tarfile.BLOCKSIZE
+                )
+                if member_end > file_size:
+                    break
+                names.add(member.name)
+                end = member_end
+    except tarfile.TarError:
+        # a truncated header, the members before it are kept
+        pass
+    return names, end
+
+
+class TarArchiveWriter(ArchiveWriter):
+    def __init__(self, filepath: Path | str, resume: bool = False):
+        super().__init__(filepath)
+        if resume and self._filepath.is_file():
+            self.names, end = _scan_tar(self._filepath)
+            self._file = open(self._filepath, "r+b")
+            # the end-of-archive blocks are written again when the archive is closed
+            self._file.truncate(end)
+            self._file.seek(end)
+        else:
+            self._file = open(self._filepath, "wb")
+        try:
+            # appends at the current position of the file
+            self._tar = tarfile.open(
+                fileobj=self._file, mode="w", format=tarfile.PAX_FORMAT
+            )
+        except Exception:
+            self._file.close()
+            raise
+
+    def _member(self, name: str, size: int) -> tarfile.TarInfo:
+        member = tarfile.TarInfo(name)
+        member.size = size
+        member.mtime = int(time.time())
+        member.mode = _ENTRY_MODE
+        return member
+
+    def add(self, name: str, data: bytes | memoryview):
+        self._tar.addfile(self._member(name, len(data)), io.BytesIO(data))
+        self.names.add(name)
+
+    def add_file(self, name: str, filepath: Path | str):
+        with open(filepath, "rb") as source:
+            self._tar.addfile(self._member(name, os.path.getsize(filepath)), source)
+        self.names.add(name)
+
+    def close(self):
+        # the file was passed to TarFile, which does not close it
+        try:
+            self._tar.close()
+        finally:
+            self._file.close()
@@ -0,0 +1,60 @@
+"""
+This module contains a blocking, event-driven way to collect the outputs of the tasks in a session.
+
+Polling the output queue with `read_output_until_empty(block=False)` in a tight loop keeps one core busy doing nothing
+but asking the manager process for new items, and that core is taken away from the workers. `iter_outputs()` instead
+blocks on the output queue and only wakes up when an output arrives, when a task completes (a done callback of each
+task puts a marker into the queue) or, at most every `cancel_check_interval` seconds, to check for cancellation.
+"""
+
+from concurrent.futures import CancelledError, Future
+from functools import partial
+from typing import Any, Callable, Generator
+
+from py_multitasking import TaskSession, Queue
+
+DEFAULT_CANCEL_CHECK_INTERVAL = 0.1
+
+
+class _TaskDone(object):
+    """A marker put into the output queue when a task of the session completes."""
+
+    pass
+
+
+def _notify_task_done(output_queue: Queue, _: Future):
+    output_queue.put(_TaskDone())
+
+
+def iter_outputs(
+    session: TaskSession,
+    is_cancelled: Callable[[], bool] | None = None,
+    cancel_check_interval: float = DEFAULT_CANCEL_CHECK_INTERVAL,
+) -> Generator[Any, None, None]:
+    """
+    Yield the outputs of the tasks in the session as they arrive, until all tasks are done and their outputs are
+    consumed. The tasks must write to the session output queue. Raise `CancelledError` when `is_cancelled()` returns
+    True, the tasks are not cancelled here, that is left to the caller.
+    """
+    output_queue = session.session_output_queue
+    tasks = session.get_tasks()
+    pending = len(tasks)
+    for task in tasks:
+        task.future.add_done_callback(partial(_notify_task_done, output_queue))
+
+    ctx = session.context
+    while pending > 0:
+        if is_cancelled is not None and is_cancelled():
+            raise CancelledError()
+        output, is_empty = ctx.read_output(block=True, timeout=cancel_check_interval)
+        if is_empty:
+            continue
+        if isinstance(output, _TaskDone):
+            pending -= 1
+            continue
+        yield output
+
+    # a task writes all its outputs before it completes, so nothing should be left here, just in case
+    for output in ctx.read_output_until_empty(block=False):
+        if not isinstance(output, _TaskDone):
+            yield output
@@ -0,0 +1,41 @@
+"""
+This module contains the constants and the default values of the common parameters. Unlike `paramconf`, it does not
+import the widgets of pyguiadapter (and Qt), so the tool implementations can use it in a headless process.
+"""
+
+import enum
+
+from ...utils import cpu_count
+
+
+class SaveProfile(enum.Enum):
+    """How an output PDF is saved, see `save_profiles`."""
+
+    # written as it is, as fast as possible
+    Fast = "fast"
+    # unused objects removed, uncompressed streams compressed
+    Balanced = "balanced"
+    # duplicate objects and streams merged too, takes the longest
+    Smallest = "smallest"
+
+
+# Page range keywords, see `page_iterator.PageIterator`
+ODD_PAGES = "ODD"
+EVEN_PAGES = "EVEN"
+ALL_PAGES = "ALL"
+LAST_PAGE = "N"
+
+# Some constants used in common parameter configurations
+MIN_WORKER_COUNT = 1
+MAX_WORKER_COUNT = cpu_count(MIN_WORKER_COUNT)
+
+# Common parameter default values
+# constant name format: DEFAULT_<param_name_in_uppercase>
+# default value of parameter 'worker_count'
+DEFAULT_WORKER_COUNT = MIN_WORKER_COUNT
+# default value of parameter 'verbose'
+DEFAULT_VERBOSE = True
+# default value of parameter 'open_output_dir'
+DEFAULT_OPEN_OUTPUT_DIR = True
+# default value of parameter 'save_profile'
+DEFAULT_SAVE_PROFILE = SaveProfile.Balanced
@@ -2,6 +2,7 @@ VARNAME_CUR_PAGE = "page"
 VARNAME_TOTAL = "total"
 VARNAME_CUR_INDEX = "i"
 VARNAME_INPUT_FILENAME = "infile"
+VARNAME_INPUT_FILE_STEM = "instem"
 VARNAME_INPUT_FILE_DIR = "indir"
 VARNAME_CWD_DIR = "cwd"
 
@@ -10,6 +11,7 @@ VARIABLES = {
     VARNAME_TOTAL: -1,
     VARNAME_CUR_INDEX: -1,
     VARNAME_INPUT_FILENAME: "",
+    VARNAME_INPUT_FILE_STEM: "",
     VARNAME_INPUT_FILE_DIR: "",
     VARNAME_CWD_DIR: "",
 }
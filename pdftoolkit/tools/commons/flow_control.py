@@ -0,0 +1,75 @@
+"""
+This module contains a byte budget, to bound the memory held by the outputs which the workers produced but the parent
+has not consumed yet.
+
+Without it, fast workers and a slow parent (or a few huge items) make these outputs pile up without limit. With it, a
+worker acquires the size of each output before it goes on, and waits while the outputs in flight exceed the budget.
+The parent releases them once consumed. The parent consumes in order, so an output it is waiting for must never wait
+itself: an output at or before the position the parent has reached (the head) is always admitted. So is an output
+when nothing is in flight, however large it is.
+"""
+
+from typing import Any, Callable, MutableMapping
+
+from .worker_pool import WorkerPool
+
+DEFAULT_WAIT_INTERVAL = 0.1
+
+_INFLIGHT = "inflight"
+_HEAD = "head"
+
+
+class ByteBudget(object):
+    """
+    A budget shared by the workers and the parent of a run. The state lives in the manager process, each call is a few
+    round trips to it, so acquire the size of an item, not of each of its parts.
+    """
+
+    def __init__(self, limit: int, condition: Any, state: MutableMapping[str, int]):
+        self._limit = limit
+        self._condition = condition
+        self._state = state
+
+    @classmethod
+    def create(cls, manager: WorkerPool, limit: int) -> "ByteBudget":
+        state = manager.create_dict()
+        state.update({_INFLIGHT: 0, _HEAD: 0})
+        return cls(limit, manager.create_condition(), state)
+
+    @property
+    def limit(self) -> int:
+        return self._limit
+
+    def _admissible(self, size: int, position: int) -> bool:
+        inflight = self._state[_INFLIGHT]
+        return (
+            inflight <= 0
+            or inflight + size <= self._limit
+            or position <= self._state[_HEAD]
+        )
+
+    def acquire(
+        self,
+        size: int,
+        position: int,
+        is_cancelled: Callable[[], bool] | None = None,
+        wait_interval: float = DEFAULT_WAIT_INTERVAL,
+    ) -> bool:
+        """
+        Wait until `size` bytes at `position` fit into the budget, then acquire them. Return False if cancelled while
+        waiting, nothing is acquired then.
+        """
+        with self._condition:
+            while not self._admissible(size, position):
+                if is_cancelled is not None and is_cancelled():
+                    return False
+                self._condition.wait(wait_interval)
+            self._state[_INFLIGHT] += size
+        return True
+
+    def release(self, size: int, head: int):
+        """Give back `size` bytes consumed by the parent, which has reached `head`, and wake up the waiting workers."""
+        with self._condition:
+            self._state[_INFLIGHT] -= size
+            self._state[_HEAD] = head
+            self._condition.notify_all()
@@ -0,0 +1,139 @@
+"""
+This module contains helpers to size the work of a run by the memory of the system.
+
+`available_memory()` reads the memory which can be used without swapping (MemAvailable on Linux, capped by the limit of
+the cgroup if there is one, the available physical memory on Windows and macOS). `fit_worker_count()` then tells how
+many workers, each of them using about a given amount of memory at its peak, fit into it.
+"""
+
+import ctypes
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+MB = 1024 * 1024
+# leave some memory to the rest of the system (and to the GUI)
+DEFAULT_MEMORY_BUDGET_RATIO = 0.8
+
+_CGROUP_V2_DIR = Path("/sys/fs/cgroup")
+_CGROUP_V1_DIR = Path("/sys/fs/cgroup/memory")
+
+
+def _read_int(filepath: Path) -> int | None:
+    try:
+        return int(filepath.read_text().strip())
+    except (OSError, ValueError):
+        # missing file, or "max" for an unlimited cgroup
+        return None
+
+
+def _linux_meminfo_available() -> int | None:
+    try:
+        with open("/proc/meminfo", "r") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def _linux_cgroup_available() -> int | None:
+    # a container may be given much less memory than the host has
+    for limit_file, usage_file in (
+        (_CGROUP_V2_DIR / "memory.max", _CGROUP_V2_DIR / "memory.current"),
+        (
+            _CGROUP_V1_DIR / "memory.limit_in_bytes",
+            _CGROUP_V1_DIR / "memory.usage_in_bytes",
+        ),
+    ):
+        limit = _read_int(limit_file)
+        usage = _read_int(usage_file)
+        # cgroup v1 reports a huge number when there is no limit
+        if limit is not None and usage is not None and limit < (1 << 60):
+            return max(limit - usage, 0)
+    return None
+
+
+def _windows_available() -> int | None:
+    class MemoryStatusEx(ctypes.Structure):
+        _fields_ = [
+            ("dwLength", ctypes.c_ulong),
+            ("dwMemoryLoad", ctypes.c_ulong),
+            ("ullTotalPhys", ctypes.c_ulonglong),
+            ("ullAvailPhys", ctypes.c_ulonglong),
+            ("ullTotalPageFile", ctypes.c_ulonglong),
+            ("ullAvailPageFile", ctypes.c_ulonglong),
+            ("ullTotalVirtual", ctypes.c_ulonglong),
+            ("ullAvailVirtual", ctypes.c_ulonglong),
+            ("ullAvailExtendedVirtual", ctypes.c_ulonglong),
+        ]
+
+    status = MemoryStatusEx()
+    status.dwLength = ctypes.sizeof(MemoryStatusEx)
+    try:
+        # noinspection PyUnresolvedReferences
+        if not ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)):
+            return None
+    except (AttributeError, OSError):
+        return None
+    return status.ullAvailPhys
+
+
+def _macos_available() -> int | None:
+    # free, inactive and speculative pages can be used without swapping
+    try:
+        output = subprocess.run(
+            ["vm_stat"], capture_output=True, text=True, timeout=5
+        ).stdout
+    except (OSError, subprocess.SubprocessError):
+        return None
+    lines = output.splitlines()
+    if not lines or "page size of" not in lines[0]:
+        return None
+    try:
+        page_size = int(lines[0].split("page size of")[1].split()[0])
+        pages = 0
+        for line in lines[1:]:
+            name, _, value = line.partition(":")
+            if name in ("Pages free", "Pages inactive", "Pages speculative"):
+                pages += int(value.strip().rstrip("."))
+    except (IndexError, ValueError):
+        return None
+    return pages * page_size
+
+
+def available_memory() -> int | None:
+    """Return the memory available to new processes in bytes, None if it cannot be determined."""
+    if sys.platform.startswith("linux"):
+        candidates = [_linux_meminfo_available(), _linux_cgroup_available()]
+        candidates = [candidate for candidate in candidates if candidate is not None]
+        return min(candidates) if candidates else None
+    if sys.platform == "win32":
+        return _windows_available()
+    if sys.platform == "darwin":
+        return _macos_available()
+    try:
+        return os.sysconf("SC_AVPHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (AttributeError, ValueError, OSError):
+        return None
+
+
+def fit_worker_count(
+    worker_memory: int,
+    max_workers: int,
+    available: int | None = None,
+    budget_ratio: float = DEFAULT_MEMORY_BUDGET_RATIO,
+) -> int:
+    """
+    Return how many workers, each of them using about `worker_memory` bytes at its peak, fit into the available memory
+    (`budget_ratio` of it), between 1 and `max_workers`. If the available memory is unknown, `max_workers` is returned.
+    """
+    max_workers = max(max_workers, 1)
+    if available is None:
+        available = available_memory()
+    if available is None or worker_memory <= 0:
+        return max_workers
+    worker_count = int(available * budget_ratio) // worker_memory
+    return min(max(worker_count, 1), max_workers)
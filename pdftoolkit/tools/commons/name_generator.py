@@ -1,11 +1,87 @@
+import functools
 import inspect
 import os
 from string import Template
-from typing import Dict, Any, Callable, Union, Mapping
+from typing import Dict, Any, Callable, Union, Mapping, Iterable, List
 
 FilterFunc = Callable[[Dict[str, Any]], str]
 
 
+@functools.lru_cache(maxsize=None)
+def _accepts_context(func: Callable) -> bool:
+    signature = inspect.signature(func)
+    return len(signature.parameters) != 0
+
+
+def _callable_accepts_context(func: Callable) -> bool:
+    try:
+        return _accepts_context(func)
+    except TypeError:
+        # unhashable callable, cannot be cached
+        return len(inspect.signature(func).parameters) != 0
+
+
+class CompiledNameTemplate(object):
+    """
+    A name pattern parsed once. It knows which variables it references, so only these variables are evaluated (and
+    looked up in the system environment) when a name is generated, instead of the whole context of the generator.
+    """
+
+    def __init__(self, generator: "NameGenerator", name_pattern: str, safe: bool):
+        self._generator = generator
+        self._template = Template(name_pattern)
+        self._safe = safe
+        self._varnames = tuple(dict.fromkeys(self._template.get_identifiers()))
+
+    @property
+    def varnames(self) -> tuple[str, ...]:
+        return self._varnames
+
+    def _values(self, extra_context: Mapping[str, Any] | None) -> Dict[str, Any]:
+        # noinspection PyProtectedMember
+        context = self._generator._context
+        sys_env = self._generator._sys_env
+        full_context = None
+        values = {}
+        for varname in self._varnames:
+            # system environment variables take precedence, as in NameGenerator.generate()
+            if sys_env and varname in os.environ:
+                values[varname] = os.environ[varname]
+                continue
+            if extra_context and varname in extra_context:
+                value = extra_context[varname]
+            elif varname in context:
+                value = context[varname]
+            else:
+                continue
+            if callable(value):
+                if _callable_accepts_context(value):
+                    if full_context is None:
+                        full_context = {**context, **(extra_context or {})}
+                    value = value(full_context)
+                else:
+                    value = value()
+            values[varname] = value
+        return values
+
+    def generate(self, extra_context: Mapping[str, Any] | None = None) -> str:
+        """
+        Generate a name. Variables in `extra_context` override the ones of the same name in the context of the
+        generator, without modifying it.
+        """
+        values = self._values(extra_context)
+        if self._safe:
+            return self._template.safe_substitute(values)
+        else:
+            return self._template.substitute(values)
+
+    def generate_many(
+        self, extra_contexts: Iterable[Mapping[str, Any] | None]
+    ) -> List[str]:
+        """Generate a name for each of the extra contexts."""
+        return [self.generate(extra_context) for extra_context in extra_contexts]
+
+
 class NameGenerator(object):
     def __init__(
         self, context: Dict[str, Union[Any, FilterFunc]] = None, sys_env: bool = True
@@ -14,6 +90,7 @@ class NameGenerator(object):
             context = {}
         self._sys_env = sys_env
         self._context = {**context}
+        self._compiled: Dict[tuple[str, bool], CompiledNameTemplate] = {}
 
     def update_context(self, varname: str, value: Union[Any, FilterFunc]):
         self._context[varname] = value
@@ -21,35 +98,17 @@ class NameGenerator(object):
     def clear_context(self):
         self._context.clear()
 
-    @staticmethod
-    def _finalize_variable(
-        context: Dict[str, Any], value: Union[Any, FilterFunc]
-    ) -> Any:
-        if callable(value):
-            signature = inspect.signature(value)
-            if len(signature.parameters) == 0:
-                return value()
-            else:
-                return value(context)
-
-        return value
-
-    def _finalize_context(self) -> Dict[str, Any]:
-        context = self._context.copy()
-        for key, value in context.items():
-            context[key] = self._finalize_variable(context, value)
-        return context
-
-    def _get_sys_env(self) -> Mapping[str, str]:
-        if not self._sys_env:
-            return {}
-        return os.environ.copy()
+    def compile(self, name_pattern: str, safe: bool = True) -> CompiledNameTemplate:
+        """
+        Parse the name pattern once. The compiled template always uses the current context of this generator, so it
+        can be kept and reused after the context is updated.
+        """
+        key = (name_pattern, safe)
+        compiled = self._compiled.get(key, None)
+        if compiled is None:
+            compiled = CompiledNameTemplate(self, name_pattern, safe)
+            self._compiled[key] = compiled
+        return compiled
 
     def generate(self, name_pattern: str, safe: bool = True) -> str:
-        context = self._finalize_context()
-        sys_env = self._get_sys_env()
-        name_template = Template(name_pattern)
-        if safe:
-            return name_template.safe_substitute(context, **sys_env)
-        else:
-            return name_template.substitute(context, **sys_env)
+        return self.compile(name_pattern, safe).generate()
@@ -1,9 +1,6 @@
 from pymupdf import Document, Page
 
-ODD_PAGES = "ODD"
-EVEN_PAGES = "EVEN"
-ALL_PAGES = "ALL"
-LAST_PAGE = "N"
+from .constants import ODD_PAGES, EVEN_PAGES, ALL_PAGES, LAST_PAGE
 
 
 class InvalidPageRangeError(Exception):
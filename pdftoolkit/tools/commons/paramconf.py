@@ -9,14 +9,17 @@ This module contains some common stuffs related to parameter configurations,whic
 @created: 2024-12-13
 """
 
-from pyguiadapter.widgets import IntSpinBoxConfig, BoolBoxConfig
+from pyguiadapter.widgets import IntSpinBoxConfig, BoolBoxConfig, EnumSelectConfig
 
+from .constants import (
+    MIN_WORKER_COUNT,
+    MAX_WORKER_COUNT,
+    DEFAULT_WORKER_COUNT,
+    DEFAULT_VERBOSE,
+    DEFAULT_OPEN_OUTPUT_DIR,
+    DEFAULT_SAVE_PROFILE,
+)
 from ...translation import param_name_t, tools_t
-from ...utils import cpu_count
-
-# Some constants used in common parameter configurations
-MIN_WORKER_COUNT = 1
-MAX_WORKER_COUNT = cpu_count(MIN_WORKER_COUNT)
 
 # Common parameter group names
 # constant name format: PARAM_GROUP_<group_name_in_uppercase>
@@ -25,15 +28,6 @@ PARAM_GROUP_ADVANCED = tools_t(f"param_group_advanced")
 # group name of miscellaneous parameters
 PARAM_GROUP_MISC = tools_t(f"param_group_misc")
 
-# Common parameter default values
-# constant name format: DEFAULT_<param_name_in_uppercase>
-# default value of parameter 'worker_count'
-DEFAULT_WORKER_COUNT = MIN_WORKER_COUNT
-# default value of parameter 'verbose'
-DEFAULT_VERBOSE = True
-# default value of parameter 'open_output_dir'
-DEFAULT_OPEN_OUTPUT_DIR = True
-
 # Common parameter configurations
 # constant name format: PARAM_<param_name_in_uppercase>
 # configuration of parameter 'worker_count'
@@ -61,3 +55,9 @@ PARAM_OPEN_OUTPUT_DIR = BoolBoxConfig(
     false_text=tools_t("no"),
     group=PARAM_GROUP_MISC,
 )
+# configuration of parameter 'save_profile'
+PARAM_SAVE_PROFILE = EnumSelectConfig(
+    label=param_name_t("save_profile"),
+    default_value=DEFAULT_SAVE_PROFILE,
+    group=PARAM_GROUP_ADVANCED,
+)
@@ -0,0 +1,48 @@
+"""
+This module contains a bounded thread pool, which can be used to build a small pipeline inside a worker process.
+
+For example, a worker can rasterize pages on its own thread and hand the rasters to a few encoder/writer threads.
+Encoders that release the GIL (zlib, libjpeg, file I/O) then overlap with the next render. `submit()` blocks when
+`max_pending` jobs are already queued or running, which applies backpressure to the producer, so the number of
+rasters held in memory stays capped no matter how fast the producer is.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Callable, Any
+
+
+class BoundedThreadPool(object):
+    def __init__(
+        self, max_workers: int, max_pending: int | None = None, name: str = ""
+    ):
+        assert max_workers > 0, "invalid argument: max_workers <= 0"
+        if max_pending is None or max_pending < max_workers:
+            max_pending = max_workers
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=name
+        )
+        self._slots = threading.BoundedSemaphore(max_pending)
+
+    def submit(self, func: Callable[..., Any], *args, **kwargs) -> Future:
+        """Submit a job, block until there is a free slot."""
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(func, *args, **kwargs)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(self._release_slot)
+        return future
+
+    def _release_slot(self, _: Future):
+        self._slots.release()
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
+
+    def __enter__(self) -> "BoundedThreadPool":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown(wait=True)
@@ -0,0 +1,112 @@
+"""
+This module decouples the tools from the GUI.
+
+The tools report their progress, their messages and the result of each page through the functions here, and ask them
+whether they are cancelled. By default, everything goes to the window of pyguiadapter, which is imported on first use
+only, so that importing a tool does not start Qt. A headless front-end, such as the command line, installs its own
+`Reporter` with `set_reporter()`.
+"""
+
+from typing import Any
+
+
+class Reporter(object):
+    """Report to nowhere. Subclasses override what they can show."""
+
+    def show_progressbar(self, min_value: int, max_value: int):
+        pass
+
+    def update_progress(self, value: int):
+        pass
+
+    def hide_progressbar(self):
+        pass
+
+    def is_cancelled(self) -> bool:
+        return False
+
+    def print(self, *args, sep: str = " ", end: str = "\n", **kwargs):
+        pass
+
+    def event(self, name: str, **data: Any):
+        """A machine-readable event, such as the result of a page."""
+        pass
+
+
+class GUIReporter(Reporter):
+    """Forward to the current window of pyguiadapter, print to stdout if there is no window."""
+
+    @staticmethod
+    def _has_window() -> bool:
+        from pyguiadapter.adapter import ucontext
+
+        return ucontext.get_current_window() is not None
+
+    def show_progressbar(self, min_value: int, max_value: int):
+        if self._has_window():
+            from pyguiadapter.adapter import uprogress
+
+            uprogress.show_progressbar(min_value=min_value, max_value=max_value)
+
+    def update_progress(self, value: int):
+        if self._has_window():
+            from pyguiadapter.adapter import uprogress
+
+            uprogress.update_progress(value)
+
+    def hide_progressbar(self):
+        if self._has_window():
+            from pyguiadapter.adapter import uprogress
+
+            uprogress.hide_progressbar()
+
+    def is_cancelled(self) -> bool:
+        from pyguiadapter.adapter import ucontext
+
+        return ucontext.is_function_cancelled()
+
+    def print(self, *args, sep: str = " ", end: str = "\n", **kwargs):
+        from ...utils import pprint as _pprint
+
+        _pprint(*args, sep=sep, end=end, **kwargs)
+
+
+_reporter: Reporter = GUIReporter()
+
+
+def get_reporter() -> Reporter:
+    return _reporter
+
+
+def set_reporter(reporter: Reporter) -> Reporter:
+    """Install the reporter of the tools, return the previous one."""
+    global _reporter
+    previous = _reporter
+    _reporter = reporter
+    return previous
+
+
+def show_progressbar(min_value: int = 0, max_value: int = 100):
+    _reporter.show_progressbar(min_value, max_value)
+
+
+def update_progress(value: int):
+    _reporter.update_progress(value)
+
+
+def hide_progressbar():
+    _reporter.hide_progressbar()
+
+
+def is_function_cancelled() -> bool:
+    return _reporter.is_cancelled()
+
+
+def pprint(*args, sep: str = " ", end: str = "\n", verbose: bool = True, **kwargs):
+    """Print a message of a tool, like `utils.pprint()`, if `verbose` is True."""
+    if verbose:
+        _reporter.print(*args, sep=sep, end=end, **kwargs)
+
+
+def report(name: str, **data: Any):
+    _reporter.event(name, **data)
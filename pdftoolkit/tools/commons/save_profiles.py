@@ -0,0 +1,46 @@
+"""
+This module contains the save profiles of the output PDFs, shared by the tools which write one.
+
+Saving is single-threaded and comes after all the parallel work, so it is worth choosing per job:
+
+- `Fast` writes the objects as they are. The pages made from images are compressed already, so it costs little in
+  size for them, but uncompressed content streams (from some merged files) stay uncompressed.
+- `Balanced` removes unused objects, compresses the streams which are not, and packs the objects into object streams.
+  The streams compressed already are not touched, so it costs little unless there is a lot to compress.
+- `Smallest` also merges duplicate objects and streams (the same image added twice, the same font in merged files),
+  which compares every stream, the slowest by far on large documents.
+
+See `benchmarks/bench_save.py` for the time and size of each profile on the corpus of the benchmarks.
+"""
+
+from pathlib import Path
+from typing import Any
+
+from .constants import SaveProfile
+
+# keyword arguments of `pymupdf.Document.save()`
+SAVE_OPTIONS: dict[SaveProfile, dict[str, Any]] = {
+    SaveProfile.Fast: {
+        "garbage": 0,
+        "deflate": False,
+    },
+    SaveProfile.Balanced: {
+        "garbage": 1,
+        "deflate": True,
+        "deflate_images": True,
+        "deflate_fonts": True,
+        "use_objstms": 1,
+    },
+    SaveProfile.Smallest: {
+        "garbage": 4,
+        "deflate": True,
+        "deflate_images": True,
+        "deflate_fonts": True,
+        "use_objstms": 1,
+    },
+}
+
+
+def save_document(doc: Any, filepath: Path | str, profile: SaveProfile):
+    """Save the document (a `pymupdf.Document`) to `filepath` with the options of the profile."""
+    doc.save(filepath, **SAVE_OPTIONS[profile])
@@ -0,0 +1,78 @@
+"""
+This module contains a simple dynamic (work-stealing) scheduler.
+
+Instead of splitting the workloads into fixed contiguous slices up front (see `distribute_evenly()`), the workloads are
+cut into small batches and put into the input queue of a session. Each worker keeps pulling batches from that queue
+until it is drained, so a worker that happens to get cheap items simply takes more batches, and no worker sits idle
+while another one is still busy with a slice of expensive items.
+"""
+
+from typing import Any, Sequence, Generator, Callable, Iterable
+
+from py_multitasking import TaskContext, MainContext, TaskManagerBase, TaskSession
+from py_multitasking import Scopes
+
+MIN_BATCH_SIZE = 1
+MAX_BATCH_SIZE = 16
+DEFAULT_BATCHES_PER_WORKER = 8
+
+
+def suggest_batch_size(
+    total_count: int,
+    worker_count: int,
+    batches_per_worker: int = DEFAULT_BATCHES_PER_WORKER,
+    max_batch_size: int = MAX_BATCH_SIZE,
+) -> int:
+    """
+    Suggest a batch size so that every worker will pull roughly `batches_per_worker` batches. Small batches balance
+    the load better, big batches reduce the overhead of the queue, the result is clamped to [1, max_batch_size].
+    """
+    if total_count <= 0 or worker_count <= 0:
+        return MIN_BATCH_SIZE
+    batch_size = total_count // (worker_count * max(batches_per_worker, 1))
+    return max(MIN_BATCH_SIZE, min(batch_size, max_batch_size))
+
+
+def split_into_batches(total: Sequence[Any], batch_size: int) -> list[Sequence[Any]]:
+    assert batch_size > 0, "invalid argument: batch_size <= 0"
+    return [total[i : i + batch_size] for i in range(0, len(total), batch_size)]
+
+
+def feed_batches(ctx: MainContext, batches: Iterable[Sequence[Any]]) -> int:
+    """Put all batches into the input queue of the given context, return the number of batches."""
+    count = 0
+    for batch in batches:
+        ctx.write_input(batch, block=True)
+        count += 1
+    return count
+
+
+def iter_batches(ctx: TaskContext) -> Generator[Sequence[Any], None, None]:
+    """
+    Pull batches from the input queue of the given task context until the queue is empty. All batches are fed before
+    the workers are submitted, so an empty queue means there is no work left.
+    """
+    while True:
+        batch, is_empty = ctx.read_input(block=False)
+        if is_empty:
+            return
+        yield batch
+
+
+def dispatch_batches(
+    manager: TaskManagerBase,
+    task_name_prefix: str,
+    func: Callable[..., Any],
+    scopes: Scopes,
+    batches: Sequence[Sequence[Any]],
+    worker_count: int,
+) -> TaskSession:
+    """
+    Create a session, feed the batches into its input queue and submit `worker_count` workers which share that queue.
+    This is the dynamic counterpart of `manager.map()`, the input queue in `scopes` must be `Scope.Session`.
+    """
+    session = manager.session()
+    feed_batches(session.context, batches)
+    for i in range(max(min(worker_count, len(batches)), 1)):
+        session.submit(f"{task_name_prefix}{i}", func, scopes)
+    return session
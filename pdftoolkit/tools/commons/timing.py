@@ -0,0 +1,105 @@
+"""
+This module contains a lightweight way to measure where the time of a job goes.
+
+A `StageTimer` lives in a worker and records one sample per page for each stage it goes through (open, load,
+rasterize, encode, write...). Its samples are plain data, so they can be returned to the parent process in the result
+of a task. The parent merges the samples of all workers with `merge_samples()` and turns them into percentiles per stage
+with `summarize()`.
+"""
+
+import math
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Iterable, Generator, ContextManager
+
+# stage name -> durations in seconds
+StageSamples = dict[str, list[float]]
+
+PERCENTILES = (50, 90, 99)
+
+
+class StageTimer(object):
+    """Record the durations of stages. It is thread-safe, encoder threads can record into the timer of their worker."""
+
+    def __init__(self):
+        self._samples: StageSamples = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, seconds: float):
+        with self._lock:
+            self._samples.setdefault(stage, []).append(seconds)
+
+    @contextmanager
+    def measure(self, stage: str) -> Generator[None, None, None]:
+        """Record the time spent in the `with` block, also when the block raises."""
+        time_start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - time_start)
+
+    @property
+    def samples(self) -> StageSamples:
+        """A copy of the samples, safe to pickle and to send to another process."""
+        with self._lock:
+            return {stage: list(samples) for stage, samples in self._samples.items()}
+
+
+def measure(timer: StageTimer | None, stage: str) -> ContextManager:
+    """`timer.measure(stage)`, or nothing if there is no timer."""
+    if timer is None:
+        return nullcontext()
+    return timer.measure(stage)
+
+
+def merge_samples(samples: Iterable[StageSamples | None]) -> StageSamples:
+    merged: StageSamples = {}
+    for item in samples:
+        for stage, durations in (item or {}).items():
+            merged.setdefault(stage, []).extend(durations)
+    return merged
+
+
+def _percentile(sorted_durations: list[float], percent: int) -> float:
+    # nearest-rank percentile
+    rank = max(math.ceil(percent / 100 * len(sorted_durations)), 1)
+    return sorted_durations[rank - 1]
+
+
+def summarize(samples: StageSamples) -> dict[str, dict[str, float]]:
+    """
+    Return the statistics of each stage in seconds: count, total, mean, max and the percentiles in `PERCENTILES` (as
+    p50, p90...). Stages keep the order they were first recorded in.
+    """
+    summary = {}
+    for stage, durations in samples.items():
+        if not durations:
+            continue
+        durations = sorted(durations)
+        total = sum(durations)
+        stats = {
+            "count": len(durations),
+            "total": total,
+            "mean": total / len(durations),
+        }
+        for percent in PERCENTILES:
+            stats[f"p{percent}"] = _percentile(durations, percent)
+        stats["max"] = durations[-1]
+        summary[stage] = stats
+    return summary
+
+
+def format_summary(summary: dict[str, dict[str, float]]) -> list[str]:
+    """Format the summary as human-readable lines, durations in milliseconds, totals in seconds."""
+    lines = []
+    for stage, stats in summary.items():
+        percentiles = "; ".join(
+            f"p{percent}: {stats[f'p{percent}'] * 1000:.1f}ms"
+            for percent in PERCENTILES
+        )
+        lines.append(
+            f"[Timing] {stage}: count: {stats['count']}; total: {stats['total']:.3f}s; {percentiles}; "
+            f"max: {stats['max'] * 1000:.1f}ms"
+        )
+    return lines
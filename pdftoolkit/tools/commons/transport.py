@@ -0,0 +1,233 @@
+"""
+This module contains a transport of large payloads (encoded images, rasters) from the workers to the parent, which
+sends only small descriptors over the output queue.
+
+An object put into a Manager queue is pickled, copied into the manager process, then copied again into the parent and
+unpickled. For a few megabytes per page, these copies cost more than the rest of the collection. Here, the parent owns
+a ring of shared memory slots (it creates them, so they live until it unlinks them, even on Windows where a segment
+disappears with its last handle). A worker takes a free slot from a queue, copies the payload into it and sends a
+`Payload` naming the slot. The parent reads the payload in place and gives the slot back. A worker waits while all
+slots are taken, so the memory held for payloads is bounded by the slots.
+
+A payload larger than a slot is written to a spool file and memory-mapped by the parent, a small one is sent inline,
+a round trip to the queue of free slots would cost more than pickling it.
+
+The parent removes everything when the transport is closed: the slots, and the spool directory with the files of the
+payloads it never read (sent before a cancellation, or while it was failing). Closing also wakes up the workers
+waiting for a slot, their `send()` returns None.
+"""
+
+import mmap
+import os
+import queue
+import shutil
+import tempfile
+from contextlib import contextmanager
+from dataclasses import dataclass
+from multiprocessing.shared_memory import SharedMemory
+from typing import Callable, Iterator
+
+from .memory import MB
+from .worker_pool import WorkerPool
+
+DEFAULT_SLOT_SIZE = 4 * MB
+DEFAULT_SLOTS_PER_WORKER = 2
+# payloads up to this size are sent inline
+DEFAULT_INLINE_LIMIT = 64 * 1024
+DEFAULT_WAIT_INTERVAL = 0.1
+# the share of the free space of the shared memory file system the slots may take
+_SHM_SHARE = 0.5
+_SHM_DIR = "/dev/shm"
+
+# put into the queue of free slots when the transport is closed
+_CLOSED = ""
+
+
+@dataclass(frozen=True)
+class Payload(object):
+    """What a worker sends instead of the payload: the payload itself if it is small, or where to find it."""
+
+    size: int
+    data: bytes | None = None
+    slot: str | None = None
+    path: str | None = None
+
+
+class PayloadSender(object):
+    """The side of a transport used by the workers, it is pickled into their tasks."""
+
+    def __init__(self, free_slots, slot_size: int, spool_dir: str, inline_limit: int):
+        self._free_slots = free_slots
+        self._slot_size = slot_size
+        self._spool_dir = spool_dir
+        self._inline_limit = inline_limit
+
+    def send(
+        self,
+        data: bytes | memoryview,
+        is_cancelled: Callable[[], bool] | None = None,
+        wait_interval: float = DEFAULT_WAIT_INTERVAL,
+    ) -> Payload | None:
+        """
+        Put the payload where the parent can read it, waiting for a free slot if needed, and return the descriptor to
+        send. Return None if cancelled while waiting or if the transport is closed, nothing is sent then.
+        """
+        size = len(data)
+        if size <= self._inline_limit:
+            return Payload(size=size, data=bytes(data))
+        if size > self._slot_size:
+            return Payload(size=size, path=self._spool(data))
+        slot = self._acquire_slot(is_cancelled, wait_interval)
+        if slot is None:
+            return None
+        try:
+            shared_memory = SharedMemory(name=slot)
+        except FileNotFoundError:
+            # the transport was closed after the slot was taken
+            return None
+        try:
+            shared_memory.buf[:size] = data
+        finally:
+            shared_memory.close()
+        return Payload(size=size, slot=slot)
+
+    def _acquire_slot(
+        self, is_cancelled: Callable[[], bool] | None, wait_interval: float
+    ) -> str | None:
+        while is_cancelled is None or not is_cancelled():
+            try:
+                slot = self._free_slots.get(timeout=wait_interval)
+            except queue.Empty:
+                continue
+            if slot == _CLOSED:
+                # for the other workers waiting
+                self._free_slots.put(_CLOSED)
+                return None
+            return slot
+        return None
+
+    def _spool(self, data: bytes | memoryview) -> str:
+        fd, path = tempfile.mkstemp(dir=self._spool_dir, suffix=".payload")
+        with open(fd, "wb") as file:
+            file.write(data)
+        return path
+
+
+class PayloadTransport(object):
+    """The side of a transport owned by the parent, which creates and removes the slots and the spool directory."""
+
+    def __init__(
+        self,
+        slots: dict[str, SharedMemory],
+        free_slots,
+        slot_size: int,
+        spool_dir: str,
+        inline_limit: int,
+    ):
+        self._slots = slots
+        self._free_slots = free_slots
+        self._spool_dir = spool_dir
+        self._sender = PayloadSender(
+            free_slots, slot_size if slots else 0, spool_dir, inline_limit
+        )
+
+    @classmethod
+    def create(
+        cls,
+        manager: WorkerPool,
+        slot_count: int,
+        slot_size: int = DEFAULT_SLOT_SIZE,
+        inline_limit: int = DEFAULT_INLINE_LIMIT,
+    ) -> "PayloadTransport":
+        slot_count = _fit_slot_count(slot_count, slot_size)
+        spool_dir = tempfile.mkdtemp(prefix="transport-")
+        slots = {}
+        try:
+            for _ in range(slot_count):
+                shared_memory = SharedMemory(create=True, size=slot_size)
+                slots[shared_memory.name] = shared_memory
+            free_slots = manager.create_queue()
+            for slot in slots:
+                free_slots.put(slot)
+        except Exception:
+            _remove_slots(slots)
+            shutil.rmtree(spool_dir, ignore_errors=True)
+            raise
+        return cls(slots, free_slots, slot_size, spool_dir, inline_limit)
+
+    @property
+    def sender(self) -> PayloadSender:
+        return self._sender
+
+    @contextmanager
+    def open(self, payload: Payload) -> Iterator[bytes | memoryview]:
+        """
+        Yield the payload, a view of the memory it is in, which is valid inside the `with` block only. The slot or the
+        spool file is given back when the block is left.
+        """
+        if payload.data is not None:
+            yield payload.data
+            return
+        if payload.slot is not None:
+            view = self._slots[payload.slot].buf[: payload.size]
+            try:
+                yield view
+            finally:
+                view.release()
+                self._free_slots.put(payload.slot)
+            return
+        try:
+            with open(payload.path, "rb") as file, mmap.mmap(
+                file.fileno(), 0, access=mmap.ACCESS_READ
+            ) as mapped:
+                view = memoryview(mapped)[: payload.size]
+                try:
+                    yield view
+                finally:
+                    view.release()
+        finally:
+            _remove_file(payload.path)
+
+    def close(self):
+        # wake up the workers waiting for a slot
+        try:
+            self._free_slots.put(_CLOSED)
+        except Exception:
+            pass
+        _remove_slots(self._slots)
+        shutil.rmtree(self._spool_dir, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def _fit_slot_count(slot_count: int, slot_size: int) -> int:
+    # the shared memory of Linux lives in a tmpfs, which may be small (64 MB in a container), a write beyond its
+    # capacity kills the process instead of raising
+    if not os.path.isdir(_SHM_DIR):
+        return slot_count
+    try:
+        free_space = shutil.disk_usage(_SHM_DIR).free
+    except OSError:
+        return slot_count
+    return max(min(slot_count, int(free_space * _SHM_SHARE) // slot_size), 0)
+
+
+def _remove_slots(slots: dict[str, SharedMemory]):
+    for shared_memory in slots.values():
+        try:
+            shared_memory.close()
+            shared_memory.unlink()
+        except (OSError, BufferError):
+            pass
+    slots.clear()
+
+
+def _remove_file(path: str):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
@@ -0,0 +1,115 @@
+"""
+This module contains a long-lived worker pool shared by all tools.
+
+`with_process_pool_executor()` spawns fresh worker processes (which then have to import pymupdf again) and tears them
+down at the end of every run. When many small jobs are executed one after another, that fixed startup cost dominates.
+The pool here is started lazily on first use, sized by the number of CPUs, kept warm between runs and shut down when
+the application exits. The `worker_count` of a tool still decides how many tasks of a run are submitted to the pool.
+"""
+
+import atexit
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import Manager
+from typing import Optional
+
+from py_multitasking import TaskManagerBase, Queue, Event, Lock
+
+from ... import logme
+from ...utils import cpu_count
+
+_L = logme.new("pdftoolkit.tools.commons.worker_pool")
+
+
+def _warm_up_worker():
+    # import the heavy modules once when the worker process starts, instead of on its first task
+    # noinspection PyUnresolvedReferences
+    import pymupdf
+
+
+class WorkerPool(TaskManagerBase):
+    """
+    A task manager backed by a process pool. Unlike the one created by `with_process_pool_executor()`, leaving the
+    `with` block of a WorkerPool does not shut it down, call `shutdown()` explicitly to do that.
+    """
+
+    def __init__(self, max_workers: int):
+        self._max_workers = max_workers
+        self._executor = ProcessPoolExecutor(
+            max_workers=max_workers, initializer=_warm_up_worker
+        )
+        self._manager = Manager()
+        super().__init__(self._executor)
+
+    @property
+    def max_workers(self) -> int:
+        return self._max_workers
+
+    @property
+    def broken(self) -> bool:
+        # a worker process died abruptly (e.g. killed by the OOM killer), the executor cannot be used anymore
+        return bool(getattr(self._executor, "_broken", False))
+
+    def create_queue(self, size: Optional[int] = None) -> Queue:
+        if not size:
+            return self._manager.Queue()
+        return self._manager.Queue(size)
+
+    def create_event(self) -> Event:
+        return self._manager.Event()
+
+    def create_lock(self) -> Lock:
+        return self._manager.Lock()
+
+    def create_condition(self):
+        return self._manager.Condition()
+
+    def create_dict(self) -> dict:
+        # a dict shared by the tasks of a run, each call is a round trip to the manager process
+        return self._manager.dict()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self._manager.shutdown()
+
+    def __enter__(self) -> "WorkerPool":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        # keep the workers warm for the next run
+        return None
+
+
+_worker_pool: Optional[WorkerPool] = None
+_worker_pool_lock = threading.Lock()
+
+
+def get_worker_pool() -> WorkerPool:
+    """Return the shared worker pool, start it if it is not started yet or has been broken."""
+    global _worker_pool
+    with _worker_pool_lock:
+        if _worker_pool is not None and _worker_pool.broken:
+            _shutdown_safely(_worker_pool)
+            _worker_pool = None
+        if _worker_pool is None:
+            _worker_pool = WorkerPool(max_workers=cpu_count(1))
+        return _worker_pool
+
+
+def shutdown_worker_pool():
+    """Shut down the shared worker pool if it has been started."""
+    global _worker_pool
+    with _worker_pool_lock:
+        if _worker_pool is not None:
+            _shutdown_safely(_worker_pool)
+            _worker_pool = None
+
+
+def _shutdown_safely(pool: WorkerPool):
+    try:
+        pool.shutdown()
+    except Exception as e:
+        _L.error(f"error shutting down worker pool: {e}")
+
+
+atexit.register(shutdown_worker_pool)
@@ -1 +1,15 @@
-from ._export import use
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pyguiadapter.adapter import GUIAdapter
+
+
+def use(adapter: "GUIAdapter"):
+    # the GUI parts (widgets, translations) are imported only when the tool is added to a GUI, so that the
+    # implementation can be imported by a headless process without starting Qt
+    from ._export import use as _use
+
+    _use(adapter)
+
+
+__all__ = ["use"]
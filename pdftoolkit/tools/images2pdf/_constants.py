@@ -0,0 +1,59 @@
+"""
+The constants of the parameters of images2pdf. This module does not import the GUI or the implementation, so that
+both the GUI and the command line can use it cheaply.
+"""
+
+import enum
+
+
+class PageSize(enum.Enum):
+    # a page of the size of the image, at its own resolution
+    Original = "original"
+    A3 = "a3"
+    A4 = "a4"
+    A5 = "a5"
+    Letter = "letter"
+    Legal = "legal"
+
+
+class ColorMode(enum.Enum):
+    Original = "original"
+    Gray = "gray"
+    # black and white, stored with fax compression
+    Bilevel = "bilevel"
+
+
+_DUPLICATE_POLICY_CONFIRM = 0
+_DUPLICATE_POLICY_ON_OVERWRITE = 1
+_DUPLICATE_POLICY_OVERWRITE = 2
+_DUPLICATE_POLICY_VALUES = (
+    _DUPLICATE_POLICY_CONFIRM,
+    _DUPLICATE_POLICY_ON_OVERWRITE,
+    _DUPLICATE_POLICY_OVERWRITE,
+)
+
+# the workers append at most this many consecutive images to a chunk document, the parent merges one chunk at a time
+MAX_CHUNK_SIZE = 64
+# in MB, the converted images not merged yet, and those merged but not spilled to disk yet, 0 means no limit
+MIN_MEMORY_LIMIT = 0
+MAX_MEMORY_LIMIT = 65536
+DEFAULT_MEMORY_LIMIT = 256
+
+# in points, portrait, a landscape image gets a landscape page
+PAGE_SIZES = {
+    PageSize.A3: (842, 1191),
+    PageSize.A4: (595, 842),
+    PageSize.A5: (420, 595),
+    PageSize.Letter: (612, 792),
+    PageSize.Legal: (612, 1008),
+}
+# the pixels per inch of an image as it is shown on its page, 0 means no limit (the images are never upsampled)
+MIN_TARGET_DPI = 0
+MAX_TARGET_DPI = 2400
+# the quality of the images which are recompressed as JPEG
+MIN_QUALITY = 1
+MAX_QUALITY = 100
+DEFAULT_PAGE_SIZE = PageSize.Original
+DEFAULT_TARGET_DPI = 0
+DEFAULT_QUALITY = 85
+DEFAULT_COLOR_MODE = ColorMode.Original
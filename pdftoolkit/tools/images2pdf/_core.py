@@ -0,0 +1,507 @@
+"""
+The headless core of images2pdf. Nothing here imports the GUI, the dialogs asking what to do with an existing output
+file are in `_commons`.
+
+The images are cut into chunks of consecutive images, which the workers pull from a shared queue. A worker converts
+each image of a chunk to a one-page PDF, appends these pages to a chunk document, and saves the chunk to a spool
+directory. The parent only concatenates the chunks in order, with one `insert_pdf()` per chunk, as soon as the chunks
+before them have arrived. Building the pages is spread over the workers, and the page tree of the output document grows
+at its end instead of being rebuilt for every image.
+
+JPEG, JPEG 2000 and fax TIFF images are not converted, their data is embedded as it is (see `_passthrough`). The
+workers also fit the images into pages of a standard size, downsample and recompress them if asked (see `_transform`).
+
+The memory held by the converted images is bounded by `memory_limit`: the workers acquire the size of each converted
+image from a `ByteBudget` and wait while the images not merged yet exceed it, the parent releases them when it merges
+their chunk. The output document itself would otherwise hold every image until it is saved, so the parent spills it to
+the spool directory with an incremental save each time that much has been merged, and reopens it from there.
+"""
+
+import gc
+import os
+import pickle
+import tempfile
+import time
+from concurrent.futures import CancelledError
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+from typing import Any, Sequence
+
+import pymupdf
+from py_multitasking import TaskContext, TaskSession, Scopes
+
+from ._constants import (
+    MAX_CHUNK_SIZE,
+    DEFAULT_MEMORY_LIMIT,
+    DEFAULT_PAGE_SIZE,
+    DEFAULT_TARGET_DPI,
+    DEFAULT_QUALITY,
+    DEFAULT_COLOR_MODE,
+    PageSize,
+    ColorMode,
+)
+from ._passthrough import EmbeddableImage, probe_image, append_image_page
+from ._transform import ImageOptions, page_layout, recompress
+from ..commons import (
+    ByteBudget,
+    NameGenerator,
+    check_cancel_event,
+    suggest_batch_size,
+    split_into_batches,
+    iter_batches,
+    dispatch_batches,
+)
+from ..commons.collector import iter_outputs
+from ..commons.constants import SaveProfile, DEFAULT_SAVE_PROFILE
+from ..commons.context import runtime, dtime, rand
+from ..commons.reporter import (
+    show_progressbar,
+    hide_progressbar,
+    update_progress,
+    is_function_cancelled,
+    pprint,
+    report,
+)
+from ..commons.timing import (
+    StageSamples,
+    StageTimer,
+    merge_samples,
+    summarize,
+    format_summary,
+)
+from ..commons.memory import MB
+from ..commons.save_profiles import save_document
+from ..commons.worker_pool import get_worker_pool
+from ... import logme
+from ...utils import close_safely, cwd, makedirs, open_in_file_manager
+
+_L = logme.new("pdftoolkit.tools.images2pdf")
+
+
+@dataclass
+class _ImageData(object):
+    index: int | None = None
+    data: bytes | None = None
+    size: tuple[int, int] | None = None
+    exception: Exception | None = None
+    # the image, to be embedded without conversion (then `data` is None)
+    embeddable: EmbeddableImage | None = None
+    # the size of the page the image is fitted into, its own size (`size`) with PageSize.Original
+    page_size: PageSize = PageSize.Original
+
+    @property
+    def byte_size(self) -> int:
+        if self.embeddable is not None:
+            return len(self.embeddable.stream)
+        return len(self.data)
+
+
+@dataclass
+class _ChunkData(object):
+    # the index of its first image, the number of its pages, the file it was saved to, the bytes acquired for it
+    start: int
+    count: int
+    path: str
+    size: int = 0
+
+
+class _OutputDocument(object):
+    """The output document, spilled to `spill_path` whenever `spill_size` bytes have been appended since last time."""
+
+    def __init__(self, spill_path: str, spill_size: int):
+        self._spill_path = spill_path
+        self._spill_size = spill_size
+        self._unspilled_size = 0
+        self._spilled = False
+        self.doc = pymupdf.Document()
+
+    def append(self, chunk_doc: pymupdf.Document, size: int):
+        self.doc.insert_pdf(chunk_doc)
+        self._unspilled_size += size
+        if 0 < self._spill_size <= self._unspilled_size:
+            self._spill()
+
+    def _spill(self):
+        if self._spilled:
+            # only the objects added since the last spill are written
+            self.doc.saveIncr()
+        else:
+            self.doc.save(self._spill_path)
+            self._spilled = True
+        # the objects of a document opened from a file are loaded when needed, not kept in memory
+        close_safely(self.doc)
+        self.doc = pymupdf.open(self._spill_path)
+        self._unspilled_size = 0
+
+    def close(self):
+        close_safely(self.doc)
+
+
+def _process_image_chunks(
+    ctx: TaskContext | None,
+    spool_dir: str,
+    budget: ByteBudget | None,
+    options: ImageOptions,
+) -> StageSamples:
+    # return the durations of the stages of each image
+    timer = StageTimer()
+    for image_items in iter_batches(ctx):
+        chunk_data = _build_chunk(ctx, image_items, spool_dir, budget, options, timer)
+        if chunk_data is None:
+            # cancelled, or an image failed, which stops the whole conversion
+            break
+        ctx.write_output(chunk_data, block=True)
+    pymupdf.TOOLS.store_shrink(100)
+    return timer.samples
+
+
+def _build_chunk(
+    ctx: TaskContext | None,
+    image_items: list[tuple[int, str]],
+    spool_dir: str,
+    budget: ByteBudget | None,
+    options: ImageOptions,
+    timer: StageTimer,
+) -> _ChunkData | None:
+    start = image_items[0][0]
+    chunk_size = 0
+    chunk_doc = pymupdf.Document()
+    try:
+        for page_index, image_path in image_items:
+            if check_cancel_event(ctx):
+                _L.info("cancel event detected, stopping processing")
+                return None
+            image_data = _produce_image_data(image_path, page_index, timer, options)
+            if budget is not None and image_data.exception is None:
+                size = image_data.byte_size
+                with timer.measure("throttle"):
+                    acquired = budget.acquire(
+                        size, start, is_cancelled=lambda: check_cancel_event(ctx)
+                    )
+                if not acquired:
+                    return None
+                chunk_size += size
+            if image_data.exception is None:
+                try:
+                    with timer.measure("insert"):
+                        _append_page(chunk_doc, image_data)
+                except Exception as e:
+                    image_data.exception = e
+            # the pages travel in the chunk, only the progress is sent for each image
+            ctx.write_output(
+                _ImageData(
+                    index=page_index,
+                    exception=_picklable_exception(image_data.exception),
+                ),
+                block=True,
+            )
+            if image_data.exception is not None:
+                return None
+        chunk_path = os.path.join(spool_dir, f"chunk-{start}.pdf")
+        with timer.measure("save_chunk"):
+            chunk_doc.save(chunk_path)
+        return _ChunkData(
+            start=start, count=len(image_items), path=chunk_path, size=chunk_size
+        )
+    finally:
+        close_safely(chunk_doc)
+
+
+def _picklable_exception(exception: Exception | None) -> Exception | None:
+    # the exceptions of pymupdf hold SWIG objects, they would break the output queue instead of reaching the parent
+    if exception is None:
+        return None
+    try:
+        pickle.dumps(exception)
+        return exception
+    except Exception:
+        return RuntimeError(str(exception))
+
+
+def _append_page(doc: pymupdf.Document, image_data: _ImageData):
+    page_doc = None
+    try:
+        if image_data.embeddable is not None:
+            append_image_page(
+                doc,
+                image_data.embeddable,
+                *page_layout(image_data.size, image_data.page_size),
+            )
+            return
+        page_doc = pymupdf.open("pdf", image_data.data)
+        if image_data.page_size == PageSize.Original:
+            # the page made by convert_to_pdf() has the size of the image already
+            doc.insert_pdf(page_doc)
+            return
+        for page in page_doc:
+            page_rect, image_rect = page_layout(
+                (page.rect.width, page.rect.height), image_data.page_size
+            )
+            # noinspection PyUnresolvedReferences
+            new_page = doc.new_page(width=page_rect.width, height=page_rect.height)
+            new_page.show_pdf_page(image_rect, page_doc, page.number)
+    except Exception as e:
+        _L.error(f"error appending page {image_data.index} with image data: {e}")
+        raise e
+    finally:
+        if page_doc:
+            close_safely(page_doc)
+
+
+def _merge_chunks(
+    output: _OutputDocument,
+    chunks: dict[int, _ChunkData],
+    merged_count: int,
+    budget: ByteBudget | None,
+) -> int:
+    """
+    Append the chunks whose turn has come to the output document, in order, remove their files and release their
+    bytes. Return the number of pages merged so far.
+    """
+    while merged_count in chunks:
+        chunk_data = chunks.pop(merged_count)
+        chunk_doc = None
+        try:
+            chunk_doc = pymupdf.open(chunk_data.path)
+            output.append(chunk_doc, chunk_data.size)
+        finally:
+            if chunk_doc:
+                close_safely(chunk_doc)
+            os.remove(chunk_data.path)
+        merged_count += chunk_data.count
+        if budget is not None:
+            budget.release(chunk_data.size, head=merged_count)
+    return merged_count
+
+
+def _produce_image_data(
+    image_path: str,
+    page_index: int,
+    timer: StageTimer | None = None,
+    options: ImageOptions | None = None,
+) -> _ImageData:
+    img_doc = None
+    if timer is None:
+        timer = StageTimer()
+    if options is None:
+        options = ImageOptions()
+    try:
+        with timer.measure("probe"):
+            data = Path(image_path).read_bytes()
+            embeddable = probe_image(data)
+        if embeddable is not None:
+            img_size = (embeddable.page_width, embeddable.page_height)
+        else:
+            with timer.measure("open"):
+                img_doc = pymupdf.open(image_path)
+            raw: pymupdf.Rect = img_doc[0].rect
+            img_size = (raw.width, raw.height)
+        if options.resamples:
+            _, image_rect = page_layout(img_size, options.page_size)
+            with timer.measure("recompress"):
+                recompressed = recompress(data, image_rect, options)
+            if recompressed is not None:
+                embeddable = probe_image(recompressed)
+                if embeddable is None:
+                    raise RuntimeError("the recompressed image cannot be embedded")
+        if embeddable is not None:
+            return _ImageData(
+                index=page_index,
+                size=img_size,
+                embeddable=embeddable,
+                page_size=options.page_size,
+            )
+        with timer.measure("convert"):
+            img_data = img_doc.convert_to_pdf()
+        return _ImageData(
+            index=page_index,
+            data=img_data,
+            size=img_size,
+            exception=None,
+            page_size=options.page_size,
+        )
+    except Exception as e:
+        _L.error(f"error processing image {image_path}: {e}")
+        return _ImageData(index=page_index, exception=e)
+    finally:
+        if img_doc:
+            close_safely(img_doc)
+
+
+def _build_name_context(image_count: int) -> dict[str, Any]:
+    return {
+        **runtime.VARIABLES,
+        **dtime.VARIABLES,
+        **rand.VARIABLES,
+        runtime.VARNAME_TOTAL: image_count,
+        runtime.VARNAME_CWD_DIR: cwd(),
+    }
+
+
+def _cleanup_session(session: TaskSession):
+    session.cancel_all(with_cancel_event_set=True)
+    session.wait_for_all()
+    _ = session.context.read_output_until_empty()
+    session.destroy()
+    pymupdf.TOOLS.store_shrink(100)
+
+
+def _main_loop(
+    session: TaskSession,
+    output: _OutputDocument,
+    budget: ByteBudget | None,
+    total: int,
+    save_path: Path | str,
+    save_profile: SaveProfile,
+    verbose: bool,
+) -> dict[str, dict[str, float]]:
+    # return the statistics of each stage, those of the workers included
+    timer = StageTimer()
+    finished = 0
+    merged_count = 0
+    # the chunks which arrived before the ones preceding them, by their first image
+    chunks: dict[int, _ChunkData] = {}
+    show_progressbar(max_value=total, min_value=0)
+    try:
+        pprint("Start processing...", verbose=verbose)
+        # block until image data arrives instead of busy-polling the output queue
+        for image_data in iter_outputs(session, is_cancelled=is_function_cancelled):
+            if isinstance(image_data, _ChunkData):
+                chunks[image_data.start] = image_data
+                with timer.measure("merge"):
+                    merged_count = _merge_chunks(output, chunks, merged_count, budget)
+                continue
+            finished += 1
+            update_progress(finished)
+            report(
+                "page",
+                page_index=image_data.index,
+                error=str(image_data.exception) if image_data.exception else None,
+            )
+            if image_data.exception:
+                pprint(
+                    f"Error processing page {image_data.index + 1}: {image_data.exception}",
+                    verbose=verbose,
+                )
+                raise image_data.exception
+            pprint(f"Page processed: {image_data.index + 1}...", verbose=verbose)
+        if merged_count != total:
+            raise RuntimeError(f"only {merged_count} of {total} pages were produced")
+        # save the document
+        save_path = Path(save_path)
+        with timer.measure("save"):
+            save_document(output.doc, save_path, save_profile)
+        pprint(f"PDF saved: {save_path.absolute().as_posix()}", verbose=verbose)
+        task_timings = [
+            task_result.value
+            for task_result in session.results().values()
+            if task_result.successful
+        ]
+        timings = summarize(merge_samples([*task_timings, timer.samples]))
+        for line in format_summary(timings):
+            pprint(line, verbose=verbose)
+        return timings
+    except CancelledError:
+        _cleanup_session(session)
+        pprint("Cancelled by user", verbose=verbose)
+        return {}
+    except Exception as e:
+        _cleanup_session(session)
+        pprint(f"Processing failed because an error is occurred: {e}", verbose=verbose)
+        raise e
+
+
+def resolve_dest_file(dest_file: str, image_count: int) -> Path:
+    """Expand the variables in the path of the output file."""
+    filename_generator = NameGenerator(_build_name_context(image_count))
+    return Path(filename_generator.generate(dest_file))
+
+
+def convert_images(
+    image_files: Sequence[str],
+    dest_file_path: Path,
+    worker_count: int,
+    verbose: bool,
+    open_output_dir: bool = False,
+    memory_limit: int = DEFAULT_MEMORY_LIMIT,
+    page_size: PageSize = DEFAULT_PAGE_SIZE,
+    target_dpi: int = DEFAULT_TARGET_DPI,
+    quality: int = DEFAULT_QUALITY,
+    color_mode: ColorMode = DEFAULT_COLOR_MODE,
+    save_profile: SaveProfile = DEFAULT_SAVE_PROFILE,
+) -> dict | None:
+    """
+    Put the images into `dest_file_path`, one image per page, overwriting it if it exists. `memory_limit` (in MB, 0
+    for no limit) bounds the converted images held in memory. The images are fitted into pages of `page_size`, and
+    downsampled to `target_dpi` (0 to keep their resolution) and converted to `color_mode`, then recompressed at the
+    JPEG `quality`. The output is saved with `save_profile`. Return the elapsed time and the statistics of each stage.
+    """
+    start_time = time.time_ns()
+    image_count = len(image_files)
+    # make sure the output directory exists
+    makedirs(dest_file_path.parent)
+
+    image_items = [(i, filepath) for i, filepath in enumerate(image_files)]
+    memory_limit_bytes = memory_limit * MB
+    options = ImageOptions(
+        page_size=page_size,
+        target_dpi=target_dpi,
+        quality=quality,
+        color_mode=color_mode,
+    )
+    exception = None
+    timings = {}
+    try:
+        # the chunks and the output are spooled to a temporary directory, which is removed whatever happens
+        with tempfile.TemporaryDirectory(
+            prefix="images2pdf-", ignore_cleanup_errors=True
+        ) as spool_dir, get_worker_pool() as manager:
+            output = _OutputDocument(
+                os.path.join(spool_dir, "output.pdf"), memory_limit_bytes
+            )
+            try:
+                budget = None
+                if memory_limit_bytes > 0:
+                    budget = ByteBudget.create(manager, memory_limit_bytes)
+                scopes = Scopes.Session()
+                chunk_size = suggest_batch_size(
+                    image_count, worker_count, max_batch_size=MAX_CHUNK_SIZE
+                )
+                session = dispatch_batches(
+                    manager,
+                    "task-",
+                    partial(
+                        _process_image_chunks,
+                        spool_dir=spool_dir,
+                        budget=budget,
+                        options=options,
+                    ),
+                    scopes,
+                    split_into_batches(image_items, chunk_size),
+                    worker_count,
+                )
+                timings = _main_loop(
+                    session,
+                    output=output,
+                    budget=budget,
+                    total=image_count,
+                    save_path=dest_file_path,
+                    save_profile=save_profile,
+                    verbose=verbose,
+                )
+            finally:
+                output.close()
+    except Exception as e:
+        exception = e
+    finally:
+        time_elapsed = (time.time_ns() - start_time) / 1e9
+        hide_progressbar()
+        pprint(f"Time elapsed: {time_elapsed:.3f} seconds", verbose=verbose)
+        gc.collect()
+        if exception:
+            raise exception
+        if open_output_dir:
+            open_in_file_manager(dest_file_path.parent)
+        pymupdf.TOOLS.store_shrink(100)
+    return {"elapsed_seconds": time_elapsed, "stages": timings}
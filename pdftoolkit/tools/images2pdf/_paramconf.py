@@ -1,10 +1,33 @@
-from pyguiadapter.widgets import FileListEditConfig, FileSelectConfig, ChoiceBoxConfig
+from pyguiadapter.widgets import (
+    FileListEditConfig,
+    FileSelectConfig,
+    ChoiceBoxConfig,
+    IntSpinBoxConfig,
+    EnumSelectConfig,
+)
 
 from ._commons import _this_t, _DUPLICATE_POLICY_CONFIRM, _DUPLICATE_POLICIES
-from ..commons.paramconf import PARAM_WORKER_COUNT, PARAM_VERBOSE, PARAM_OPEN_OUTPUT_DIR
+from ._constants import (
+    MIN_MEMORY_LIMIT,
+    MAX_MEMORY_LIMIT,
+    DEFAULT_MEMORY_LIMIT,
+    MIN_TARGET_DPI,
+    MAX_TARGET_DPI,
+    MIN_QUALITY,
+    MAX_QUALITY,
+    DEFAULT_PAGE_SIZE,
+    DEFAULT_TARGET_DPI,
+    DEFAULT_QUALITY,
+    DEFAULT_COLOR_MODE,
+)
+from ..commons.paramconf import (
+    PARAM_WORKER_COUNT,
+    PARAM_VERBOSE,
+    PARAM_OPEN_OUTPUT_DIR,
+    PARAM_SAVE_PROFILE,
+)
 from ...translation import param_name_t, tools_t
 
-
 DEFAULT_IMAGE_FILES = []
 DEFAULT_DEST_FILE = "output.pdf"
 DEFAULT_DUPLICATE_POLICY = _DUPLICATE_POLICY_CONFIRM
@@ -30,6 +53,38 @@ CONFIGS = {
         choices=_DUPLICATE_POLICIES,
     ),
     "worker_count": PARAM_WORKER_COUNT,
+    "memory_limit": IntSpinBoxConfig(
+        label=param_name_t("memory_limit"),
+        default_value=DEFAULT_MEMORY_LIMIT,
+        min_value=MIN_MEMORY_LIMIT,
+        max_value=MAX_MEMORY_LIMIT,
+        step=64,
+        suffix=" MB",
+    ),
+    "page_size": EnumSelectConfig(
+        label=param_name_t("page_size"),
+        default_value=DEFAULT_PAGE_SIZE,
+    ),
+    "target_dpi": IntSpinBoxConfig(
+        label=param_name_t("target_dpi"),
+        default_value=DEFAULT_TARGET_DPI,
+        min_value=MIN_TARGET_DPI,
+        max_value=MAX_TARGET_DPI,
+        step=50,
+        suffix=" DPI",
+    ),
+    "quality": IntSpinBoxConfig(
+        label=param_name_t("quality"),
+        default_value=DEFAULT_QUALITY,
+        min_value=MIN_QUALITY,
+        max_value=MAX_QUALITY,
+        step=5,
+    ),
+    "color_mode": EnumSelectConfig(
+        label=param_name_t("color_mode"),
+        default_value=DEFAULT_COLOR_MODE,
+    ),
+    "save_profile": PARAM_SAVE_PROFILE,
     "verbose": PARAM_VERBOSE,
     "open_output_dir": PARAM_OPEN_OUTPUT_DIR,
 }
@@ -0,0 +1,314 @@
+"""
+Pass-through embedding of compressed images for images2pdf.
+
+`convert_to_pdf()` runs an image through a PDF device into a new one-page document, which is then serialized, parsed
+again and grafted into the chunk, and MuPDF hashes the image to find duplicates on the way. Images whose compressed
+data a PDF can hold as it is are instead embedded directly: the file is put into an image XObject with the matching
+filter, on a new page of the chunk document. Nothing is decoded.
+
+- JPEG (`DCTDecode`): gray or RGB, 8 bits. CMYK and Adobe-transformed JPEGs are left to `convert_to_pdf()`, they need
+  decode parameters which cannot be read back from MuPDF.
+- JPEG 2000 (`JPXDecode`): the color space is taken from the codestream. Images with an alpha channel are left out.
+- An image with an ICC profile (an APP2 `ICC_PROFILE` marker in a JPEG, a `colr` box of a JP2 file giving one) is
+  left to `convert_to_pdf()`, which embeds the profile as an `ICCBased` color space. Embedded as `DeviceRGB` or
+  `DeviceGray`, its colors would be shown differently.
+- TIFF (`CCITTFaxDecode`): bilevel, single strip, Group 3 or Group 4 fax compressed, the usual output of scanners.
+
+The size of the page and the orientation are read from the header by MuPDF, so that a page has the same size as with
+`convert_to_pdf()`. An image which is rotated by its metadata is left to `convert_to_pdf()` too.
+"""
+
+import struct
+from dataclasses import dataclass
+
+import pymupdf
+from pymupdf import mupdf
+
+# the resolution of an image which does not tell, as MuPDF assumes
+_DEFAULT_RESOLUTION = 96
+
+# JPEG markers
+_SOI = b"\xff\xd8"
+_APP2 = 0xE2
+_APP14 = 0xEE
+_ICC_PROFILE_SIGNATURE = b"ICC_PROFILE\x00"
+_SOS = 0xDA
+# the markers without a length
+_STANDALONE_MARKERS = {0x01, *range(0xD0, 0xD9)}
+
+# JPEG 2000
+_JP2_SIGNATURE = b"\x00\x00\x00\x0cjP  \r\n\x87\n"
+_J2K_SIGNATURE = b"\xff\x4f\xff\x51"
+# the number of components, in the SIZ marker segment of a codestream
+_J2K_CSIZ_OFFSET = 40
+# the methods of a colour specification box which give an ICC profile (restricted and any)
+_JP2_ICC_METHODS = (2, 3)
+
+# TIFF tags
+_TIFF_IMAGE_WIDTH = 256
+_TIFF_BITS_PER_SAMPLE = 258
+_TIFF_COMPRESSION = 259
+_TIFF_PHOTOMETRIC = 262
+_TIFF_FILL_ORDER = 266
+_TIFF_STRIP_OFFSETS = 273
+_TIFF_SAMPLES_PER_PIXEL = 277
+_TIFF_STRIP_BYTE_COUNTS = 279
+_TIFF_T4_OPTIONS = 292
+_TIFF_COMPRESSION_G3 = 3
+_TIFF_COMPRESSION_G4 = 4
+_TIFF_PHOTOMETRIC_MIN_IS_WHITE = 0
+_TIFF_PHOTOMETRIC_MIN_IS_BLACK = 1
+# T4Options: 2-D coding, uncompressed mode, fill bits before EOL
+_T4_2D = 0x1
+_T4_UNCOMPRESSED = 0x2
+_T4_FILL_BITS = 0x4
+# type -> (struct format, size) of the values of a TIFF field
+_TIFF_TYPES = {1: ("B", 1), 3: ("H", 2), 4: ("I", 4)}
+
+
+def _jpeg_needs_conversion(data: bytes) -> bool:
+    # whether there is an Adobe or an ICC profile marker, walk the marker segments up to the first scan
+    offset = len(_SOI)
+    while offset + 4 <= len(data):
+        if data[offset] != 0xFF:
+            return True
+        marker = data[offset + 1]
+        if marker == 0xFF:
+            # fill byte
+            offset += 1
+            continue
+        if marker in _STANDALONE_MARKERS:
+            offset += 2
+            continue
+        if marker == _SOS:
+            return False
+        (length,) = struct.unpack_from(">H", data, offset + 2)
+        if marker == _APP14 and data[offset + 4 : offset + 9] == b"Adobe":
+            return True
+        if marker == _APP2 and data[offset + 4 : offset + 16] == _ICC_PROFILE_SIGNATURE:
+            return True
+        offset += 2 + length
+    # truncated, let MuPDF deal with it
+    return True
+
+
+def _jpeg_dict(image: mupdf.FzImage, data: bytes) -> str | None:
+    if image.bpc() != 8 or image.n() not in (1, 3) or _jpeg_needs_conversion(data):
+        return None
+    colorspace = "/DeviceGray" if image.n() == 1 else "/DeviceRGB"
+    return f"/ColorSpace {colorspace} /BitsPerComponent 8 /Filter /DCTDecode"
+
+
+def _jp2_header_boxes(data: bytes) -> dict[bytes, int] | None:
+    # box type -> offset of the boxes in the header box of a JP2 file, which comes before the codestream
+    offset = len(_JP2_SIGNATURE)
+    while offset + 8 <= len(data):
+        box_length, box_type = struct.unpack_from(">I4s", data, offset)
+        if box_type == b"jp2h":
+            boxes = {}
+            end = min(offset + box_length, len(data))
+            offset += 8
+            while offset + 8 <= end:
+                sub_box_length, sub_box_type = struct.unpack_from(">I4s", data, offset)
+                # the first one of each type is the one to use
+                boxes.setdefault(sub_box_type, offset)
+                if sub_box_length < 8:
+                    break
+                offset += sub_box_length
+            return boxes
+        if box_length < 8:
+            # extended or up to the end of the file, the codestream
+            return None
+        offset += box_length
+    return None
+
+
+def _jpx_component_count(data: bytes) -> int | None:
+    if data.startswith(_J2K_SIGNATURE):
+        # a bare codestream
+        (count,) = struct.unpack_from(">H", data, _J2K_CSIZ_OFFSET)
+        return count
+    if not data.startswith(_JP2_SIGNATURE):
+        return None
+    boxes = _jp2_header_boxes(data)
+    if boxes is None or b"ihdr" not in boxes:
+        return None
+    (count,) = struct.unpack_from(">H", data, boxes[b"ihdr"] + 16)
+    return count
+
+
+def _jp2_has_icc_profile(data: bytes) -> bool:
+    if not data.startswith(_JP2_SIGNATURE):
+        return False
+    boxes = _jp2_header_boxes(data)
+    return (
+        bool(boxes)
+        and b"colr" in boxes
+        and data[boxes[b"colr"] + 8] in _JP2_ICC_METHODS
+    )
+
+
+def _jpx_dict(image: mupdf.FzImage, data: bytes) -> str | None:
+    # a palette, an alpha channel (which a PDF would need as SMaskInData) or CMYK do not match
+    if (
+        image.n() not in (1, 3)
+        or _jpx_component_count(data) != image.n()
+        or _jp2_has_icc_profile(data)
+    ):
+        return None
+    return "/Filter /JPXDecode"
+
+
+def _tiff_fields(data: bytes) -> dict[int, tuple[int, ...]] | None:
+    # the fields of the only image of a TIFF file, None if it has more than one
+    byte_order = {b"II": "<", b"MM": ">"}.get(data[:2], None)
+    if byte_order is None:
+        return None
+    (ifd_offset,) = struct.unpack_from(byte_order + "I", data, 4)
+    (entry_count,) = struct.unpack_from(byte_order + "H", data, ifd_offset)
+    fields = {}
+    for i in range(entry_count):
+        tag, field_type, count, value_offset = struct.unpack_from(
+            byte_order + "HHI4s", data, ifd_offset + 2 + i * 12
+        )
+        if field_type not in _TIFF_TYPES:
+            continue
+        value_format, value_size = _TIFF_TYPES[field_type]
+        if count * value_size <= 4:
+            values = struct.unpack_from(
+                f"{byte_order}{count}{value_format}", value_offset
+            )
+        else:
+            (offset,) = struct.unpack(byte_order + "I", value_offset)
+            values = struct.unpack_from(
+                f"{byte_order}{count}{value_format}", data, offset
+            )
+        fields[tag] = values
+    (next_ifd_offset,) = struct.unpack_from(
+        byte_order + "I", data, ifd_offset + 2 + entry_count * 12
+    )
+    if next_ifd_offset != 0:
+        # a multi-page TIFF
+        return None
+    return fields
+
+
+def _tiff_ccitt(image: mupdf.FzImage, data: bytes) -> tuple[str, bytes] | None:
+    # return the image dictionary and the fax data of a TIFF file, None if it is not a single strip of fax data
+    fields = _tiff_fields(data)
+    if fields is None:
+        return None
+    compression = fields.get(_TIFF_COMPRESSION, (1,))[0]
+    photometric = fields.get(_TIFF_PHOTOMETRIC, (-1,))[0]
+    offsets = fields.get(_TIFF_STRIP_OFFSETS, ())
+    byte_counts = fields.get(_TIFF_STRIP_BYTE_COUNTS, ())
+    t4_options = fields.get(_TIFF_T4_OPTIONS, (0,))[0]
+    if (
+        compression not in (_TIFF_COMPRESSION_G3, _TIFF_COMPRESSION_G4)
+        or fields.get(_TIFF_BITS_PER_SAMPLE, (1,))[0] != 1
+        or fields.get(_TIFF_SAMPLES_PER_PIXEL, (1,))[0] != 1
+        or fields.get(_TIFF_FILL_ORDER, (1,))[0] != 1
+        or photometric
+        not in (_TIFF_PHOTOMETRIC_MIN_IS_WHITE, _TIFF_PHOTOMETRIC_MIN_IS_BLACK)
+        or len(offsets) != 1
+        or len(byte_counts) != 1
+        or offsets[0] + byte_counts[0] > len(data)
+        or fields.get(_TIFF_IMAGE_WIDTH, (0,))[0] != image.w()
+    ):
+        return None
+    if compression == _TIFF_COMPRESSION_G4:
+        k = -1
+    elif t4_options & _T4_UNCOMPRESSED:
+        return None
+    else:
+        k = 1 if t4_options & _T4_2D else 0
+    decode_params = (
+        f"/K {k} /Columns {image.w()} /Rows {image.h()}"
+        f" /BlackIs1 {'true' if photometric == _TIFF_PHOTOMETRIC_MIN_IS_BLACK else 'false'}"
+    )
+    if compression == _TIFF_COMPRESSION_G3 and t4_options & _T4_FILL_BITS:
+        decode_params += " /EncodedByteAlign true"
+    image_dict = (
+        "/ColorSpace /DeviceGray /BitsPerComponent 1 /Filter /CCITTFaxDecode"
+        f" /DecodeParms << {decode_params} >>"
+    )
+    return image_dict, data[offsets[0] : offsets[0] + byte_counts[0]]
+
+
+def _image_dict_and_stream(
+    image: mupdf.FzImage, data: bytes
+) -> tuple[str, bytes] | None:
+    image_type = mupdf.fz_compressed_image_type(image)
+    if image_type == mupdf.FZ_IMAGE_JPEG:
+        image_dict = _jpeg_dict(image, data)
+        return (image_dict, data) if image_dict else None
+    if image_type == mupdf.FZ_IMAGE_JPX:
+        image_dict = _jpx_dict(image, data)
+        return (image_dict, data) if image_dict else None
+    if image_type == mupdf.FZ_IMAGE_TIFF:
+        return _tiff_ccitt(image, data)
+    return None
+
+
+@dataclass
+class EmbeddableImage(object):
+    width: int
+    height: int
+    # the size of the page, in points
+    page_width: float
+    page_height: float
+    # the entries of the image dictionary which describe the data, its filter included
+    image_dict: str
+    stream: bytes
+
+
+def probe_image(data: bytes) -> EmbeddableImage | None:
+    """Return what is needed to embed the image in `data` as it is, None if it cannot be embedded this way."""
+    try:
+        image = mupdf.fz_new_image_from_buffer(
+            mupdf.fz_new_buffer_from_copied_data(data)
+        )
+        if mupdf.fz_image_orientation(image) > 1 or image.imagemask():
+            return None
+        embedded = _image_dict_and_stream(image, data)
+    except (struct.error, IndexError, RuntimeError):
+        # a broken or unknown file, convert_to_pdf() will tell what is wrong with it
+        return None
+    if embedded is None:
+        return None
+    image_dict, stream = embedded
+    return EmbeddableImage(
+        width=image.w(),
+        height=image.h(),
+        page_width=image.w() * 72 / (image.xres() or _DEFAULT_RESOLUTION),
+        page_height=image.h() * 72 / (image.yres() or _DEFAULT_RESOLUTION),
+        image_dict=image_dict,
+        stream=stream,
+    )
+
+
+def append_image_page(
+    doc: pymupdf.Document,
+    image: EmbeddableImage,
+    page_rect: pymupdf.Rect | None = None,
+    image_rect: pymupdf.Rect | None = None,
+):
+    """
+    Append a page to the document, showing the image with its data embedded as it is. The page has the size of the
+    image, unless `page_rect` is given, with the image shown in `image_rect` on it.
+    """
+    xref = doc.get_new_xref()
+    doc.update_object(xref, "<<>>")
+    # the stream is stored as it is, its filter is set afterward
+    doc.update_stream(xref, image.stream, compress=False)
+    doc.update_object(
+        xref,
+        f"<< /Type /XObject /Subtype /Image /Width {image.width} /Height {image.height}"
+        f" {image.image_dict} /Length {len(image.stream)} >>",
+    )
+    if page_rect is None:
+        page_rect = image_rect = pymupdf.Rect(0, 0, image.page_width, image.page_height)
+    # this method exists but is not resolved by IDE, don't know why
+    # noinspection PyUnresolvedReferences
+    page: pymupdf.Page = doc.new_page(width=page_rect.width, height=page_rect.height)
+    page.insert_image(image_rect, xref=xref)
@@ -0,0 +1,162 @@
+"""
+Page layout, downsampling and recompression of the images of images2pdf, done by the workers.
+
+An image is put on a page of its own size (at its resolution), or fitted into a page of a standard size, centered,
+turned landscape for a landscape image. Its pixels per inch as it is shown on the page is its effective resolution.
+An image above `target_dpi` is downsampled to it, an image of another color mode than asked is converted, and then
+recompressed: as JPEG at `quality`, or as Group 4 fax for bilevel images, both of which are embedded as they are (see
+`_passthrough`). The other images keep their data.
+
+JPEG images are decoded at a reduced resolution when it is enough (Pillow `draft()`, which scales by 1/2, 1/4 or 1/8
+inside the decoder), so a 12 MP photo downsampled to a page of 150 DPI is never decoded at full size.
+"""
+
+import io
+from dataclasses import dataclass
+
+import pymupdf
+from PIL import Image, ImageOps
+
+from ._constants import (
+    PageSize,
+    ColorMode,
+    PAGE_SIZES,
+    DEFAULT_PAGE_SIZE,
+    DEFAULT_TARGET_DPI,
+    DEFAULT_QUALITY,
+    DEFAULT_COLOR_MODE,
+)
+
+# the gray level from which a pixel is white in a bilevel image
+_BILEVEL_THRESHOLD = 128
+_BILEVEL_TABLE = [0 if level < _BILEVEL_THRESHOLD else 255 for level in range(256)]
+# EXIF orientations which swap the width and the height
+_TRANSPOSED_ORIENTATIONS = (5, 6, 7, 8)
+_EXIF_ORIENTATION = 0x0112
+# reduce by an integer factor first, then resample what is left, much faster than resampling all the way
+_REDUCING_GAP = 3.0
+
+
+@dataclass(frozen=True)
+class ImageOptions(object):
+    page_size: PageSize = DEFAULT_PAGE_SIZE
+    target_dpi: int = DEFAULT_TARGET_DPI
+    quality: int = DEFAULT_QUALITY
+    color_mode: ColorMode = DEFAULT_COLOR_MODE
+
+    @property
+    def resamples(self) -> bool:
+        return self.target_dpi > 0 or self.color_mode != ColorMode.Original
+
+
+def page_layout(
+    image_size: tuple[float, float], page_size: PageSize
+) -> tuple[pymupdf.Rect, pymupdf.Rect]:
+    """Return the rectangle of the page and the one of the image on it, for an image of `image_size` points."""
+    image_width, image_height = image_size
+    if page_size == PageSize.Original:
+        rect = pymupdf.Rect(0, 0, image_width, image_height)
+        return rect, rect
+    page_width, page_height = PAGE_SIZES[page_size]
+    if image_width > image_height:
+        page_width, page_height = page_height, page_width
+    scale = min(page_width / image_width, page_height / image_height)
+    width, height = image_width * scale, image_height * scale
+    x, y = (page_width - width) / 2, (page_height - height) / 2
+    return pymupdf.Rect(0, 0, page_width, page_height), pymupdf.Rect(
+        x, y, x + width, y + height
+    )
+
+
+def _target_size(
+    size: tuple[int, int], image_rect: pymupdf.Rect, target_dpi: int
+) -> tuple[int, int]:
+    # the pixel size of the image at the target resolution on the page, never larger than it is
+    width, height = size
+    if target_dpi <= 0:
+        return size
+    scale = min(target_dpi * image_rect.width / 72 / width, 1.0)
+    return max(round(width * scale), 1), max(round(height * scale), 1)
+
+
+def _mode(image: Image.Image, color_mode: ColorMode) -> str:
+    # the Pillow mode the image is recompressed in
+    if color_mode == ColorMode.Bilevel or image.mode == "1":
+        return "1"
+    if color_mode == ColorMode.Gray or image.mode in ("L", "LA", "I", "I;16", "F"):
+        return "L"
+    return "RGB"
+
+
+def _flatten(image: Image.Image) -> Image.Image:
+    # a transparent image is shown on white paper
+    if image.mode in ("RGBA", "LA") or (
+        image.mode == "P" and "transparency" in image.info
+    ):
+        image = image.convert("RGBA")
+        background = Image.new("RGBA", image.size, "white")
+        return Image.alpha_composite(background, image).convert("RGB")
+    return image
+
+
+def recompress(
+    data: bytes, image_rect: pymupdf.Rect, options: ImageOptions
+) -> bytes | None:
+    """
+    Downsample the image in `data` to `options.target_dpi` as it is shown in `image_rect`, convert it to the color
+    mode and recompress it. Return None if there is nothing to do: it is not above the target resolution and has the
+    color mode already, or if Pillow cannot do it (an unknown format, several frames), then the image keeps its data.
+    """
+    try:
+        image = Image.open(io.BytesIO(data))
+    except Image.UnidentifiedImageError:
+        return None
+    with image:
+        if getattr(image, "n_frames", 1) > 1:
+            # one page for each frame, as before
+            return None
+        orientation = image.getexif().get(_EXIF_ORIENTATION, 1)
+        stored_size = image.size
+        size = stored_size
+        if orientation in _TRANSPOSED_ORIENTATIONS:
+            size = (stored_size[1], stored_size[0])
+        target_size = _target_size(size, image_rect, options.target_dpi)
+        mode = _mode(image, options.color_mode)
+        if target_size == size and (
+            options.color_mode == ColorMode.Original
+            or image.mode == mode
+            or (mode == "L" and image.mode == "1")
+        ):
+            return None
+        draft_size = target_size
+        if orientation in _TRANSPOSED_ORIENTATIONS:
+            draft_size = (target_size[1], target_size[0])
+        # only a JPEG decoder can do this, it decodes straight into gray if asked
+        image.draft("L" if mode != "RGB" else "RGB", draft_size)
+        image = ImageOps.exif_transpose(_flatten(image))
+        if image.mode not in ("1", "L", "RGB"):
+            image = image.convert("L" if mode != "RGB" else "RGB")
+        if mode == "RGB" and image.mode != "RGB":
+            image = image.convert("RGB")
+        elif mode != "RGB" and image.mode == "RGB":
+            image = image.convert("L")
+        if image.size != target_size:
+            if image.mode == "1":
+                image = image.convert("L")
+            image = image.resize(
+                target_size, Image.Resampling.LANCZOS, reducing_gap=_REDUCING_GAP
+            )
+        output = io.BytesIO()
+        if mode == "1":
+            if image.mode != "1":
+                image = image.point(_BILEVEL_TABLE, mode="1")
+            # in a single strip, which can be embedded as it is
+            image.save(
+                output,
+                format="TIFF",
+                compression="group4",
+                strip_size=image.width * image.height,
+            )
+        else:
+            image.save(output, format="JPEG", quality=options.quality)
+        return output.getvalue()
@@ -1,4 +1,26 @@
-from ._export import use
+from typing import TYPE_CHECKING, Any
 
+if TYPE_CHECKING:
+    from pyguiadapter.adapter import GUIAdapter
 
-__all__ = ["use"]
+    from ._stream import iter_page_rasters, PageRaster
+
+
+def use(adapter: "GUIAdapter"):
+    # the GUI parts (widgets, translations) are imported only when the tool is added to a GUI, so that the
+    # implementation can be imported by a headless process without starting Qt
+    from ._export import use as _use
+
+    _use(adapter)
+
+
+def __getattr__(name: str) -> Any:
+    # the streaming API imports the renderer (pymupdf, py_multitasking), which the GUI does not need at startup
+    if name in ("iter_page_rasters", "PageRaster"):
+        from . import _stream
+
+        return getattr(_stream, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = ["use", "iter_page_rasters", "PageRaster"]
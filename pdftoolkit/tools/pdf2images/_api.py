@@ -0,0 +1,263 @@
+"""
+The functions of pdf2images added to the GUI and used by the command line. This module only imports what their
+signatures need, the implementation is imported when they are called, so that the GUI starts without loading pymupdf
+and py_multitasking.
+"""
+
+import gc
+import os
+import time
+from pathlib import Path
+
+from pyguiadapter.extend_types import file_t, directory_t, string_list_t, text_t
+
+from ._constants import (
+    DuplicatePolicy,
+    ArchiveFormat,
+    DedupMode,
+    BlankPagePolicy,
+    ImageFormat,
+    DEFAULT_INPUT_FILE,
+    DEFAULT_OUTPUT_DIR,
+    DEFAULT_FILENAME_FORMAT,
+    DEFAULT_IMAGE_FORMAT,
+    DEFAULT_EXTRA_PROFILES,
+    DEFAULT_DUPLICATE_POLICY,
+    DEFAULT_ARCHIVE_FORMAT,
+    DEFAULT_PAGE_RANGES,
+    DEFAULT_DPI,
+    DEFAULT_ALPHA,
+    DEFAULT_ROTATION,
+    DEFAULT_COLORSPACE,
+    DEFAULT_ANNOTS,
+    DEFAULT_PNG_COMPRESS_LEVEL,
+    DEFAULT_QUALITY,
+    DEFAULT_ENCODER_THREADS,
+    DEFAULT_RASTER_MEMORY_LIMIT,
+    DEFAULT_DEDUP,
+    DEFAULT_DEDUP_HARDLINK,
+    DEFAULT_BLANK_PAGE_POLICY,
+    DEFAULT_BLANK_THRESHOLD,
+    DEFAULT_INPUT_PATHS,
+    DEFAULT_RECURSIVE,
+    DEFAULT_BATCH_OUTPUT_DIR,
+)
+from ..commons.constants import (
+    ALL_PAGES,
+    DEFAULT_WORKER_COUNT,
+    DEFAULT_VERBOSE,
+    DEFAULT_OPEN_OUTPUT_DIR,
+)
+from ..commons.reporter import pprint
+from ..commons.validators import ensure_file_exists, ensure_non_empty_sequence
+from ...utils import open_in_file_manager
+
+
+def pdf2images(
+    input_file: file_t = DEFAULT_INPUT_FILE,
+    output_dir: directory_t = DEFAULT_OUTPUT_DIR,
+    filename_format: str = DEFAULT_FILENAME_FORMAT,
+    image_format: ImageFormat = DEFAULT_IMAGE_FORMAT,
+    extra_profiles: text_t = DEFAULT_EXTRA_PROFILES,
+    duplicate_policy: DuplicatePolicy = DEFAULT_DUPLICATE_POLICY,
+    archive_format: ArchiveFormat = DEFAULT_ARCHIVE_FORMAT,
+    page_ranges: str = DEFAULT_PAGE_RANGES,
+    dpi: int = DEFAULT_DPI,
+    alpha: bool = DEFAULT_ALPHA,
+    rotation: int = DEFAULT_ROTATION,
+    colorspace: str = DEFAULT_COLORSPACE,
+    annots: bool = DEFAULT_ANNOTS,
+    png_compress_level: int = DEFAULT_PNG_COMPRESS_LEVEL,
+    quality: int = DEFAULT_QUALITY,
+    encoder_threads: int = DEFAULT_ENCODER_THREADS,
+    raster_memory_limit: int = DEFAULT_RASTER_MEMORY_LIMIT,
+    dedup: DedupMode = DEFAULT_DEDUP,
+    dedup_hardlink: bool = DEFAULT_DEDUP_HARDLINK,
+    blank_page_policy: BlankPagePolicy = DEFAULT_BLANK_PAGE_POLICY,
+    blank_threshold: float = DEFAULT_BLANK_THRESHOLD,
+    worker_count: int = DEFAULT_WORKER_COUNT,
+    verbose: bool = DEFAULT_VERBOSE,
+    open_output_dir: bool = DEFAULT_OPEN_OUTPUT_DIR,
+):
+    # the implementation (pymupdf, py_multitasking...) is imported when the tool runs, not when it is added to the GUI
+    from ._impl import (
+        _check_params,
+        _convert,
+        _normalize_worker_count,
+        _prepare_job,
+        _run_summary,
+    )
+
+    worker_count = _normalize_worker_count(worker_count)
+    page_ranges = page_ranges.strip() or ALL_PAGES
+    input_file_path = Path(input_file).absolute()
+
+    ensure_file_exists("input_file", input_file_path.as_posix())
+    profiles = _check_params(
+        filename_format=filename_format,
+        image_format=image_format,
+        extra_profiles=extra_profiles,
+        dpi=dpi,
+        rotation=rotation,
+        png_compress_level=png_compress_level,
+        quality=quality,
+        encoder_threads=encoder_threads,
+        raster_memory_limit=raster_memory_limit,
+        blank_threshold=blank_threshold,
+        worker_count=worker_count,
+    )
+
+    time_start = time.time_ns()
+    job = _prepare_job(
+        input_file_path,
+        page_ranges,
+        output_dir,
+        profiles,
+        alpha,
+        colorspace,
+        archive_format,
+    )
+    timings = _convert(
+        [job],
+        profiles,
+        duplicate_policy=duplicate_policy,
+        alpha=alpha,
+        rotation=rotation,
+        colorspace=colorspace,
+        annots=annots,
+        png_compress_level=png_compress_level,
+        quality=quality,
+        encoder_threads=encoder_threads,
+        raster_memory_limit=raster_memory_limit,
+        worker_count=worker_count,
+        verbose=verbose,
+        dedup=dedup,
+        dedup_hardlink=dedup_hardlink,
+        blank_page_policy=blank_page_policy,
+        blank_threshold=blank_threshold,
+        archive_format=archive_format,
+    )
+    time_eclipsed = (time.time_ns() - time_start) / 1e9
+    pprint(f"Finished in {time_eclipsed:.2f} seconds", verbose=verbose)
+
+    if open_output_dir:
+        open_in_file_manager(job.output_dir_path)
+
+    gc.collect()
+    return _run_summary(time_eclipsed, timings)
+
+
+def pdf2images_batch(
+    input_paths: string_list_t = DEFAULT_INPUT_PATHS,
+    recursive: bool = DEFAULT_RECURSIVE,
+    output_dir: directory_t = DEFAULT_BATCH_OUTPUT_DIR,
+    filename_format: str = DEFAULT_FILENAME_FORMAT,
+    image_format: ImageFormat = DEFAULT_IMAGE_FORMAT,
+    extra_profiles: text_t = DEFAULT_EXTRA_PROFILES,
+    duplicate_policy: DuplicatePolicy = DEFAULT_DUPLICATE_POLICY,
+    archive_format: ArchiveFormat = DEFAULT_ARCHIVE_FORMAT,
+    page_ranges: str = DEFAULT_PAGE_RANGES,
+    dpi: int = DEFAULT_DPI,
+    alpha: bool = DEFAULT_ALPHA,
+    rotation: int = DEFAULT_ROTATION,
+    colorspace: str = DEFAULT_COLORSPACE,
+    annots: bool = DEFAULT_ANNOTS,
+    png_compress_level: int = DEFAULT_PNG_COMPRESS_LEVEL,
+    quality: int = DEFAULT_QUALITY,
+    encoder_threads: int = DEFAULT_ENCODER_THREADS,
+    raster_memory_limit: int = DEFAULT_RASTER_MEMORY_LIMIT,
+    dedup: DedupMode = DEFAULT_DEDUP,
+    dedup_hardlink: bool = DEFAULT_DEDUP_HARDLINK,
+    blank_page_policy: BlankPagePolicy = DEFAULT_BLANK_PAGE_POLICY,
+    blank_threshold: float = DEFAULT_BLANK_THRESHOLD,
+    worker_count: int = DEFAULT_WORKER_COUNT,
+    verbose: bool = DEFAULT_VERBOSE,
+    open_output_dir: bool = DEFAULT_OPEN_OUTPUT_DIR,
+):
+    # the implementation (pymupdf, py_multitasking...) is imported when the tool runs, not when it is added to the GUI
+    from ._batch import _expand_input_paths, _check_output_collisions
+    from ._impl import (
+        _check_params,
+        _convert,
+        _create_output_dirs,
+        _normalize_worker_count,
+        _prepare_job,
+        _run_summary,
+    )
+
+    worker_count = _normalize_worker_count(worker_count)
+    page_ranges = page_ranges.strip() or ALL_PAGES
+
+    input_files = _expand_input_paths(input_paths or [], recursive)
+    ensure_non_empty_sequence(
+        "input_paths", input_files, msg="no PDF file found in input paths"
+    )
+    profiles = _check_params(
+        filename_format=filename_format,
+        image_format=image_format,
+        extra_profiles=extra_profiles,
+        dpi=dpi,
+        rotation=rotation,
+        png_compress_level=png_compress_level,
+        quality=quality,
+        encoder_threads=encoder_threads,
+        raster_memory_limit=raster_memory_limit,
+        blank_threshold=blank_threshold,
+        worker_count=worker_count,
+    )
+
+    time_start = time.time_ns()
+    jobs = []
+    for input_file in input_files:
+        try:
+            jobs.append(
+                _prepare_job(
+                    input_file,
+                    page_ranges,
+                    output_dir,
+                    profiles,
+                    alpha,
+                    colorspace,
+                    archive_format,
+                    create_dirs=False,
+                )
+            )
+        except RuntimeError as e:
+            # a broken file should not stop the whole batch
+            pprint(f"[Error] file: {input_file}; error: {e}", verbose=verbose)
+    # before anything is created
+    _check_output_collisions(jobs)
+    for job in jobs:
+        _create_output_dirs(job)
+    pprint(f"{len(jobs)} of {len(input_files)} file(s) to convert", verbose=verbose)
+
+    timings = _convert(
+        jobs,
+        profiles,
+        duplicate_policy=duplicate_policy,
+        alpha=alpha,
+        rotation=rotation,
+        colorspace=colorspace,
+        annots=annots,
+        png_compress_level=png_compress_level,
+        quality=quality,
+        encoder_threads=encoder_threads,
+        raster_memory_limit=raster_memory_limit,
+        worker_count=worker_count,
+        verbose=verbose,
+        dedup=dedup,
+        dedup_hardlink=dedup_hardlink,
+        blank_page_policy=blank_page_policy,
+        blank_threshold=blank_threshold,
+        archive_format=archive_format,
+    )
+    time_eclipsed = (time.time_ns() - time_start) / 1e9
+    pprint(f"Finished in {time_eclipsed:.2f} seconds", verbose=verbose)
+
+    if open_output_dir and jobs:
+        open_in_file_manager(
+            Path(os.path.commonpath([job.output_dir_path for job in jobs]))
+        )
+
+    gc.collect()
+    return _run_summary(time_eclipsed, timings)
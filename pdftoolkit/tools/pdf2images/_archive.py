@@ -0,0 +1,158 @@
+"""
+Archive output of pdf2images.
+
+With an archive format, the outputs of a document are the entries of one archive in its output directory, named after
+the document (`<output_dir>/<instem>.zip`). The output path of a page is a virtual path inside the archive, such as
+`<output_dir>/report.zip/page-1.png`, this is what the page results, the events and the dedup mapping show.
+
+The workers encode the pages into memory and send them with their results, the pages rendered in tiles (too large to be
+held in memory) are written to a spool file instead. The parent is the only writer of an archive. Results arrive in any
+order, an output which arrives before the ones preceding it waits until they have arrived, so that the entries are
+appended in page order. The waiting outputs are held in memory up to `DEFAULT_ARCHIVE_BUFFER_SIZE`, the ones beyond it
+are spilled to spool files, so that a slow early page never makes the rest of the document pile up in the parent.
+
+An archive is resumed unless the duplicate policy is to overwrite: the entries it already has are skipped, the missing
+ones are appended after them.
+"""
+
+import os
+import tempfile
+from collections import deque
+from pathlib import Path
+
+from ._constants import ArchiveFormat
+from ..commons.archive import ArchiveWriter, ZipArchiveWriter, TarArchiveWriter
+from ..commons.memory import MB
+
+ARCHIVE_EXTENSIONS = {
+    ArchiveFormat.ZIP: ".zip",
+    ArchiveFormat.TAR: ".tar",
+}
+_ARCHIVE_WRITERS: dict[ArchiveFormat, type[ArchiveWriter]] = {
+    ArchiveFormat.ZIP: ZipArchiveWriter,
+    ArchiveFormat.TAR: TarArchiveWriter,
+}
+# the outputs waiting for their turn held in memory by an archive, the others are spilled to spool files
+DEFAULT_ARCHIVE_BUFFER_SIZE = 64 * MB
+
+
+def archive_path(
+    output_dir_path: Path, input_file_path: Path, archive_format: ArchiveFormat
+) -> Path:
+    return output_dir_path / (input_file_path.stem + ARCHIVE_EXTENSIONS[archive_format])
+
+
+def create_spool_file(output_path: str) -> str:
+    """Create a temporary file for an output of an archive, with the extension which decides its format."""
+    fd, spool_path = tempfile.mkstemp(
+        prefix="pdf2images-", suffix=os.path.splitext(output_path)[1]
+    )
+    os.close(fd)
+    return spool_path
+
+
+def remove_spool_file(spool_path: str):
+    try:
+        os.remove(spool_path)
+    except OSError:
+        pass
+
+
+class ArchiveSink(object):
+    def __init__(
+        self,
+        archive_file_path: Path,
+        archive_format: ArchiveFormat,
+        resume: bool,
+        buffer_size: int = DEFAULT_ARCHIVE_BUFFER_SIZE,
+    ):
+        self._archive_path = archive_file_path
+        self._writer = _ARCHIVE_WRITERS[archive_format](archive_file_path, resume)
+        # the output paths expected from the workers, in page order
+        self._expected: deque[str] = deque()
+        # output path -> (data, spool file) of the outputs which arrived before their turn
+        self._arrived: dict[str, tuple[bytes | memoryview | None, str | None]] = {}
+        self._buffer_size = buffer_size
+        # the size of the data of the outputs in _arrived
+        self._buffered = 0
+        self.written_count = 0
+
+    @property
+    def archive_path(self) -> Path:
+        return self._archive_path
+
+    @property
+    def entry_count(self) -> int:
+        return len(self._writer.names)
+
+    def entry_name(self, output_path: str) -> str:
+        return Path(output_path).relative_to(self._archive_path).as_posix()
+
+    def has_output(self, output_path: str) -> bool:
+        return self.entry_name(output_path) in self._writer.names
+
+    def expect(self, output_path: str):
+        self._expected.append(output_path)
+
+    def put(
+        self,
+        output_path: str,
+        data: bytes | memoryview | None,
+        spool_path: str | None,
+    ):
+        """
+        Hand over an expected output (without data nor spool file if it was not rendered: skipped, failed, duplicate),
+        then append the outputs whose turn has come to the archive. A memoryview is only read during this call.
+        """
+        self._arrived[output_path] = (data, spool_path)
+        while self._expected and self._expected[0] in self._arrived:
+            next_output_path = self._expected.popleft()
+            next_data, next_spool_path = self._arrived.pop(next_output_path)
+            if next_data is not None and next_output_path != output_path:
+                self._buffered -= len(next_data)
+            self._write(next_output_path, next_data, next_spool_path)
+        if output_path in self._arrived and data is not None:
+            # waits for its turn, the memory it is in is given back to the transport when this returns
+            self._arrived[output_path] = self._hold(output_path, data)
+
+    def _hold(
+        self, output_path: str, data: bytes | memoryview
+    ) -> tuple[bytes | None, str | None]:
+        data = bytes(data)
+        if self._buffered + len(data) <= self._buffer_size:
+            self._buffered += len(data)
+            return data, None
+        spool_path = create_spool_file(output_path)
+        try:
+            with open(spool_path, "wb") as f:
+                f.write(data)
+        except BaseException:
+            remove_spool_file(spool_path)
+            raise
+        return None, spool_path
+
+    def _write(
+        self, output_path: str, data: bytes | memoryview | None, spool_path: str | None
+    ):
+        name = self.entry_name(output_path)
+        try:
+            if data is not None:
+                self._writer.add(name, data)
+                self.written_count += 1
+            elif spool_path is not None:
+                self._writer.add_file(name, spool_path)
+                self.written_count += 1
+        finally:
+            if spool_path is not None:
+                remove_spool_file(spool_path)
+
+    def close(self):
+        # the outputs still waiting for their turn are dropped, they are rendered again when the archive is resumed
+        try:
+            self._writer.close()
+        finally:
+            for _, spool_path in self._arrived.values():
+                if spool_path is not None:
+                    remove_spool_file(spool_path)
+            self._arrived.clear()
+            self._buffered = 0
@@ -0,0 +1,76 @@
+"""
+Batch mode of pdf2images: convert the pages of many PDF files in one run.
+
+The pages of all input files are scheduled across one worker pool, so small files no longer leave the other cores idle
+and the pool is not set up again for every file. The tool function, `pdf2images_batch()`, is in `_api`.
+"""
+
+import glob
+import os
+from pathlib import Path
+from typing import Sequence, TYPE_CHECKING
+
+from pyguiadapter.exceptions import ParameterError
+
+if TYPE_CHECKING:
+    from ._impl import _DocumentJob
+
+PDF_FILE_PATTERN = "*.pdf"
+_GLOB_CHARS = ("*", "?", "[")
+
+
+def _is_pdf_file(path: Path) -> bool:
+    return path.is_file() and path.suffix.lower() == ".pdf"
+
+
+def _expand_input_paths(input_paths: list[str], recursive: bool) -> list[Path]:
+    # each entry can be a file, a directory or a glob pattern
+    files = {}
+    for input_path in input_paths:
+        input_path = input_path.strip()
+        if not input_path:
+            continue
+        if any(c in input_path for c in _GLOB_CHARS):
+            matches = sorted(
+                Path(match) for match in glob.glob(input_path, recursive=True)
+            )
+        elif os.path.isdir(input_path):
+            directory = Path(input_path)
+            matches = sorted(
+                directory.rglob(PDF_FILE_PATTERN)
+                if recursive
+                else directory.glob(PDF_FILE_PATTERN)
+            )
+        else:
+            matches = [Path(input_path)]
+        for match in matches:
+            if _is_pdf_file(match):
+                files.setdefault(match.absolute(), None)
+    return list(files.keys())
+
+
+def _check_output_collisions(jobs: Sequence["_DocumentJob"]):
+    """
+    Raise a ParameterError if two input files would write the same output file (or archive), which happens when the
+    output directory and the filename format do not tell the documents apart: the workers would overwrite each
+    other's pages.
+    """
+    owners = {}
+    for job in jobs:
+        if job.archive_path is not None:
+            output_paths = [job.archive_path.as_posix()]
+        else:
+            output_paths = [
+                output_path
+                for profile_output_paths in job.profile_output_paths
+                for _, output_path in profile_output_paths
+            ]
+        for output_path in output_paths:
+            owner = owners.setdefault(output_path, job.input_file_path)
+            if owner != job.input_file_path:
+                raise ParameterError(
+                    "output_dir",
+                    f"{owner.as_posix()} and {job.input_file_path.as_posix()} would both write {output_path}, "
+                    f"put a variable of the input file (such as $instem or $indir) into the output directory or the "
+                    f"filename format",
+                )
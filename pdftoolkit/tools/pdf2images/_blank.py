@@ -0,0 +1,44 @@
+"""
+Detection of blank pages for pdf2images.
+
+A page is probed before it is rendered at full resolution, in two steps:
+
+- `has_no_contents()`: a PDF page without anything to draw (no content stream, or only whitespace, and no annotation
+  or form field to render) is blank, it is not even interpreted.
+- `ink_coverage()`: otherwise, the display list of the page is rasterized in gray at `BLANK_PROBE_DPI`, and the share
+  of its pixels darker than `BLANK_INK_LEVEL` is its ink coverage. The page is blank if the coverage is not above the
+  threshold. Scanned pages always have a content stream (the scan), they are decided by this step, which tolerates a
+  page number or some dust depending on the threshold.
+"""
+
+import pymupdf
+
+from ._constants import BLANK_PROBE_DPI, BLANK_INK_LEVEL
+
+# maps the gray levels to 1 for ink, 0 for paper, so that counting the ink is two passes in C over the samples
+_INK_TABLE = bytes(1 if level < BLANK_INK_LEVEL else 0 for level in range(256))
+
+
+def has_no_contents(document: pymupdf.Document, page_index: int, annots: bool) -> bool:
+    if not document.is_pdf:
+        return False
+    try:
+        page = document[page_index]
+        if annots and (page.first_annot is not None or page.first_widget is not None):
+            return False
+        return not page.read_contents().strip()
+    except Exception:
+        # a broken page, it will fail when it is rendered
+        return False
+
+
+def ink_coverage(display_list: pymupdf.DisplayList) -> float:
+    """Return the ink coverage of the page, in percent."""
+    zoom = BLANK_PROBE_DPI / 72
+    pixmap = display_list.get_pixmap(
+        matrix=pymupdf.Matrix(zoom, zoom), colorspace=pymupdf.csGRAY, alpha=False
+    )
+    samples = pixmap.samples
+    if not samples:
+        return 0.0
+    return samples.translate(_INK_TABLE).count(1) * 100 / len(samples)
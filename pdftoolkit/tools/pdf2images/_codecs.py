@@ -0,0 +1,245 @@
+"""
+Encoding of rendered pixmaps into image files.
+
+`pixmap.save()` holds the GIL while MuPDF compresses the image, so it cannot overlap with the rendering of the next
+page. Pillow releases the GIL while encoding and writing, that's why Pillow is used whenever it can handle the pixmap
+and the output format, and `pixmap.save()` is only a fallback.
+"""
+
+import io
+import os
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+
+import pymupdf
+from PIL import Image
+
+from ._constants import (
+    ImageFormat,
+    DEFAULT_IMAGE_FORMAT,
+    DEFAULT_PNG_COMPRESS_LEVEL,
+    DEFAULT_QUALITY,
+)
+from ..commons.timing import StageTimer, measure
+
+# (number of color components, alpha) -> Pillow mode
+_PIL_MODES = {
+    (1, False): "L",
+    (1, True): "LA",
+    (3, False): "RGB",
+    (3, True): "RGBA",
+    (4, False): "CMYK",
+}
+# Pillow modes with alpha -> their premultiplied counterparts
+_PIL_PREMULTIPLIED_MODES = {
+    "LA": "La",
+    "RGBA": "RGBa",
+}
+# formats which cannot store the given Pillow modes
+_UNSUPPORTED_MODES = {
+    "PNG": ("CMYK",),
+    "JPEG": ("LA", "RGBA"),
+}
+# image format -> Pillow format
+_PIL_FORMATS = {
+    ImageFormat.PNG: "PNG",
+    ImageFormat.JPEG: "JPEG",
+    ImageFormat.WEBP: "WEBP",
+    ImageFormat.TIFF: "TIFF",
+}
+# image format -> file extension
+_FILE_EXTENSIONS = {
+    ImageFormat.PNG: ".png",
+    ImageFormat.JPEG: ".jpg",
+    ImageFormat.WEBP: ".webp",
+    ImageFormat.PNM: ".pnm",
+    ImageFormat.TIFF: ".tiff",
+}
+# MuPDF writes these formats to files only, not into memory
+_FILE_ONLY_EXTENSIONS = (".psd",)
+# the level of zlib MuPDF compresses PNG with
+_MUPDF_PNG_COMPRESS_LEVEL = 6
+# PNM cannot store alpha or CMYK, MuPDF writes a PAM file in these cases
+_PAM_FILE_EXTENSION = ".pam"
+
+
+@dataclass(frozen=True)
+class EncodeOptions(object):
+    image_format: ImageFormat = DEFAULT_IMAGE_FORMAT
+    png_compress_level: int = DEFAULT_PNG_COMPRESS_LEVEL
+    quality: int = DEFAULT_QUALITY
+    # encoded on an encoder thread, where Pillow overlaps with the rendering of the next page, otherwise MuPDF writes
+    # the PNG it compresses the same way, a little faster
+    threaded: bool = True
+
+
+def file_extension(
+    image_format: ImageFormat, alpha: bool, colorspace: str
+) -> str | None:
+    """Return the file extension of the format, None for `ImageFormat.Auto` (the extension decides the format)."""
+    if image_format == ImageFormat.Auto:
+        return None
+    if image_format == ImageFormat.PNM and (alpha or colorspace.upper() == "CMYK"):
+        return _PAM_FILE_EXTENSION
+    return _FILE_EXTENSIONS[image_format]
+
+
+def _pil_format(output_filepath: Path, image_format: ImageFormat) -> str | None:
+    if image_format != ImageFormat.Auto:
+        return _PIL_FORMATS.get(image_format, None)
+    pil_format = Image.registered_extensions().get(output_filepath.suffix.lower(), None)
+    # Pillow reads more formats than it writes (PSD for instance), MuPDF writes those
+    if pil_format not in Image.SAVE:
+        return None
+    return pil_format
+
+
+def _to_pil_image(pixmap: pymupdf.Pixmap) -> Image.Image | None:
+    return to_pil_image(
+        pixmap.samples_mv,
+        pixmap.width,
+        pixmap.height,
+        pixmap.n - pixmap.alpha,
+        bool(pixmap.alpha),
+        pixmap.stride,
+    )
+
+
+def to_pil_image(
+    samples, width: int, height: int, components: int, alpha: bool, stride: int
+) -> Image.Image | None:
+    """
+    Wrap raw samples of MuPDF into a Pillow image, return None if Pillow has no matching mode. MuPDF premultiplies
+    colors with alpha, these are converted to straight alpha (like `pixmap.save()` does), otherwise the samples are
+    shared without a copy.
+    """
+    mode = _PIL_MODES.get((components, alpha), None)
+    if mode is None:
+        return None
+    premultiplied_mode = _PIL_PREMULTIPLIED_MODES.get(mode, None)
+    if premultiplied_mode is not None:
+        image = Image.frombuffer(
+            premultiplied_mode,
+            (width, height),
+            samples,
+            "raw",
+            premultiplied_mode,
+            stride,
+            1,
+        )
+        return image.convert(mode)
+    return Image.frombuffer(mode, (width, height), samples, "raw", mode, stride, 1)
+
+
+def _pil_save_options(
+    pixmap: pymupdf.Pixmap, pil_format: str, options: EncodeOptions
+) -> dict:
+    # keep the resolution in the file like pixmap.save() does
+    save_options = {"dpi": (pixmap.xres, pixmap.yres)}
+    if pil_format == "PNG":
+        save_options["compress_level"] = options.png_compress_level
+    elif pil_format in ("JPEG", "WEBP"):
+        save_options["quality"] = options.quality
+    elif pil_format == "TIFF":
+        # uncompressed, as fast as it can be
+        save_options["compression"] = None
+    return save_options
+
+
+def _mupdf_output(output_filepath: Path, options: EncodeOptions) -> str | None:
+    # the output format of MuPDF, None to let it follow the extension
+    if options.image_format == ImageFormat.PNM:
+        return "pam" if output_filepath.suffix == _PAM_FILE_EXTENSION else "pnm"
+    return None
+
+
+def _encode_with_pil(
+    pixmap: pymupdf.Pixmap,
+    output_filepath: Path,
+    options: EncodeOptions,
+    timer: StageTimer | None,
+) -> io.BytesIO | None:
+    # return the encoded image, None if it is left to MuPDF
+    if options.image_format == ImageFormat.PNM:
+        # raw samples with a tiny header, MuPDF writes them about as fast as the disk can take them
+        return None
+    pil_format = _pil_format(output_filepath, options.image_format)
+    if (
+        pil_format == "PNG"
+        and not options.threaded
+        and options.png_compress_level == _MUPDF_PNG_COMPRESS_LEVEL
+    ):
+        return None
+    image = _to_pil_image(pixmap) if pil_format else None
+    if image is None:
+        return None
+    if image.mode in _UNSUPPORTED_MODES.get(pil_format, ()):
+        if options.image_format == ImageFormat.Auto:
+            # let MuPDF decide, as it did before
+            return None
+        raise ValueError(f"{pil_format} cannot store {image.mode} images")
+    with measure(timer, "encode"):
+        buffer = io.BytesIO()
+        image.save(
+            buffer,
+            format=pil_format,
+            **_pil_save_options(pixmap, pil_format, options),
+        )
+        del image
+    return buffer
+
+
+def save_pixmap(
+    pixmap: pymupdf.Pixmap,
+    output_filepath: Path,
+    options: EncodeOptions,
+    timer: StageTimer | None = None,
+):
+    """
+    Save the pixmap with Pillow if possible (releases the GIL), otherwise with `pixmap.save()`. Pillow encodes into
+    memory first, so that the time of the "encode" and the "write" stages can be told apart, MuPDF encodes and writes
+    in one go, which is recorded as "write".
+    """
+    buffer = _encode_with_pil(pixmap, output_filepath, options, timer)
+    if buffer is None:
+        with measure(timer, "write"):
+            pixmap.save(output_filepath, output=_mupdf_output(output_filepath, options))
+        return
+    with measure(timer, "write"):
+        with open(output_filepath, "wb") as f:
+            f.write(buffer.getbuffer())
+
+
+def encode_pixmap(
+    pixmap: pymupdf.Pixmap,
+    output_filepath: Path,
+    options: EncodeOptions,
+    timer: StageTimer | None = None,
+) -> bytes:
+    """
+    Return the content `save_pixmap()` would write to the file, for outputs which are not written to the file system
+    (such as the entries of an archive). The file is not written, its name decides the format like it does for
+    `save_pixmap()`.
+    """
+    buffer = _encode_with_pil(pixmap, output_filepath, options, timer)
+    if buffer is not None:
+        return buffer.getvalue()
+    with measure(timer, "encode"):
+        if output_filepath.suffix.lower() in _FILE_ONLY_EXTENSIONS:
+            return _encode_through_file(pixmap, output_filepath.suffix)
+        return pixmap.tobytes(
+            _mupdf_output(output_filepath, options)
+            or output_filepath.suffix.lstrip(".").lower()
+        )
+
+
+def _encode_through_file(pixmap: pymupdf.Pixmap, suffix: str) -> bytes:
+    fd, path = tempfile.mkstemp(suffix=suffix)
+    os.close(fd)
+    try:
+        pixmap.save(path)
+        with open(path, "rb") as f:
+            return f.read()
+    finally:
+        os.remove(path)
@@ -0,0 +1,108 @@
+"""
+The enums, constants and default values of the parameters of pdf2images. Unlike `_paramconf`, this module does not
+import the widgets of pyguiadapter (and Qt), so that the implementation can be used in a headless process.
+"""
+
+import enum
+
+from ..commons import ALL_PAGES
+
+
+class DuplicatePolicy(enum.Enum):
+    Skip = "skip"
+    Overwrite = "overwrite"
+    # only render pages whose output is missing or stale according to the job manifest
+    Incremental = "incremental"
+
+
+class ArchiveFormat(enum.Enum):
+    # write the outputs as files
+    Off = "off"
+    ZIP = "zip"
+    TAR = "tar"
+
+
+class DedupMode(enum.Enum):
+    Off = "off"
+    # hash what a page is drawn from, before rendering it
+    Content = "content"
+    # hash the rendered raster, exact
+    Raster = "raster"
+
+
+class BlankPagePolicy(enum.Enum):
+    Off = "off"
+    # render blank pages as usual, report them as blank
+    Flag = "flag"
+    # do not render blank pages
+    Skip = "skip"
+
+
+class ImageFormat(enum.Enum):
+    # decided by the extension in the filename format
+    Auto = "auto"
+    PNG = "png"
+    JPEG = "jpeg"
+    WEBP = "webp"
+    # uncompressed
+    PNM = "pnm"
+    TIFF = "tiff"
+
+
+CS_RGB = "RGB"
+CS_GRAY = "GRAY"
+CS_CMYK = "CMYK"
+
+MIN_DPI = 72
+MAX_DPI = 7000
+MIN_ROTATION = 0
+MAX_ROTATION = 360
+ROTATION_STEP = 90
+MIN_ENCODER_THREADS = 0
+MIN_PNG_COMPRESS_LEVEL = 0
+MAX_PNG_COMPRESS_LEVEL = 9
+MIN_QUALITY = 1
+MAX_QUALITY = 100
+MAX_ENCODER_THREADS = 8
+# in MB, 0 means no limit
+MIN_RASTER_MEMORY_LIMIT = 0
+MAX_RASTER_MEMORY_LIMIT = 65536
+# the ink coverage of a blank page, in percent
+MIN_BLANK_THRESHOLD = 0.0
+MAX_BLANK_THRESHOLD = 100.0
+
+DEFAULT_INPUT_FILE = ""
+DEFAULT_OUTPUT_DIR = "$indir/output/"
+DEFAULT_FILENAME_FORMAT = "page-$page.png"
+DEFAULT_PAGE_RANGES = ALL_PAGES
+DEFAULT_DPI = 300
+DEFAULT_ALPHA = False
+DEFAULT_ROTATION = 0
+DEFAULT_COLORSPACE = CS_RGB
+DEFAULT_ANNOTS = True
+DEFAULT_ENCODER_THREADS = 2
+DEFAULT_IMAGE_FORMAT = ImageFormat.Auto
+DEFAULT_EXTRA_PROFILES = ""
+# zlib's default level, the one MuPDF compresses with, the files are about the size pixmap.save() writes
+DEFAULT_PNG_COMPRESS_LEVEL = 6
+DEFAULT_QUALITY = 90
+DEFAULT_RASTER_MEMORY_LIMIT = 0
+DEFAULT_DUPLICATE_POLICY = DuplicatePolicy.Skip
+DEFAULT_ARCHIVE_FORMAT = ArchiveFormat.Off
+DEFAULT_DEDUP = DedupMode.Off
+# hardlink duplicate pages to their originals, or only record them in the mapping file
+DEFAULT_DEDUP_HARDLINK = True
+DEFAULT_BLANK_PAGE_POLICY = BlankPagePolicy.Off
+# a page number or a few specks of dust are tolerated
+DEFAULT_BLANK_THRESHOLD = 0.05
+
+# pages are probed for blankness in gray at this resolution, pixels darker than the ink level count as ink
+BLANK_PROBE_DPI = 24
+BLANK_INK_LEVEL = 192
+
+# let pdf2images choose the number of workers from the page sizes and the available memory
+WORKER_COUNT_AUTO = 0
+
+DEFAULT_INPUT_PATHS = []
+DEFAULT_RECURSIVE = False
+DEFAULT_BATCH_OUTPUT_DIR = "$indir/output/$instem/"
@@ -0,0 +1,154 @@
+"""
+Deduplication of the output pages of pdf2images.
+
+Scanned and generated documents often repeat pages (blank separators, forms, boilerplate). With deduplication, each
+unique page is encoded and written once per profile, the other pages are recorded as duplicates of it:
+
+- `DedupMode.Content` hashes what a page is drawn from: its content streams, its resources and its geometry. It is
+  cheap, and duplicates are found before they are rendered. Objects are compared by reference, so only the pages of the
+  same document can be found identical, and pages with annotations or form fields to render are never deduplicated.
+- `DedupMode.Raster` hashes the rendered raster. It is exact and works across documents, but every page is still
+  rendered, only the encoding and writing of duplicates is saved.
+
+The first output claiming a key in the registry (a dict shared by the workers) owns it and is written, the others are
+reported with `duplicate_of` set. Once the workers are finished, the parent hardlinks the duplicates to their originals
+(or copies them if the file system has no hardlinks), unless asked to only record them in the mapping file of their
+output directory.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Iterable, MutableMapping
+
+import pymupdf
+
+# duplicate output -> original output, relative to the output directory
+DEDUP_MAPPING_FILENAME = "dedup.json"
+
+# keys of the page dictionary which change the rendering, besides the contents, the resources and the boxes and the
+# rotation (which may be inherited from the page tree, the resolved values are hashed), none of them is inheritable
+_PAGE_KEYS = ("UserUnit", "Group")
+
+
+def _update(digest, *parts: bytes | str):
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode("utf-8")
+        # prefix each part with its length, so that different splits never hash the same
+        digest.update(len(part).to_bytes(8, "little"))
+        digest.update(part)
+
+
+def content_key(
+    document: pymupdf.Document,
+    input_file: str,
+    page_index: int,
+    rotation: int,
+    annots: bool,
+) -> str | None:
+    """
+    Return the content key of the page, None if it cannot be deduplicated this way (not a PDF, annotations to render,
+    a broken page), the page is then rendered as usual.
+    """
+    if not document.is_pdf:
+        return None
+    try:
+        page = document[page_index]
+        if annots and (page.first_annot is not None or page.first_widget is not None):
+            return None
+        page_xref = page.xref
+        digest = hashlib.sha256()
+        # xrefs only identify objects within their document
+        _update(digest, input_file, str(rotation))
+        _update(
+            digest,
+            "%r %r %d" % (tuple(page.mediabox), tuple(page.cropbox), page.rotation),
+        )
+        for key in _PAGE_KEYS:
+            _update(digest, key, "%s %s" % document.xref_get_key(page_xref, key))
+        resources_type, resources = document.xref_get_key(page_xref, "Resources")
+        if resources_type == "xref":
+            # the resources dictionary of the page, the objects it refers to are compared by reference
+            resources = document.xref_object(int(resources.split()[0]), compressed=True)
+        elif resources_type == "null":
+            # inherited from the page tree
+            resources = "%s %s" % document.xref_get_key(page_xref, "Parent")
+        _update(digest, resources, page.read_contents())
+        return digest.hexdigest()
+    except Exception:
+        return None
+
+
+def raster_key(pixmap: pymupdf.Pixmap) -> str:
+    digest = hashlib.sha256()
+    _update(
+        digest,
+        f"{pixmap.width} {pixmap.height} {pixmap.n} {pixmap.alpha} {pixmap.stride}",
+    )
+    digest.update(pixmap.samples_mv)
+    return digest.hexdigest()
+
+
+def claim(registry: MutableMapping[str, str], key: str, output_path: str) -> str | None:
+    """
+    Claim the key for the output. Return the output which claimed it first, None if it is this one. `setdefault()` of
+    the shared dict is a single call to the manager, so two workers can never both own a key.
+    """
+    original = registry.setdefault(key, output_path)
+    return None if original == output_path else original
+
+
+def materialize_duplicate(original: str, duplicate: str):
+    """Make the duplicate output a hardlink of the original one, or a copy of it if hardlinks are not supported."""
+    if not os.path.isfile(original):
+        raise FileNotFoundError(f"the original output was not written: {original}")
+    if os.path.lexists(duplicate):
+        os.remove(duplicate)
+    try:
+        os.link(original, duplicate)
+    except OSError:
+        shutil.copyfile(original, duplicate)
+
+
+def _relative_path(filepath: str, output_dir: Path) -> str:
+    try:
+        return Path(os.path.relpath(filepath, output_dir)).as_posix()
+    except ValueError:
+        # on another drive
+        return Path(filepath).absolute().as_posix()
+
+
+def update_mapping(
+    output_dir: Path, written: Iterable[str], duplicates: Iterable[tuple[str, str]]
+):
+    """
+    Update the mapping file of the output directory: forget the outputs written again, record the (duplicate,
+    original) pairs. The file is removed when it has nothing left to record.
+    """
+    mapping_file = output_dir / DEDUP_MAPPING_FILENAME
+    mapping = {}
+    if mapping_file.is_file():
+        try:
+            mapping = json.loads(mapping_file.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            mapping = {}
+    for filepath in written:
+        mapping.pop(_relative_path(filepath, output_dir), None)
+    for duplicate, original in duplicates:
+        mapping[_relative_path(duplicate, output_dir)] = _relative_path(
+            original, output_dir
+        )
+    if not mapping:
+        if mapping_file.is_file():
+            mapping_file.unlink()
+        return
+    # write to a temporary file first, so an interrupted write never leaves a corrupted mapping behind
+    temp_file = mapping_file.with_name(mapping_file.name + ".tmp")
+    temp_file.write_text(
+        json.dumps(mapping, indent=2, ensure_ascii=False, sort_keys=True),
+        encoding="utf-8",
+    )
+    os.replace(temp_file, mapping_file)
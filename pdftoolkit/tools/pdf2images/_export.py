@@ -1,13 +1,12 @@
 from pyguiadapter.adapter import GUIAdapter
 
 from . import _paramconf, _winconf
+from ._api import pdf2images, pdf2images_batch
 from ._commons import _this_t
-from ._impl import pdf2images
 from ...assets import locales_file
 from ...translation import tools_t
 from ...utils import read_asset_text_file
 
-
 # FUNC_ICON = "fa5.images"
 
 
@@ -26,3 +25,16 @@ def use(adapter: GUIAdapter):
         widget_configs=_paramconf.CONFIGS,
         window_config=_winconf.CONFIG,
     )
+    adapter.add(
+        pdf2images_batch,
+        group=tools_t("group_converters"),
+        cancelable=True,
+        display_name=_this_t("batch_display_name"),
+        document=(
+            read_asset_text_file(locales_file(_this_t("document_file")))
+            or "Documentation not found!"
+        ),
+        document_format="html",
+        widget_configs=_paramconf.BATCH_CONFIGS,
+        window_config=_winconf.BATCH_CONFIG,
+    )
@@ -6,65 +6,113 @@ A tool to convert PDF pages to image files.
 """
 
 import enum
-import gc
-import time
+import os
+from collections import deque, OrderedDict
+from concurrent.futures import CancelledError, Future
 from dataclasses import dataclass
 from functools import partial
 from pathlib import Path
-from typing import Any
+from typing import Any, Sequence, MutableMapping
 
 import pymupdf
 from py_multitasking import (
     TaskContext,
-    with_process_pool_executor,
     Scopes,
     Scope,
     TaskResult,
 )
-from pyguiadapter.adapter.ucontext import is_function_cancelled
-from pyguiadapter.adapter.uprogress import (
-    show_progressbar,
-    update_progress,
-    hide_progressbar,
-)
-from pyguiadapter.extend_types import file_t, directory_t
+from pyguiadapter.exceptions import ParameterError
 from pymupdf import TOOLS
 
-from ._paramconf import (
+from ._codecs import EncodeOptions, save_pixmap, encode_pixmap, file_extension
+from ._archive import (
+    ArchiveSink,
+    archive_path,
+    create_spool_file,
+    remove_spool_file,
+)
+from ._blank import has_no_contents, ink_coverage
+from ._dedup import (
+    DEDUP_MAPPING_FILENAME,
+    content_key,
+    raster_key,
+    claim,
+    materialize_duplicate,
+    update_mapping,
+)
+from ._manifest import Manifest
+from ._constants import (
     DuplicatePolicy,
-    DEFAULT_INPUT_FILE,
-    DEFAULT_OUTPUT_DIR,
-    DEFAULT_FILENAME_FORMAT,
-    DEFAULT_DUPLICATE_POLICY,
-    DEFAULT_PAGE_RANGES,
-    DEFAULT_DPI,
-    DEFAULT_ALPHA,
-    DEFAULT_ROTATION,
-    DEFAULT_COLORSPACE,
-    DEFAULT_ANNOTS,
+    DedupMode,
+    BlankPagePolicy,
+    ArchiveFormat,
+    ImageFormat,
+    DEFAULT_ARCHIVE_FORMAT,
+    DEFAULT_DEDUP,
+    DEFAULT_DEDUP_HARDLINK,
+    DEFAULT_BLANK_PAGE_POLICY,
+    DEFAULT_BLANK_THRESHOLD,
+    DEFAULT_ENCODER_THREADS,
+    DEFAULT_RASTER_MEMORY_LIMIT,
     MIN_DPI,
     MAX_DPI,
     MIN_ROTATION,
     MAX_ROTATION,
+    MIN_ENCODER_THREADS,
+    MAX_ENCODER_THREADS,
+    MIN_PNG_COMPRESS_LEVEL,
+    MAX_PNG_COMPRESS_LEVEL,
+    MIN_QUALITY,
+    MAX_QUALITY,
+    MIN_RASTER_MEMORY_LIMIT,
+    MAX_RASTER_MEMORY_LIMIT,
+    MIN_BLANK_THRESHOLD,
+    MAX_BLANK_THRESHOLD,
+    WORKER_COUNT_AUTO,
 )
+from ._profiles import RenderProfile, parse_profiles
+from ._tiled import raster_size, rasterize, render_page_tiled
 from ..commons import check_cancel_event
+from ..commons.collector import iter_outputs
 from ..commons.context import runtime, dtime, rand
+from ..commons.memory import MB, available_memory, fit_worker_count
 from ..commons.name_generator import NameGenerator
-from ..commons.page_iterator import ALL_PAGES, PageIterator
-from ..commons.paramconf import (
-    DEFAULT_WORKER_COUNT,
-    DEFAULT_VERBOSE,
-    DEFAULT_OPEN_OUTPUT_DIR,
+from ..commons.page_iterator import PageIterator
+from ..commons.reporter import (
+    show_progressbar,
+    update_progress,
+    hide_progressbar,
+    is_function_cancelled,
+    pprint,
+    report,
+)
+from ..commons.pipeline import BoundedThreadPool
+from ..commons.transport import (
+    DEFAULT_SLOTS_PER_WORKER,
+    Payload,
+    PayloadSender,
+    PayloadTransport,
+)
+from ..commons.timing import (
+    StageSamples,
+    StageTimer,
+    measure,
+    merge_samples,
+    summarize,
+    format_summary,
+)
+from ..commons.scheduler import (
+    suggest_batch_size,
+    split_into_batches,
+    iter_batches,
+    dispatch_batches,
 )
 from ..commons.validators import (
     ensure_non_empty_string,
     ensure_in_range,
-    ensure_file_exists,
 )
-from ..commons.workloads_distributor import distribute_evenly
+from ..commons.worker_pool import get_worker_pool
 from ...utils import (
-    pprint,
-    open_in_file_manager,
     cwd,
     makedirs,
     close_safely,
@@ -77,18 +125,35 @@ class Operation(enum.Enum):
     Overwritten = "overwritten"
     Skipped = "skipped"
     Errored = "errored"
+    # identical to another output, which is written instead
+    Deduplicated = "deduplicated"
 
 
 WORKER_COUNT_BY_CPU_COUNT = -256
 FALLBACK_WORKER_COUNT = 1
+OPEN_DOCUMENTS_PER_WORKER = 8
+# memory of an idle worker process with pymupdf loaded, including some room for the resource store of MuPDF
+WORKER_BASE_MEMORY = 128 * MB
+# a raster is copied about once more while it is encoded (the Pillow image, the encoded data)
+RASTER_MEMORY_FACTOR = 2
 
 
 @dataclass
 class PageMessage(object):
+    input_file: str | None = None
     page_index: int | None = None
     output_path: str | None = None
     operation: Operation | None = None
     error: Exception | None = None
+    # the output this one is a duplicate of
+    duplicate_of: str | None = None
+    # the page was found blank by the probe
+    blank: bool = False
+    # the encoded output, or the file it was spooled to, for the archive writer of the parent. The encoded output is
+    # handed over by the transport, only its `payload` goes through the output queue
+    data: bytes | None = None
+    spool_path: str | None = None
+    payload: Payload | None = None
 
 
 @dataclass
@@ -98,6 +163,8 @@ class TaskReturn(object):
     failure_count: int = -1
     page_exceptions: dict[int, Exception] | None = None
     task_exception: Exception | None = None
+    # durations of each stage, one sample per page
+    timings: StageSamples | None = None
 
 
 def _build_name_context(input_file_path: Path, page_count: int) -> dict[str, Any]:
@@ -108,6 +175,7 @@ def _build_name_context(input_file_path: Path, page_count: int) -> dict[str, Any
         runtime.VARNAME_TOTAL: page_count,
         runtime.VARNAME_CWD_DIR: cwd(),
         runtime.VARNAME_INPUT_FILENAME: input_file_path.name,
+        runtime.VARNAME_INPUT_FILE_STEM: input_file_path.stem,
         runtime.VARNAME_INPUT_FILE_DIR: input_file_path.parent.absolute().as_posix(),
     }
     return ctx
@@ -118,131 +186,477 @@ def _gen_output_paths(
     filename_generator: NameGenerator,
     output_dir: str | Path,
     filename_format: str,
+    file_ext: str | None = None,
+    create_dirs: bool = True,
 ) -> list[tuple[int, str]]:
+    # parse the filename format once, only the variables it references are evaluated for each page
+    filename_template = filename_generator.compile(filename_format)
+    filenames = filename_template.generate_many(
+        {
+            runtime.VARNAME_CUR_INDEX: page_index,
+            runtime.VARNAME_CUR_PAGE: page_index + 1,
+        }
+        for page_index in page_indexes
+    )
     output_files = []
-    for page_index in page_indexes:
-        cur_page_num = page_index + 1
-        filename_generator.update_context(runtime.VARNAME_CUR_INDEX, page_index)
-        filename_generator.update_context(runtime.VARNAME_CUR_PAGE, cur_page_num)
-
-        filename = filename_generator.generate(filename_format)
+    # most pages share their directory, each one is created once
+    created_dirs = set()
+    for page_index, filename in zip(page_indexes, filenames):
+        if file_ext:
+            # the extension follows the explicitly chosen image format
+            filename = os.path.splitext(filename)[0] + file_ext
         output_file_path = Path(output_dir).joinpath(filename)
-        makedirs(output_file_path.parent)
+        if create_dirs and output_file_path.parent not in created_dirs:
+            makedirs(output_file_path.parent)
+            created_dirs.add(output_file_path.parent)
         output_files.append((page_index, output_file_path.as_posix()))
 
     return output_files
 
 
+def _load_display_list(
+    document: pymupdf.Document, page_index: int, rotation: int, annots: bool
+) -> tuple[pymupdf.DisplayList, pymupdf.Rect]:
+    # interpret the page once, the display list can be rasterized at any resolution
+    page = document[page_index]
+    page.set_rotation(rotation)
+    display_list = page.get_displaylist(annots=annots)
+    page_rect = page.rect
+    del page
+    return display_list, page_rect
+
+
+def _prepare_output(
+    output_filepath: Path, duplicate_policy: DuplicatePolicy, page_result: PageMessage
+) -> bool:
+    # return False if the output should be skipped
+    if output_filepath.is_file():
+        if duplicate_policy == DuplicatePolicy.Skip:
+            page_result.operation = Operation.Skipped
+            return False
+        page_result.operation = Operation.Overwritten
+    else:
+        page_result.operation = Operation.Created
+    return True
+
+
+def _write_output(
+    pixmap: pymupdf.Pixmap,
+    page_result: PageMessage,
+    encode_options: EncodeOptions,
+    to_archive: bool,
+    timer: StageTimer,
+):
+    # write the output file, or keep the encoded output in the page result for the archive writer of the parent
+    if to_archive:
+        page_result.data = encode_pixmap(
+            pixmap, Path(page_result.output_path), encode_options, timer
+        )
+    else:
+        save_pixmap(pixmap, Path(page_result.output_path), encode_options, timer)
+
+
+def _report_page_result(
+    ctx: TaskContext | None,
+    ret: TaskReturn,
+    page_result: PageMessage,
+    transport: PayloadSender | None = None,
+):
+    if page_result.operation == Operation.Errored:
+        ret.failure_count = ret.failure_count + 1
+        if ret.page_exceptions is None:
+            ret.page_exceptions = {}
+        ret.page_exceptions[page_result.page_index] = page_result.error
+    else:
+        ret.success_count = ret.success_count + 1
+    if ctx and ctx.has_output_queue():
+        if page_result.data is not None and transport is not None:
+            page_result.payload = transport.send(
+                page_result.data, is_cancelled=lambda: check_cancel_event(ctx)
+            )
+            page_result.data = None
+            if page_result.payload is None:
+                # cancelled while waiting for a slot, the parent does not want it anymore
+                return
+        ctx.write_output(page_result, block=False)
+
+
+def _report_encoded_pages(
+    ctx: TaskContext | None,
+    ret: TaskReturn,
+    pending: deque[tuple[PageMessage, Future]],
+    wait: bool,
+    transport: PayloadSender | None = None,
+):
+    # report pages in the order they were rendered, as soon as their encoding is finished
+    while pending and (wait or pending[0][1].done()):
+        page_result, future = pending.popleft()
+        error = future.exception()
+        if error is not None:
+            page_result.operation = Operation.Errored
+            page_result.error = error
+        _report_page_result(ctx, ret, page_result, transport)
+
+
+def _deduplicate_outputs(
+    ctx: TaskContext | None,
+    ret: TaskReturn,
+    registry: MutableMapping[str, str],
+    key: str,
+    outputs: list[tuple[tuple[int, EncodeOptions], PageMessage]],
+) -> list[tuple[tuple[int, EncodeOptions], PageMessage]]:
+    # report the outputs already claimed by an identical page, return the ones left to render
+    remaining = []
+    for profile, page_result in outputs:
+        original = claim(registry, f"{key}:{profile}", page_result.output_path)
+        if original is None:
+            remaining.append((profile, page_result))
+            continue
+        page_result.operation = Operation.Deduplicated
+        page_result.duplicate_of = original
+        _report_page_result(ctx, ret, page_result)
+    return remaining
+
+
+def _handle_blank_page(
+    ctx: TaskContext | None,
+    ret: TaskReturn,
+    blank_page_policy: BlankPagePolicy,
+    outputs: list[tuple[tuple[int, EncodeOptions], PageMessage]],
+) -> list[tuple[tuple[int, EncodeOptions], PageMessage]]:
+    # flag the outputs of a blank page, return the ones left to render
+    for _, page_result in outputs:
+        page_result.blank = True
+        if blank_page_policy == BlankPagePolicy.Skip:
+            page_result.operation = Operation.Skipped
+            _report_page_result(ctx, ret, page_result)
+    return [] if blank_page_policy == BlankPagePolicy.Skip else outputs
+
+
+class _DocumentCache(object):
+    # a LRU of open documents, so that a worker does not reopen a document for every page
+    def __init__(self, capacity: int, timer: StageTimer | None = None):
+        self._capacity = max(capacity, 1)
+        self._timer = timer
+        self._documents: OrderedDict[str, pymupdf.Document | Exception] = OrderedDict()
+
+    def get(self, input_file: str) -> pymupdf.Document:
+        document = self._documents.get(input_file, None)
+        if document is not None:
+            self._documents.move_to_end(input_file)
+        else:
+            while len(self._documents) >= self._capacity:
+                _, evicted = self._documents.popitem(last=False)
+                if not isinstance(evicted, Exception):
+                    close_safely(evicted)
+            try:
+                with measure(self._timer, "open"):
+                    document = pymupdf.open(input_file)
+            except Exception as e:
+                # remember the failure, the other pages of the document fail the same way
+                document = RuntimeError(f"Failed to open input file: {e}")
+            self._documents[input_file] = document
+        if isinstance(document, Exception):
+            raise document
+        return document
+
+    def close(self):
+        for document in self._documents.values():
+            if not isinstance(document, Exception):
+                close_safely(document)
+        self._documents.clear()
+
+
 def pdf2images_task(
     ctx: TaskContext,
-    output_filepaths: dict[int, str],
     duplicate_policy: DuplicatePolicy,
-    input_file: str,
-    dpi: int,
+    profiles: Sequence[tuple[int, EncodeOptions]],
     alpha: bool,
     rotation: int,
     colorspace: str,
     annots: bool,
+    encoder_threads: int = DEFAULT_ENCODER_THREADS,
+    raster_memory_limit: int = DEFAULT_RASTER_MEMORY_LIMIT,
+    dedup: DedupMode = DEFAULT_DEDUP,
+    dedup_registry: MutableMapping[str, str] | None = None,
+    blank_page_policy: BlankPagePolicy = DEFAULT_BLANK_PAGE_POLICY,
+    blank_threshold: float = DEFAULT_BLANK_THRESHOLD,
+    to_archive: bool = False,
+    transport: PayloadSender | None = None,
 ) -> TaskReturn:
     ret = TaskReturn(
-        total_count=len(output_filepaths),
+        total_count=0,
         success_count=0,
         failure_count=0,
         page_exceptions=None,
         task_exception=None,
     )
 
-    try:
-        document = pymupdf.open(input_file)
-    except Exception as e:
-        ret.task_exception = e
-        return ret
+    timer = StageTimer()
+    # documents are opened on first use and kept open while their pages keep coming
+    documents = _DocumentCache(OPEN_DOCUMENTS_PER_WORKER, timer)
+    # rasterize pages on this thread and hand pixmaps to the encoder threads, the bounded queue of the encoder caps the
+    # number of pixmaps held in memory
+    encoder = None
+    if encoder_threads > 0:
+        encoder = BoundedThreadPool(
+            encoder_threads, max_pending=encoder_threads, name="pdf2images-encoder"
+        )
+    pending: deque[tuple[PageMessage, Future]] = deque()
+    # pages whose raster exceeds the limit are rendered in tiles
+    memory_limit = raster_memory_limit * 1024 * 1024
 
-    page_exceptions = {}
-    page_result = PageMessage()
+    try:
+        # keep pulling batches of (input_file, page_index, output_filepaths) until there is no work left, there is an
+        # output filepath for each profile, None if the output of the profile is not needed
+        for batch in iter_batches(ctx):
+            if check_cancel_event(ctx):
+                break
+            for input_file, page_index, output_filepaths in batch:
+                if check_cancel_event(ctx):
+                    break
+                outputs = []
+                for profile, output_filepath in zip(profiles, output_filepaths):
+                    if output_filepath is None:
+                        continue
+                    ret.total_count = ret.total_count + 1
+                    page_result = PageMessage(
+                        input_file=input_file,
+                        page_index=page_index,
+                        output_path=output_filepath,
+                    )
+                    try:
+                        if _prepare_output(
+                            Path(output_filepath), duplicate_policy, page_result
+                        ):
+                            outputs.append((profile, page_result))
+                            continue
+                    except Exception as e:
+                        page_result.operation = Operation.Errored
+                        page_result.error = e
+                    _report_page_result(ctx, ret, page_result)
+                if not outputs:
+                    continue
 
-    for page_index, output_filepath in output_filepaths:
-        if check_cancel_event(ctx):
-            break
-        try:
-            page_result.page_index = page_index
-            page_result.output_path = output_filepath
-            output_filepath = Path(output_filepath)
-            if output_filepath.is_file():
-                if duplicate_policy == DuplicatePolicy.Skip:
-                    page_result.operation = Operation.Skipped
-                    ret.success_count = ret.success_count + 1
-                    if ctx and ctx.has_output_queue():
-                        ctx.write_output(page_result, block=False)
+                try:
+                    document = documents.get(input_file)
+                    blank = False
+                    if blank_page_policy != BlankPagePolicy.Off:
+                        # a page with nothing to draw is blank, no need to interpret it
+                        with timer.measure("probe"):
+                            blank = has_no_contents(document, page_index, annots)
+                        if blank:
+                            outputs = _handle_blank_page(
+                                ctx, ret, blank_page_policy, outputs
+                            )
+                            if not outputs:
+                                continue
+                    if dedup == DedupMode.Content:
+                        with timer.measure("hash"):
+                            key = content_key(
+                                document, input_file, page_index, rotation, annots
+                            )
+                        if key is not None:
+                            outputs = _deduplicate_outputs(
+                                ctx, ret, dedup_registry, key, outputs
+                            )
+                        if not outputs:
+                            continue
+                    with timer.measure("load"):
+                        display_list, page_rect = _load_display_list(
+                            document, page_index, rotation, annots
+                        )
+                    if blank_page_policy != BlankPagePolicy.Off and not blank:
+                        # a tiny raster of the page, before rendering it at full resolution
+                        with timer.measure("probe"):
+                            blank = ink_coverage(display_list) <= blank_threshold
+                        if blank:
+                            outputs = _handle_blank_page(
+                                ctx, ret, blank_page_policy, outputs
+                            )
+                            if not outputs:
+                                del display_list
+                                continue
+                except Exception as e:
+                    for _, page_result in outputs:
+                        page_result.operation = Operation.Errored
+                        page_result.error = e
+                        _report_page_result(ctx, ret, page_result)
                     continue
-                else:
-                    page_result.operation = Operation.Overwritten
-            else:
-                page_result.operation = Operation.Created
-            page = document[page_index]
-            page.set_rotation(rotation)
-            # noinspection PyUnresolvedReferences
-            pixmap = page.get_pixmap(
-                # why get_pixmap() not resolved by IDE?
-                dpi=dpi,
-                alpha=alpha,
-                colorspace=colorspace,
-                annots=annots,
-            )
-            pixmap.save(output_filepath)
-            ret.success_count = ret.success_count + 1
-            del page
-            del pixmap
-        except Exception as e:
-            page_result.operation = Operation.Errored
-            page_result.error = e
-            page_exceptions[page_index] = e
-            ret.failure_count = ret.failure_count + 1
 
-        if ctx and ctx.has_output_queue():
-            ctx.write_output(page_result, block=False)
+                for (dpi, encode_options), page_result in outputs:
+                    output_filepath = Path(page_result.output_path)
+                    try:
+                        if memory_limit > 0 and memory_limit < raster_size(
+                            page_rect, dpi, alpha, colorspace
+                        ):
+                            # release the pixmaps still waiting for the encoder before rendering a huge page
+                            _report_encoded_pages(
+                                ctx, ret, pending, wait=True, transport=transport
+                            )
+                            if to_archive:
+                                # too large to be sent in memory, the parent appends the file to the archive
+                                page_result.spool_path = create_spool_file(
+                                    page_result.output_path
+                                )
+                                output_filepath = Path(page_result.spool_path)
+                            with timer.measure("tiled"):
+                                render_page_tiled(
+                                    display_list,
+                                    page_rect,
+                                    output_filepath,
+                                    dpi,
+                                    alpha,
+                                    colorspace,
+                                    encode_options,
+                                    memory_limit,
+                                )
+                            _report_page_result(ctx, ret, page_result)
+                            continue
+                        with timer.measure("rasterize"):
+                            pixmap = rasterize(display_list, dpi, alpha, colorspace)
+                        if dedup == DedupMode.Raster:
+                            with timer.measure("hash"):
+                                key = raster_key(pixmap)
+                            if not _deduplicate_outputs(
+                                ctx,
+                                ret,
+                                dedup_registry,
+                                key,
+                                [((dpi, encode_options), page_result)],
+                            ):
+                                del pixmap
+                                continue
+                        if encoder is not None:
+                            future = encoder.submit(
+                                _write_output,
+                                pixmap,
+                                page_result,
+                                encode_options,
+                                to_archive,
+                                timer,
+                            )
+                            pending.append((page_result, future))
+                            _report_encoded_pages(
+                                ctx, ret, pending, wait=False, transport=transport
+                            )
+                            continue
+                        _write_output(
+                            pixmap, page_result, encode_options, to_archive, timer
+                        )
+                        del pixmap
+                    except Exception as e:
+                        page_result.operation = Operation.Errored
+                        page_result.error = e
+                        if page_result.spool_path is not None:
+                            remove_spool_file(page_result.spool_path)
+                            page_result.spool_path = None
+                    _report_page_result(ctx, ret, page_result, transport)
+                del display_list
+    finally:
+        if encoder is not None:
+            encoder.shutdown(wait=True)
+        _report_encoded_pages(ctx, ret, pending, wait=True, transport=transport)
+        documents.close()
+        TOOLS.store_shrink(100)
+        ret.timings = timer.samples
+    return ret
 
-    if page_exceptions:
-        ret.page_exceptions = page_exceptions
 
-    close_safely(document)
-    TOOLS.store_shrink(100)
-    return ret
+@dataclass
+class _DocumentJob(object):
+    input_file_path: Path
+    page_indexes: list[int]
+    output_dir_path: Path
+    # (page_index, output_path) pairs of each profile
+    profile_output_paths: list[list[tuple[int, str]]]
+    # the selected page with the largest area, it decides the peak memory of a worker
+    largest_page_rect: pymupdf.Rect | None = None
+    # the archive the outputs are written to, the output paths are inside it
+    archive_path: Path | None = None
 
 
-def pdf2images(
-    input_file: file_t = DEFAULT_INPUT_FILE,
-    output_dir: directory_t = DEFAULT_OUTPUT_DIR,
-    filename_format: str = DEFAULT_FILENAME_FORMAT,
-    duplicate_policy: DuplicatePolicy = DEFAULT_DUPLICATE_POLICY,
-    page_ranges: str = DEFAULT_PAGE_RANGES,
-    dpi: int = DEFAULT_DPI,
-    alpha: bool = DEFAULT_ALPHA,
-    rotation: int = DEFAULT_ROTATION,
-    colorspace: str = DEFAULT_COLORSPACE,
-    annots: bool = DEFAULT_ANNOTS,
-    worker_count: int = DEFAULT_WORKER_COUNT,
-    verbose: bool = DEFAULT_VERBOSE,
-    open_output_dir: bool = DEFAULT_OPEN_OUTPUT_DIR,
-):
+def _normalize_worker_count(worker_count: int) -> int:
+    if worker_count == WORKER_COUNT_AUTO:
+        # decided by _convert() once the page sizes are known
+        return worker_count
+
     if worker_count == WORKER_COUNT_BY_CPU_COUNT:
         worker_count = cpu_count(FALLBACK_WORKER_COUNT)
 
     if worker_count <= 0:
         worker_count = FALLBACK_WORKER_COUNT
+    return worker_count
 
-    page_ranges = page_ranges.strip() or ALL_PAGES
-    input_file_path = Path(input_file).absolute()
 
-    ensure_file_exists("input_file", input_file_path.as_posix())
+def _check_params(
+    filename_format: str,
+    image_format: ImageFormat,
+    extra_profiles: str,
+    dpi: int,
+    rotation: int,
+    png_compress_level: int,
+    quality: int,
+    encoder_threads: int,
+    raster_memory_limit: int,
+    blank_threshold: float,
+    worker_count: int,
+) -> list[RenderProfile]:
+    # validate the parameters shared by pdf2images() and pdf2images_batch(), return the render profiles
     ensure_non_empty_string("filename_format", filename_format)
     ensure_in_range("dpi", dpi, MIN_DPI, MAX_DPI, include_maximum=True)
     ensure_in_range(
         "rotation", rotation, MIN_ROTATION, MAX_ROTATION, include_maximum=True
     )
-    ensure_in_range("worker_count", worker_count, 1, maximum=None)
+    ensure_in_range(
+        "png_compress_level",
+        png_compress_level,
+        MIN_PNG_COMPRESS_LEVEL,
+        MAX_PNG_COMPRESS_LEVEL,
+        include_maximum=True,
+    )
+    ensure_in_range("quality", quality, MIN_QUALITY, MAX_QUALITY, include_maximum=True)
+    ensure_in_range(
+        "encoder_threads",
+        encoder_threads,
+        MIN_ENCODER_THREADS,
+        MAX_ENCODER_THREADS,
+        include_maximum=True,
+    )
+    ensure_in_range(
+        "raster_memory_limit",
+        raster_memory_limit,
+        MIN_RASTER_MEMORY_LIMIT,
+        MAX_RASTER_MEMORY_LIMIT,
+        include_maximum=True,
+    )
+    ensure_in_range(
+        "blank_threshold",
+        blank_threshold,
+        MIN_BLANK_THRESHOLD,
+        MAX_BLANK_THRESHOLD,
+        include_maximum=True,
+    )
+    ensure_in_range("worker_count", worker_count, WORKER_COUNT_AUTO, maximum=None)
+    try:
+        return [
+            RenderProfile(dpi, filename_format, image_format),
+            *parse_profiles(extra_profiles or ""),
+        ]
+    except ValueError as e:
+        raise ParameterError("extra_profiles", str(e)) from e
+
 
-    time_start = time.time_ns()
+def _prepare_job(
+    input_file_path: Path,
+    page_ranges: str,
+    output_dir: str,
+    profiles: Sequence[RenderProfile],
+    alpha: bool,
+    colorspace: str,
+    archive_format: ArchiveFormat = DEFAULT_ARCHIVE_FORMAT,
+    create_dirs: bool = True,
+) -> _DocumentJob:
     try:
         document = pymupdf.open(input_file_path.as_posix())
     except Exception as e:
@@ -252,102 +666,570 @@ def pdf2images(
     try:
         page_iterator = PageIterator(page_ranges, document)
         page_indexes = list(page_iterator.page_indexes())
-        total_count = len(page_indexes)
     except Exception as e:
         raise RuntimeError(f"Failed to parse page ranges: {e}") from e
+    else:
+        largest_page_rect = _largest_page_rect(document, page_indexes)
     finally:
         close_safely(document)
         TOOLS.store_shrink(100)
 
+    # name variables such as $infile and $indir resolve to this document
     filename_context = _build_name_context(input_file_path, page_count)
     filename_generator = NameGenerator(filename_context)
-    output_dir = filename_generator.generate(output_dir)
-    output_dir_path = Path(output_dir)
-    makedirs(output_dir_path)
-    output_paths = _gen_output_paths(
+    output_dir_path = Path(filename_generator.generate(output_dir))
+    if create_dirs:
+        makedirs(output_dir_path)
+    job_archive_path = None
+    if archive_format != ArchiveFormat.Off:
+        job_archive_path = archive_path(
+            output_dir_path, input_file_path, archive_format
+        )
+    # the outputs of a page, one for each profile
+    profile_output_paths = [
+        _gen_output_paths(
+            page_indexes=page_indexes,
+            filename_generator=filename_generator,
+            output_dir=job_archive_path or output_dir_path,
+            filename_format=profile.filename_format,
+            file_ext=file_extension(profile.image_format, alpha, colorspace),
+            create_dirs=create_dirs and job_archive_path is None,
+        )
+        for profile in profiles
+    ]
+    return _DocumentJob(
+        input_file_path=input_file_path,
         page_indexes=page_indexes,
-        filename_generator=filename_generator,
-        output_dir=output_dir_path,
-        filename_format=filename_format,
+        output_dir_path=output_dir_path,
+        profile_output_paths=profile_output_paths,
+        largest_page_rect=largest_page_rect,
+        archive_path=job_archive_path,
     )
-    # distribute workloads evenly across workers
-    work_loads = distribute_evenly(output_paths, worker_count)
-    with with_process_pool_executor(max_workers=worker_count) as manager:
-        show_progressbar(min_value=1, max_value=total_count)
-        scopes = Scopes(
-            input_queue=Scope.Null,
-            output_queue=Scope.Session,
-            cancel_event=Scope.Session,
-            output_queue_lock=Scope.Session,
-        )
-        task_func = partial(
-            pdf2images_task,
-            duplicate_policy=duplicate_policy,
-            input_file=input_file_path.as_posix(),
-            dpi=dpi,
-            alpha=alpha,
-            rotation=rotation,
-            colorspace=colorspace,
-            annots=annots,
+
+
+def _create_output_dirs(job: _DocumentJob):
+    # for a job prepared without creating its directories
+    makedirs(job.output_dir_path)
+    if job.archive_path is not None:
+        return
+    output_dirs = {
+        Path(output_path).parent
+        for output_paths in job.profile_output_paths
+        for _, output_path in output_paths
+    }
+    for output_dir in output_dirs:
+        makedirs(output_dir)
+
+
+def _largest_page_rect(
+    document: pymupdf.Document, page_indexes: Sequence[int]
+) -> pymupdf.Rect | None:
+    largest = None
+    for page_index in page_indexes:
+        try:
+            # reads the page dictionary only, much cheaper than loading the page
+            page_rect = document.page_cropbox(page_index)
+        except Exception:
+            try:
+                # not a PDF
+                page_rect = document[page_index].rect
+            except Exception:
+                # a broken page, it will fail in the worker anyway
+                continue
+        if largest is None or page_rect.get_area() > largest.get_area():
+            largest = page_rect
+    return largest
+
+
+def _estimate_worker_memory(
+    jobs: Sequence[_DocumentJob],
+    profiles: Sequence[RenderProfile],
+    alpha: bool,
+    colorspace: str,
+    encoder_threads: int,
+    raster_memory_limit: int,
+) -> int:
+    # the peak memory of a worker, in bytes, is decided by the largest raster it may have to hold
+    memory_limit = raster_memory_limit * MB
+    peak = 0
+    for job in jobs:
+        if job.largest_page_rect is None:
+            continue
+        for profile in profiles:
+            size = raster_size(job.largest_page_rect, profile.dpi, alpha, colorspace)
+            if 0 < memory_limit < size:
+                # rendered in tiles within the limit, after the encoder is drained
+                peak = max(peak, memory_limit * RASTER_MEMORY_FACTOR)
+            else:
+                # the rasterizing thread holds one raster, each encoder thread holds another one
+                peak = max(peak, size * (1 + encoder_threads) * RASTER_MEMORY_FACTOR)
+    return WORKER_BASE_MEMORY + peak
+
+
+def _auto_worker_count(
+    jobs: Sequence[_DocumentJob],
+    profiles: Sequence[RenderProfile],
+    alpha: bool,
+    colorspace: str,
+    encoder_threads: int,
+    raster_memory_limit: int,
+    verbose: bool,
+) -> int:
+    # as many workers as the CPUs can run and the memory can hold
+    worker_memory = _estimate_worker_memory(
+        jobs, profiles, alpha, colorspace, encoder_threads, raster_memory_limit
+    )
+    available = available_memory()
+    max_workers = cpu_count(FALLBACK_WORKER_COUNT)
+    worker_count = fit_worker_count(worker_memory, max_workers, available)
+    available_text = f"{available // MB} MB" if available is not None else "unknown"
+    if available is not None and worker_memory > available:
+        pprint(
+            "[Warning] even a single worker may run out of memory, consider setting a raster memory limit",
+            verbose=verbose,
         )
-        session = manager.map(
-            "pdf2images-task-",
-            task_func,
-            scopes,
-            work_loads,
+    pprint(
+        f"[Auto] worker count: {worker_count}; cpu count: {max_workers}; available memory: {available_text}; "
+        f"estimated peak memory per worker: {worker_memory // MB} MB",
+        verbose=verbose,
+    )
+    return worker_count
+
+
+def _convert(
+    jobs: Sequence[_DocumentJob],
+    profiles: Sequence[RenderProfile],
+    duplicate_policy: DuplicatePolicy,
+    alpha: bool,
+    rotation: int,
+    colorspace: str,
+    annots: bool,
+    png_compress_level: int,
+    quality: int,
+    encoder_threads: int,
+    raster_memory_limit: int,
+    worker_count: int,
+    verbose: bool,
+    dedup: DedupMode = DEFAULT_DEDUP,
+    dedup_hardlink: bool = DEFAULT_DEDUP_HARDLINK,
+    blank_page_policy: BlankPagePolicy = DEFAULT_BLANK_PAGE_POLICY,
+    blank_threshold: float = DEFAULT_BLANK_THRESHOLD,
+    archive_format: ArchiveFormat = DEFAULT_ARCHIVE_FORMAT,
+) -> dict[str, dict[str, float]]:
+    # schedule the pages of all documents across one worker pool, return the statistics of each stage
+    manifests: dict[Path, Manifest] = {}
+    up_to_date_outputs = set()
+    # an archive is resumed instead, there is no manifest
+    if (
+        duplicate_policy == DuplicatePolicy.Incremental
+        and archive_format == ArchiveFormat.Off
+    ):
+        # decide which outputs need rendering in one pass, before any worker is spawned
+        render_params = _render_params(
+            profiles,
+            alpha,
+            rotation,
+            colorspace,
+            annots,
+            png_compress_level,
+            quality,
         )
+        for job in jobs:
+            manifest = manifests.get(job.output_dir_path, None)
+            if manifest is None:
+                manifest = Manifest.load(job.output_dir_path)
+                manifests[job.output_dir_path] = manifest
+            up_to_date_outputs.update(
+                manifest.begin(
+                    job.input_file_path,
+                    render_params,
+                    [
+                        item
+                        for output_paths in job.profile_output_paths
+                        for item in output_paths
+                    ],
+                )
+            )
 
+    # input file -> the archive its outputs are appended to
+    sinks: dict[str, ArchiveSink] = {}
+    # hands the encoded outputs for the archives over to the parent, outside of the output queue
+    transport: PayloadTransport | None = None
+    try:
+        if archive_format != ArchiveFormat.Off:
+            for job in jobs:
+                sink = ArchiveSink(
+                    job.archive_path,
+                    archive_format,
+                    resume=duplicate_policy != DuplicatePolicy.Overwrite,
+                )
+                sinks[job.input_file_path.as_posix()] = sink
+                # the outputs the archive already has are skipped, like the up-to-date ones
+                up_to_date_outputs.update(
+                    output_path
+                    for output_paths in job.profile_output_paths
+                    for _, output_path in output_paths
+                    if sink.has_output(output_path)
+                )
+        total_count = sum(len(job.page_indexes) for job in jobs) * len(profiles)
+        show_progressbar(min_value=1, max_value=total_count)
         finished_count = 0
+        workloads = []
+        for job in jobs:
+            input_file = job.input_file_path.as_posix()
+            for i, page_index in enumerate(job.page_indexes):
+                output_paths = []
+                for profile_outputs in job.profile_output_paths:
+                    output_path = profile_outputs[i][1]
+                    if output_path not in up_to_date_outputs:
+                        output_paths.append(output_path)
+                        if sinks:
+                            sinks[input_file].expect(output_path)
+                        continue
+                    output_paths.append(None)
+                    finished_count += 1
+                    update_progress(finished_count)
+                    page_result = PageMessage(
+                        input_file=input_file,
+                        page_index=page_index,
+                        output_path=output_path,
+                        operation=Operation.Skipped,
+                    )
+                    _emit_page_event(page_result)
+                    _print_page_result(
+                        page_result, verbose=verbose, show_input_file=len(jobs) > 1
+                    )
+                if any(output_paths):
+                    workloads.append((input_file, page_index, tuple(output_paths)))
 
-        while True:
-            if is_function_cancelled():
-                session.cancel_all(with_cancel_event_set=True)
-                session.wait_for_all()
-                break
+        if worker_count == WORKER_COUNT_AUTO:
+            worker_count = _auto_worker_count(
+                jobs,
+                profiles,
+                alpha,
+                colorspace,
+                encoder_threads,
+                raster_memory_limit,
+                verbose,
+            )
+        # cut workloads into small batches, workers pull them from a shared queue on demand
+        batch_size = suggest_batch_size(len(workloads), worker_count)
+        batches = split_into_batches(workloads, batch_size)
+        worker_count = max(min(worker_count, len(batches)), 1)
+        task_timings = []
+        # the outputs written and the (duplicate, original) outputs found, by output directory
+        written_outputs: dict[Path, list[str]] = {}
+        duplicate_outputs: dict[Path, list[tuple[str, str]]] = {}
+        blank_count = 0
+        if batches:
+            with get_worker_pool() as manager:
+                if sinks:
+                    transport = PayloadTransport.create(
+                        manager, worker_count * DEFAULT_SLOTS_PER_WORKER
+                    )
+                scopes = Scopes(
+                    input_queue=Scope.Session,
+                    output_queue=Scope.Session,
+                    cancel_event=Scope.Session,
+                    output_queue_lock=Scope.Session,
+                )
+                task_func = partial(
+                    pdf2images_task,
+                    duplicate_policy=duplicate_policy,
+                    profiles=[
+                        (
+                            profile.dpi,
+                            EncodeOptions(
+                                image_format=profile.image_format,
+                                png_compress_level=png_compress_level,
+                                quality=quality,
+                                threaded=encoder_threads > 0,
+                            ),
+                        )
+                        for profile in profiles
+                    ],
+                    alpha=alpha,
+                    rotation=rotation,
+                    colorspace=colorspace,
+                    annots=annots,
+                    encoder_threads=encoder_threads,
+                    raster_memory_limit=raster_memory_limit,
+                    dedup=dedup,
+                    # the keys claimed by the workers, shared across them
+                    dedup_registry=(
+                        manager.create_dict() if dedup != DedupMode.Off else None
+                    ),
+                    blank_page_policy=blank_page_policy,
+                    blank_threshold=blank_threshold,
+                    to_archive=archive_format != ArchiveFormat.Off,
+                    transport=transport.sender if transport else None,
+                )
+                session = dispatch_batches(
+                    manager,
+                    "pdf2images-task-",
+                    task_func,
+                    scopes,
+                    batches,
+                    worker_count,
+                )
 
-            if session.all_done:
-                break
+                jobs_by_input = {job.input_file_path.as_posix(): job for job in jobs}
+                try:
+                    # block until page results arrive instead of busy-polling the output queue
+                    for page_result in iter_outputs(
+                        session, is_cancelled=is_function_cancelled
+                    ):
+                        finished_count += 1
+                        update_progress(finished_count)
+                        if page_result.blank:
+                            blank_count += 1
+                        _emit_page_event(page_result)
+                        _print_page_result(
+                            page_result, verbose=verbose, show_input_file=len(jobs) > 1
+                        )
+                        job = jobs_by_input[page_result.input_file]
+                        _collect_dedup_output(
+                            page_result,
+                            written_outputs.setdefault(job.output_dir_path, []),
+                            duplicate_outputs.setdefault(job.output_dir_path, []),
+                        )
+                        if sinks:
+                            _put_archive_output(
+                                sinks[page_result.input_file],
+                                transport,
+                                page_result,
+                                verbose,
+                            )
+                        if manifests:
+                            _update_manifest(
+                                manifests[job.output_dir_path],
+                                job.input_file_path,
+                                page_result,
+                            )
+                except CancelledError:
+                    session.cancel_all(with_cancel_event_set=True)
+                    session.wait_for_all()
 
-            page_results = session.context.read_output_until_empty(block=False)
-            for page_result in page_results:
-                finished_count += 1
-                update_progress(finished_count)
-                _print_page_result(page_result, verbose=verbose)
+                task_results = session.results()
+                for task_name, task_result in task_results.items():
+                    _print_task_result(task_name, task_result, verbose=verbose)
+                    if task_result.successful:
+                        task_timings.append(task_result.value.timings)
+    finally:
+        if transport is not None:
+            transport.close()
+        _close_archive_sinks(sinks, verbose)
+
+    # the workers are finished, all the originals are written. Even without deduplication, the outputs written by
+    # this run are removed from the mapping files left by previous runs
+    duplicate_count = _finish_dedup(
+        written_outputs,
+        duplicate_outputs,
+        # the entries of an archive cannot be linked
+        dedup_hardlink and not sinks,
+        manifests,
+        jobs,
+        verbose,
+    )
+    if blank_page_policy != BlankPagePolicy.Off:
+        pprint(
+            f"[Blank] blank outputs: {blank_count}; "
+            f"{'skipped' if blank_page_policy == BlankPagePolicy.Skip else 'rendered'}",
+            verbose=verbose,
+        )
+    if dedup != DedupMode.Off:
+        pprint(
+            f"[Dedup] duplicates: {duplicate_count}; "
+            f"{'hardlinked' if dedup_hardlink and not sinks else 'recorded in ' + DEDUP_MAPPING_FILENAME}",
+            verbose=verbose,
+        )
 
-        # read remaining page results from output queue
-        page_results = session.context.read_output_until_empty(block=False)
-        for page_result in page_results:
-            finished_count += 1
-            update_progress(finished_count)
-            _print_page_result(page_result, verbose=verbose)
+    for manifest in manifests.values():
+        try:
+            manifest.save()
+        except Exception as e:
+            pprint(f"[Error] failed to save manifest: {e}", verbose=verbose)
 
-        task_results = session.results()
-        for task_name, task_result in task_results.items():
-            _print_task_result(task_name, task_result, verbose=verbose)
+    update_progress(0)
+    show_progressbar(min_value=0, max_value=100)
+    hide_progressbar()
 
-        update_progress(0)
-        show_progressbar(min_value=0, max_value=100)
-        hide_progressbar()
-        time_eclipsed = (time.time_ns() - time_start) / 1e9
-        pprint(f"Finished in {time_eclipsed:.2f} seconds", verbose=verbose)
+    # percentiles over the pages of all workers
+    timings = summarize(merge_samples(task_timings))
+    for line in format_summary(timings):
+        pprint(line, verbose=verbose)
+    return timings
 
-        if open_output_dir:
-            open_in_file_manager(output_dir_path)
 
-        gc.collect()
+def _put_archive_output(
+    sink: ArchiveSink,
+    transport: PayloadTransport | None,
+    page_result: PageMessage,
+    verbose: bool,
+):
+    try:
+        if page_result.payload is None:
+            sink.put(page_result.output_path, page_result.data, page_result.spool_path)
+            return
+        # written from the slot (or the spool file) it is in, which is given back afterward
+        with transport.open(page_result.payload) as data:
+            sink.put(page_result.output_path, data, page_result.spool_path)
+    except Exception as e:
+        pprint(
+            f"[Error] failed to write to archive {sink.archive_path}: {e}",
+            verbose=verbose,
+        )
 
 
-def _print_page_result(page_result: PageMessage, verbose: bool = True):
-    if page_result.operation == Operation.Errored:
+def _close_archive_sinks(sinks: dict[str, ArchiveSink], verbose: bool):
+    for sink in sinks.values():
+        try:
+            sink.close()
+        except Exception as e:
+            pprint(
+                f"[Error] failed to close archive {sink.archive_path}: {e}",
+                verbose=verbose,
+            )
+            continue
         pprint(
-            f"[Error] page: {page_result.page_index}; error: {page_result.error}",
+            f"[Archive] {sink.archive_path}: entries: {sink.entry_count}; written: {sink.written_count}",
             verbose=verbose,
         )
-    else:
+
+
+def _collect_dedup_output(
+    page_result: PageMessage,
+    written: list[str],
+    duplicates: list[tuple[str, str]],
+):
+    if page_result.operation in (Operation.Created, Operation.Overwritten):
+        written.append(page_result.output_path)
+    elif page_result.operation == Operation.Deduplicated:
+        duplicates.append((page_result.output_path, page_result.duplicate_of))
+
+
+def _finish_dedup(
+    written_outputs: dict[Path, list[str]],
+    duplicate_outputs: dict[Path, list[tuple[str, str]]],
+    hardlink: bool,
+    manifests: dict[Path, Manifest],
+    jobs: Sequence[_DocumentJob],
+    verbose: bool,
+) -> int:
+    # hardlink the duplicates to their originals, then record them in the mapping file of their output directory
+    duplicate_count = 0
+    for output_dir_path in {*written_outputs, *duplicate_outputs}:
+        recorded = []
+        for duplicate, original in duplicate_outputs.get(output_dir_path, []):
+            if hardlink:
+                try:
+                    materialize_duplicate(original, duplicate)
+                except Exception as e:
+                    pprint(
+                        f"[Error] failed to link duplicate {duplicate} to {original}: {e}",
+                        verbose=verbose,
+                    )
+                    continue
+            recorded.append((duplicate, original))
+        duplicate_count += len(recorded)
+        try:
+            # the outputs written again are no longer duplicates
+            update_mapping(
+                output_dir_path, written_outputs.get(output_dir_path, []), recorded
+            )
+        except Exception as e:
+            pprint(f"[Error] failed to save dedup mapping: {e}", verbose=verbose)
+        manifest = manifests.get(output_dir_path, None)
+        if manifest is None or not hardlink:
+            continue
+        # a linked duplicate is an output like any other, it is up to date as long as its page is
+        for job in jobs:
+            if job.output_dir_path != output_dir_path:
+                continue
+            page_indexes = {
+                output_path: page_index
+                for output_paths in job.profile_output_paths
+                for page_index, output_path in output_paths
+            }
+            for duplicate, _ in recorded:
+                if duplicate in page_indexes:
+                    manifest.update_output(
+                        job.input_file_path, page_indexes[duplicate], duplicate
+                    )
+    return duplicate_count
+
+
+def _run_summary(
+    elapsed_seconds: float, timings: dict[str, dict[str, float]]
+) -> dict[str, Any]:
+    # the machine-readable result of a run
+    return {"elapsed_seconds": elapsed_seconds, "stages": timings}
+
+
+def _render_params(
+    profiles: Sequence[RenderProfile],
+    alpha: bool,
+    rotation: int,
+    colorspace: str,
+    annots: bool,
+    png_compress_level: int,
+    quality: int,
+) -> dict[str, Any]:
+    # parameters which affect the content of the output files
+    return {
+        "profiles": [[profile.dpi, profile.image_format.value] for profile in profiles],
+        "alpha": alpha,
+        "rotation": rotation,
+        "colorspace": colorspace,
+        "annots": annots,
+        "png_compress_level": png_compress_level,
+        "quality": quality,
+    }
+
+
+def _update_manifest(
+    manifest: Manifest, input_file_path: Path, page_result: PageMessage
+):
+    if page_result.operation in (Operation.Created, Operation.Overwritten):
+        manifest.update_output(
+            input_file_path, page_result.page_index, page_result.output_path
+        )
+    elif page_result.operation == Operation.Errored:
+        manifest.remove_output(input_file_path, page_result.output_path)
+
+
+def _emit_page_event(page_result: PageMessage):
+    # the machine-readable counterpart of _print_page_result(), reported whether verbose or not
+    report(
+        "page",
+        input_file=page_result.input_file,
+        page_index=page_result.page_index,
+        output_path=page_result.output_path,
+        operation=page_result.operation.value if page_result.operation else None,
+        error=str(page_result.error) if page_result.error is not None else None,
+        duplicate_of=page_result.duplicate_of,
+        blank=page_result.blank,
+    )
+
+
+def _print_page_result(
+    page_result: PageMessage, verbose: bool = True, show_input_file: bool = False
+):
+    page = f"page: {page_result.page_index}"
+    if show_input_file:
+        page = f"file: {page_result.input_file}; {page}"
+    if page_result.operation == Operation.Errored:
         pprint(
-            f"[Success] operation: {page_result.operation}; page: {page_result.page_index}; output: {page_result.output_path}",
+            f"[Error] {page}; error: {page_result.error}",
             verbose=verbose,
         )
+    else:
+        message = f"[Success] operation: {page_result.operation}; {page}; output: {page_result.output_path}"
+        if page_result.duplicate_of is not None:
+            message += f"; duplicate of: {page_result.duplicate_of}"
+        if page_result.blank:
+            message += "; blank page"
+        pprint(message, verbose=verbose)
 
 
 def _print_task_result(task_name: str, task_result: TaskResult, verbose: bool = True):
@@ -355,7 +1237,12 @@ def _print_task_result(task_name: str, task_result: TaskResult, verbose: bool =
         pprint(f"[Task] {task_name}: {task_result.exception}", verbose=verbose)
         return
     page_task_ret: TaskReturn = task_result.value
+    # the time this worker spent in each stage
+    stage_totals = ", ".join(
+        f"{stage}: {sum(durations):.3f}s"
+        for stage, durations in (page_task_ret.timings or {}).items()
+    )
     pprint(
-        f"[Task] {task_name}: total: {page_task_ret.total_count}; success: {page_task_ret.success_count}; failure: {page_task_ret.failure_count}",
+        f"[Task] {task_name}: total: {page_task_ret.total_count}; success: {page_task_ret.success_count}; failure: {page_task_ret.failure_count}; timings: {stage_totals or '-'}",
         verbose=verbose,
     )
@@ -0,0 +1,139 @@
+"""
+The job manifest of pdf2images, used by the incremental mode (`DuplicatePolicy.Incremental`).
+
+The manifest is a json file in the output directory. For each source document, it records a fingerprint of the
+document, the parameters the pages were rendered with and every output file (a page has an output file for each render
+profile) together with its size and modification time. Before any worker is spawned, a rerun can decide in one pass
+which outputs are still up-to-date and only schedule the others. When the document or the render parameters change,
+all outputs of the document are stale.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Sequence
+
+from ..commons.reporter import pprint
+from ...utils import read_text_file, write_text_file
+
+MANIFEST_FILENAME = ".pdf2images-manifest.json"
+MANIFEST_VERSION = 2
+
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def _file_digest(filepath: Path) -> str:
+    digest = hashlib.blake2b(digest_size=20)
+    with open(filepath, "rb") as f:
+        while chunk := f.read(_HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _fingerprint(filepath: Path, previous: dict[str, Any] | None) -> dict[str, Any]:
+    stat = filepath.stat()
+    if (
+        previous
+        and previous.get("size") == stat.st_size
+        and previous.get("mtime_ns") == stat.st_mtime_ns
+        and previous.get("digest")
+    ):
+        # unchanged since last time, no need to read the whole file again
+        return previous
+    return {
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "digest": _file_digest(filepath),
+    }
+
+
+def _output_record(page_index: int, output_path: str) -> dict[str, Any] | None:
+    try:
+        stat = os.stat(output_path)
+    except OSError:
+        return None
+    return {"page": page_index, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+class Manifest(object):
+    def __init__(self, filepath: Path, data: dict[str, Any] | None = None):
+        self._filepath = filepath
+        if not data or data.get("version") != MANIFEST_VERSION:
+            data = {"version": MANIFEST_VERSION, "documents": {}}
+        self._data = data
+
+    @property
+    def filepath(self) -> Path:
+        return self._filepath
+
+    @classmethod
+    def load(cls, output_dir: Path | str) -> "Manifest":
+        filepath = Path(output_dir) / MANIFEST_FILENAME
+        data = None
+        if filepath.is_file():
+            try:
+                data = json.loads(read_text_file(filepath, no_raise=False))
+            except Exception as e:
+                pprint(f"[Warning] failed to load manifest {filepath}, ignored: {e}")
+        return cls(filepath, data)
+
+    def save(self):
+        # write to a temporary file first, so an interrupted write never leaves a corrupted manifest behind
+        tmp_filepath = self._filepath.with_name(self._filepath.name + ".tmp")
+        write_text_file(tmp_filepath, json.dumps(self._data), no_raise=False)
+        os.replace(tmp_filepath, self._filepath)
+
+    def begin(
+        self,
+        source_file: Path,
+        params: dict[str, Any],
+        outputs: Sequence[tuple[int, str]],
+    ) -> set[str]:
+        """
+        Start a run for the source document, return the output files (of the given (page_index, output_path) pairs)
+        which are up-to-date. If the document or the render parameters have changed, the records of the document are
+        dropped.
+        """
+        key = source_file.absolute().as_posix()
+        documents = self._data["documents"]
+        previous = documents.get(key, None) or {}
+        fingerprint = _fingerprint(source_file, previous.get("fingerprint", None))
+        previous_fingerprint = previous.get("fingerprint", None) or {}
+        if (
+            fingerprint.get("digest") != previous_fingerprint.get("digest")
+            or previous.get("params") != params
+        ):
+            previous["outputs"] = {}
+        records = previous.get("outputs", None) or {}
+        documents[key] = {
+            "fingerprint": fingerprint,
+            "params": params,
+            "outputs": records,
+        }
+
+        up_to_date = set()
+        for page_index, output_path in outputs:
+            record = records.get(output_path, None)
+            if record and _output_record(page_index, output_path) == record:
+                up_to_date.add(output_path)
+        return up_to_date
+
+    def update_output(self, source_file: Path, page_index: int, output_path: str):
+        """Record an output file after it has been written."""
+        records = self._records(source_file)
+        record = _output_record(page_index, output_path)
+        if record is None:
+            records.pop(output_path, None)
+        else:
+            records[output_path] = record
+
+    def remove_output(self, source_file: Path, output_path: str):
+        self._records(source_file).pop(output_path, None)
+
+    def _records(self, source_file: Path) -> dict[str, Any]:
+        key = source_file.absolute().as_posix()
+        document = self._data["documents"].setdefault(
+            key, {"fingerprint": None, "params": None, "outputs": {}}
+        )
+        return document.setdefault("outputs", {})
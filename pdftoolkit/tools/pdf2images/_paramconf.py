@@ -1,4 +1,4 @@
-import enum
+import dataclasses
 
 from pyguiadapter.widgets import (
     FileSelectConfig,
@@ -9,8 +9,58 @@ from pyguiadapter.widgets import (
     IntSpinBoxConfig,
     BoolBoxConfig,
     ExclusiveChoiceBoxConfig,
+    TextEditConfig,
+    StringListEditConfig,
+    FloatSpinBoxConfig,
 )
 
+from ._constants import (
+    DuplicatePolicy,
+    ImageFormat,
+    CS_RGB,
+    CS_GRAY,
+    CS_CMYK,
+    MIN_DPI,
+    MAX_DPI,
+    MIN_ROTATION,
+    MAX_ROTATION,
+    ROTATION_STEP,
+    MIN_ENCODER_THREADS,
+    MIN_PNG_COMPRESS_LEVEL,
+    MAX_PNG_COMPRESS_LEVEL,
+    MIN_QUALITY,
+    MAX_QUALITY,
+    MAX_ENCODER_THREADS,
+    MIN_RASTER_MEMORY_LIMIT,
+    MAX_RASTER_MEMORY_LIMIT,
+    MIN_BLANK_THRESHOLD,
+    MAX_BLANK_THRESHOLD,
+    DEFAULT_INPUT_FILE,
+    DEFAULT_OUTPUT_DIR,
+    DEFAULT_FILENAME_FORMAT,
+    DEFAULT_PAGE_RANGES,
+    DEFAULT_DPI,
+    DEFAULT_ALPHA,
+    DEFAULT_ROTATION,
+    DEFAULT_COLORSPACE,
+    DEFAULT_ANNOTS,
+    DEFAULT_ENCODER_THREADS,
+    DEFAULT_IMAGE_FORMAT,
+    DEFAULT_EXTRA_PROFILES,
+    DEFAULT_PNG_COMPRESS_LEVEL,
+    DEFAULT_QUALITY,
+    DEFAULT_RASTER_MEMORY_LIMIT,
+    DEFAULT_DUPLICATE_POLICY,
+    DEFAULT_ARCHIVE_FORMAT,
+    DEFAULT_DEDUP,
+    DEFAULT_DEDUP_HARDLINK,
+    DEFAULT_BLANK_PAGE_POLICY,
+    DEFAULT_BLANK_THRESHOLD,
+    WORKER_COUNT_AUTO,
+    DEFAULT_INPUT_PATHS,
+    DEFAULT_RECURSIVE,
+    DEFAULT_BATCH_OUTPUT_DIR,
+)
 from ._commons import _this_t
 from ..commons import ALL_PAGES, ODD_PAGES, EVEN_PAGES
 from ..commons.paramconf import (
@@ -21,34 +71,6 @@ from ..commons.paramconf import (
 )
 from ...translation import param_name_t, tools_t
 
-
-class DuplicatePolicy(enum.Enum):
-    Skip = "skip"
-    Overwrite = "overwrite"
-
-
-CS_RGB = "RGB"
-CS_GRAY = "GRAY"
-CS_CMYK = "CMYK"
-
-MIN_DPI = 72
-MAX_DPI = 7000
-MIN_ROTATION = 0
-MAX_ROTATION = 360
-ROTATION_STEP = 90
-
-DEFAULT_INPUT_FILE = ""
-DEFAULT_OUTPUT_DIR = "$indir/output/"
-DEFAULT_FILENAME_FORMAT = "page-$page.png"
-DEFAULT_PAGE_RANGES = ALL_PAGES
-DEFAULT_DPI = 300
-DEFAULT_ALPHA = False
-DEFAULT_ROTATION = 0
-DEFAULT_COLORSPACE = CS_RGB
-DEFAULT_ANNOTS = True
-DEFAULT_DUPLICATE_POLICY = DuplicatePolicy.Skip
-
-
 CONFIGS = {
     "input_file": FileSelectConfig(
         label=param_name_t("input_file"),
@@ -63,10 +85,24 @@ CONFIGS = {
         label=param_name_t("filename_format"),
         default_value=DEFAULT_FILENAME_FORMAT,
     ),
+    "image_format": EnumSelectConfig(
+        label=param_name_t("image_format"),
+        default_value=DEFAULT_IMAGE_FORMAT,
+    ),
+    "extra_profiles": TextEditConfig(
+        label=param_name_t("extra_profiles"),
+        default_value=DEFAULT_EXTRA_PROFILES,
+        placeholder="72 thumbnails/page-$page.jpg jpeg",
+        height=100,
+    ),
     "duplicate_policy": EnumSelectConfig(
         label=param_name_t("duplicate_policy"),
         default_value=DEFAULT_DUPLICATE_POLICY,
     ),
+    "archive_format": EnumSelectConfig(
+        label=param_name_t("archive_format"),
+        default_value=DEFAULT_ARCHIVE_FORMAT,
+    ),
     "page_ranges": ChoiceBoxConfig(
         label=param_name_t("page_ranges"),
         choices={
@@ -113,7 +149,100 @@ CONFIGS = {
         false_text=_this_t("ignore_annots"),
         group=PARAM_GROUP_ADVANCED,
     ),
-    "worker_count": PARAM_WORKER_COUNT,
+    "png_compress_level": IntSpinBoxConfig(
+        label=param_name_t("png_compress_level"),
+        default_value=DEFAULT_PNG_COMPRESS_LEVEL,
+        min_value=MIN_PNG_COMPRESS_LEVEL,
+        max_value=MAX_PNG_COMPRESS_LEVEL,
+        step=1,
+        group=PARAM_GROUP_ADVANCED,
+    ),
+    "quality": IntSpinBoxConfig(
+        label=param_name_t("quality"),
+        default_value=DEFAULT_QUALITY,
+        min_value=MIN_QUALITY,
+        max_value=MAX_QUALITY,
+        step=5,
+        group=PARAM_GROUP_ADVANCED,
+    ),
+    "encoder_threads": IntSpinBoxConfig(
+        label=param_name_t("encoder_threads"),
+        default_value=DEFAULT_ENCODER_THREADS,
+        min_value=MIN_ENCODER_THREADS,
+        max_value=MAX_ENCODER_THREADS,
+        step=1,
+        group=PARAM_GROUP_ADVANCED,
+    ),
+    "raster_memory_limit": IntSpinBoxConfig(
+        label=param_name_t("raster_memory_limit"),
+        default_value=DEFAULT_RASTER_MEMORY_LIMIT,
+        min_value=MIN_RASTER_MEMORY_LIMIT,
+        max_value=MAX_RASTER_MEMORY_LIMIT,
+        step=64,
+        suffix=" MB",
+        group=PARAM_GROUP_ADVANCED,
+    ),
+    "dedup": EnumSelectConfig(
+        label=param_name_t("dedup"),
+        default_value=DEFAULT_DEDUP,
+        group=PARAM_GROUP_ADVANCED,
+    ),
+    "dedup_hardlink": BoolBoxConfig(
+        label=param_name_t("dedup_hardlink"),
+        default_value=DEFAULT_DEDUP_HARDLINK,
+        true_text=_this_t("dedup_hardlink"),
+        false_text=_this_t("dedup_mapping_only"),
+        group=PARAM_GROUP_ADVANCED,
+    ),
+    "blank_page_policy": EnumSelectConfig(
+        label=param_name_t("blank_page_policy"),
+        default_value=DEFAULT_BLANK_PAGE_POLICY,
+        group=PARAM_GROUP_ADVANCED,
+    ),
+    "blank_threshold": FloatSpinBoxConfig(
+        label=param_name_t("blank_threshold"),
+        default_value=DEFAULT_BLANK_THRESHOLD,
+        min_value=MIN_BLANK_THRESHOLD,
+        max_value=MAX_BLANK_THRESHOLD,
+        step=0.01,
+        decimals=3,
+        suffix=" %",
+        group=PARAM_GROUP_ADVANCED,
+    ),
+    "worker_count": dataclasses.replace(
+        PARAM_WORKER_COUNT, min_value=WORKER_COUNT_AUTO
+    ),
     "verbose": PARAM_VERBOSE,
     "open_output_dir": PARAM_OPEN_OUTPUT_DIR,
 }
+
+
+# the batch mode shares the parameters of pdf2images, except the input
+BATCH_CONFIGS = {
+    "input_paths": StringListEditConfig(
+        label=param_name_t("input_paths"),
+        default_value=DEFAULT_INPUT_PATHS,
+        add_file=True,
+        add_dir=True,
+        file_filters=tools_t("pdf_file_filters"),
+        add_button_text=_this_t("add_button_text"),
+        remove_button_text=_this_t("remove_button_text"),
+        clear_button_text=_this_t("clear_button_text"),
+        height=200,
+    ),
+    "recursive": BoolBoxConfig(
+        label=param_name_t("recursive"),
+        default_value=DEFAULT_RECURSIVE,
+        true_text=tools_t("enabled"),
+        false_text=tools_t("disabled"),
+    ),
+    "output_dir": DirSelectConfig(
+        label=param_name_t("output_dir"),
+        default_value=DEFAULT_BATCH_OUTPUT_DIR,
+    ),
+    **{
+        name: config
+        for name, config in CONFIGS.items()
+        if name not in ("input_file", "output_dir")
+    },
+}
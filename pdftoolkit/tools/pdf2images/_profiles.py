@@ -0,0 +1,64 @@
+"""
+Render profiles of pdf2images. Besides the main profile (`dpi`, `filename_format` and `image_format`), extra profiles
+can be given, one per line, in the form of:
+
+    <dpi> <filename_format> [<image_format>]
+
+for example:
+
+    72 thumbnails/page-$page.jpg jpeg
+    150 previews/page-$page.png
+
+Every page is interpreted only once, then rasterized for each profile.
+"""
+
+import dataclasses
+
+from ._constants import ImageFormat, DEFAULT_IMAGE_FORMAT, MIN_DPI, MAX_DPI
+
+COMMENT_PREFIX = "#"
+
+
+@dataclasses.dataclass(frozen=True)
+class RenderProfile(object):
+    dpi: int
+    filename_format: str
+    image_format: ImageFormat = DEFAULT_IMAGE_FORMAT
+
+
+def _parse_image_format(value: str) -> ImageFormat | None:
+    value = value.lower()
+    for image_format in ImageFormat:
+        if image_format.value == value:
+            return image_format
+    return None
+
+
+def parse_profiles(text: str) -> list[RenderProfile]:
+    """Parse the extra profiles, one per line. Empty lines and lines starting with '#' are ignored."""
+    profiles = []
+    for line_number, line in enumerate(text.splitlines(), start=1):
+        line = line.strip()
+        if not line or line.startswith(COMMENT_PREFIX):
+            continue
+        fields = line.split(maxsplit=1)
+        if len(fields) != 2:
+            raise ValueError(f"line {line_number}: missing filename format")
+        try:
+            dpi = int(fields[0])
+        except ValueError:
+            raise ValueError(f"line {line_number}: invalid dpi: {fields[0]}") from None
+        if not (MIN_DPI <= dpi <= MAX_DPI):
+            raise ValueError(
+                f"line {line_number}: dpi should be in range {MIN_DPI} to {MAX_DPI}"
+            )
+        filename_format = fields[1]
+        image_format = DEFAULT_IMAGE_FORMAT
+        # the image format is optional, the filename format may contain spaces
+        rest = filename_format.rsplit(maxsplit=1)
+        if len(rest) == 2:
+            parsed = _parse_image_format(rest[1])
+            if parsed is not None:
+                filename_format, image_format = rest[0], parsed
+        profiles.append(RenderProfile(dpi, filename_format, image_format))
+    return profiles
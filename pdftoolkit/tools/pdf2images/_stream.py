@@ -0,0 +1,302 @@
+"""
+A GUI-independent streaming API of the renderer of pdf2images, for pipelines which want pixel buffers instead of image
+files:
+
+    for page_index, raster in iter_page_rasters("input.pdf", dpi=150, worker_count=4):
+        image = raster.to_numpy()  # or raster.samples, raster.to_pil()
+        ...
+
+Pages are rasterized by the shared worker pool. The rasters do not go through the Manager queue (where they would be
+pickled and copied several times), but through a `PayloadTransport` of `max_inflight` shared memory slots, each large
+enough for the largest selected page. A worker copies the samples of the pixmap into a free slot and only sends a small
+message with the payload descriptor and the geometry. The parent copies the samples out and gives the slot back. As a
+worker must wait for a free slot, there are never more than `max_inflight` rasters waiting for the consumer.
+
+The consumer can stop early: when the generator is closed (e.g. `break` out of the loop), the workers are cancelled
+and the shared memory is released.
+"""
+
+import dataclasses
+from functools import partial
+from pathlib import Path
+from typing import Generator, Any
+
+import pymupdf
+from py_multitasking import TaskContext, Scopes, Scope
+from pymupdf import TOOLS
+
+from ._codecs import to_pil_image
+from ._impl import (
+    WORKER_BASE_MEMORY,
+    RASTER_MEMORY_FACTOR,
+    FALLBACK_WORKER_COUNT,
+    OPEN_DOCUMENTS_PER_WORKER,
+    _DocumentCache,
+    _load_display_list,
+    _largest_page_rect,
+)
+from ._constants import (
+    DEFAULT_DPI,
+    DEFAULT_ALPHA,
+    DEFAULT_ROTATION,
+    DEFAULT_COLORSPACE,
+    DEFAULT_ANNOTS,
+    MIN_DPI,
+    MAX_DPI,
+    WORKER_COUNT_AUTO,
+)
+from ._tiled import rasterize, _colorspace, _pixel_rect
+from ..commons import check_cancel_event
+from ..commons.collector import iter_outputs
+from ..commons.memory import fit_worker_count
+from ..commons.page_iterator import ALL_PAGES, PageIterator
+from ..commons.scheduler import (
+    suggest_batch_size,
+    split_into_batches,
+    iter_batches,
+    dispatch_batches,
+)
+from ..commons.transport import Payload, PayloadSender, PayloadTransport
+from ..commons.worker_pool import get_worker_pool
+from ...utils import close_safely, cpu_count
+
+# rasters waiting for the consumer, per worker
+DEFAULT_INFLIGHT_PER_WORKER = 2
+
+
+@dataclasses.dataclass(frozen=True)
+class PageRaster(object):
+    """
+    The raster of a page as MuPDF renders it: `height` rows of `stride` bytes, `components` bytes per pixel (the
+    alpha channel included), colors premultiplied by alpha if `alpha` is True.
+    """
+
+    page_index: int
+    width: int
+    height: int
+    components: int
+    alpha: bool
+    stride: int
+    dpi: int
+    samples: bytes
+
+    def to_numpy(self):
+        """Return the samples as a numpy array of shape (height, width, components), numpy is required."""
+        try:
+            import numpy
+        except ImportError as e:
+            raise ImportError("numpy is required to convert a raster to array") from e
+        array = numpy.frombuffer(self.samples, dtype=numpy.uint8)
+        array = array.reshape(self.height, self.stride)[
+            :, : self.width * self.components
+        ]
+        return array.reshape(self.height, self.width, self.components)
+
+    def to_pil(self):
+        """Return the raster as a Pillow image (straight alpha), None if Pillow has no matching mode."""
+        return to_pil_image(
+            self.samples,
+            self.width,
+            self.height,
+            self.components - int(self.alpha),
+            self.alpha,
+            self.stride,
+        )
+
+
+@dataclasses.dataclass(frozen=True)
+class _RasterMessage(object):
+    # sent by a worker instead of the raster itself, the samples are in the shared memory slot of the payload
+    page_index: int
+    payload: Payload | None = None
+    width: int = 0
+    height: int = 0
+    components: int = 0
+    stride: int = 0
+    # errors of MuPDF cannot be pickled, their messages are sent instead
+    error: str | None = None
+
+
+def render_rasters_task(
+    ctx: TaskContext,
+    transport: PayloadSender,
+    dpi: int,
+    alpha: bool,
+    rotation: int,
+    colorspace: str,
+    annots: bool,
+):
+    # pull batches of (input_file, page_index) and put the rasters into the shared memory slots
+    documents = _DocumentCache(OPEN_DOCUMENTS_PER_WORKER)
+    try:
+        for batch in iter_batches(ctx):
+            for input_file, page_index in batch:
+                if check_cancel_event(ctx):
+                    return
+                try:
+                    display_list, _ = _load_display_list(
+                        documents.get(input_file), page_index, rotation, annots
+                    )
+                    pixmap = rasterize(display_list, dpi, alpha, colorspace)
+                    del display_list
+                    samples = pixmap.samples_mv
+                except Exception as e:
+                    ctx.write_output(
+                        _RasterMessage(page_index=page_index, error=str(e)), block=True
+                    )
+                    continue
+                payload = transport.send(
+                    samples, is_cancelled=lambda: check_cancel_event(ctx)
+                )
+                if payload is None:
+                    return
+                ctx.write_output(
+                    _RasterMessage(
+                        page_index=page_index,
+                        payload=payload,
+                        width=pixmap.width,
+                        height=pixmap.height,
+                        components=pixmap.n,
+                        stride=pixmap.stride,
+                    ),
+                    block=True,
+                )
+                del samples, pixmap
+    finally:
+        documents.close()
+        TOOLS.store_shrink(100)
+
+
+def _slot_size(page_rect: pymupdf.Rect, dpi: int, alpha: bool, colorspace: str) -> int:
+    # one more pixel in each direction, the raster of a rotated page may be rounded differently
+    irect = _pixel_rect(page_rect, dpi)
+    components = _colorspace(colorspace).n + int(alpha)
+    return (irect.width + 1) * (irect.height + 1) * components
+
+
+def iter_page_rasters(
+    input_file: str | Path,
+    page_ranges: str = ALL_PAGES,
+    dpi: int = DEFAULT_DPI,
+    alpha: bool = DEFAULT_ALPHA,
+    rotation: int = DEFAULT_ROTATION,
+    colorspace: str = DEFAULT_COLORSPACE,
+    annots: bool = DEFAULT_ANNOTS,
+    worker_count: int = FALLBACK_WORKER_COUNT,
+    max_inflight: int | None = None,
+    as_array: bool = False,
+) -> Generator[tuple[int, Any], None, None]:
+    """
+    Rasterize the selected pages of the document in the worker pool, yield `(page_index, raster)` in the order the
+    pages are finished. The raster is a `PageRaster`, or a numpy array if `as_array` is True.
+
+    `worker_count` 0 chooses the number of workers by the available memory. `max_inflight` caps the number of rasters
+    waiting for the consumer (and the shared memory held for them), 2 per worker by default. A page which fails to
+    render raises RuntimeError, the other pages are cancelled.
+    """
+    if not (MIN_DPI <= dpi <= MAX_DPI):
+        raise ValueError(f"dpi should be in range {MIN_DPI} to {MAX_DPI}")
+    input_file = Path(input_file).absolute().as_posix()
+    document = pymupdf.open(input_file)
+    try:
+        page_indexes = list(PageIterator(page_ranges, document).page_indexes())
+        largest_page_rect = _largest_page_rect(document, page_indexes)
+    finally:
+        close_safely(document)
+    if not page_indexes or largest_page_rect is None:
+        return
+
+    slot_size = _slot_size(largest_page_rect, dpi, alpha, colorspace)
+    if worker_count == WORKER_COUNT_AUTO:
+        worker_count = fit_worker_count(
+            WORKER_BASE_MEMORY + slot_size * RASTER_MEMORY_FACTOR,
+            cpu_count(FALLBACK_WORKER_COUNT),
+        )
+    worker_count = max(worker_count, FALLBACK_WORKER_COUNT)
+    if not max_inflight or max_inflight <= 0:
+        max_inflight = worker_count * DEFAULT_INFLIGHT_PER_WORKER
+
+    workloads = [(input_file, page_index) for page_index in page_indexes]
+    batches = split_into_batches(
+        workloads, suggest_batch_size(len(workloads), worker_count)
+    )
+    yield from _iter_rasters(
+        batches,
+        slot_count=max_inflight,
+        slot_size=slot_size,
+        dpi=dpi,
+        alpha=alpha,
+        rotation=rotation,
+        colorspace=colorspace,
+        annots=annots,
+        worker_count=worker_count,
+        as_array=as_array,
+    )
+
+
+def _iter_rasters(
+    batches: list,
+    slot_count: int,
+    slot_size: int,
+    dpi: int,
+    alpha: bool,
+    rotation: int,
+    colorspace: str,
+    annots: bool,
+    worker_count: int,
+    as_array: bool,
+) -> Generator[tuple[int, Any], None, None]:
+    with get_worker_pool() as manager, PayloadTransport.create(
+        manager, slot_count, slot_size, inline_limit=0
+    ) as transport:
+        scopes = Scopes(
+            input_queue=Scope.Session,
+            output_queue=Scope.Session,
+            cancel_event=Scope.Session,
+            output_queue_lock=Scope.Session,
+        )
+        session = dispatch_batches(
+            manager,
+            "render-rasters-task-",
+            partial(
+                render_rasters_task,
+                transport=transport.sender,
+                dpi=dpi,
+                alpha=alpha,
+                rotation=rotation,
+                colorspace=colorspace,
+                annots=annots,
+            ),
+            scopes,
+            batches,
+            worker_count,
+        )
+        finished = False
+        try:
+            for message in iter_outputs(session):
+                if message.error is not None:
+                    raise RuntimeError(
+                        f"failed to render page {message.page_index}: {message.error}"
+                    )
+                with transport.open(message.payload) as view:
+                    samples = bytes(view)
+                raster = PageRaster(
+                    page_index=message.page_index,
+                    width=message.width,
+                    height=message.height,
+                    components=message.components,
+                    alpha=alpha,
+                    stride=message.stride,
+                    dpi=dpi,
+                    samples=samples,
+                )
+                yield message.page_index, raster.to_numpy() if as_array else raster
+            finished = True
+        finally:
+            if not finished:
+                # stopped early by the consumer or by an error, workers waiting for a slot see the cancel event
+                session.cancel_all(with_cancel_event_set=True)
+            session.wait_for_all()
+        for task_name, task_result in session.results().items():
+            if not task_result.successful:
+                raise RuntimeError(f"{task_name} failed: {task_result.exception}")
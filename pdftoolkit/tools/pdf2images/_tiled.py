@@ -0,0 +1,433 @@
+"""
+Tiled rendering of pages whose raster would not fit into the memory limit.
+
+`page.get_pixmap()` builds the full raster in memory, which is gigabytes for a large page at a high DPI. Here the
+display list of the page is rasterized band by band (clip rectangles spanning the full width). Each band is streamed
+into a writer of the output file and dropped, so the peak memory is bounded by the memory limit instead of the page
+area.
+
+A band is a pixmap of whole pixel rows, the display list is drawn into it with the same transformation as the full
+page. The rasterizer of MuPDF computes the pixels along the edges of a pixmap a little differently, that's why a band
+is rendered with a margin of rows above and below it, which are cropped off. Text and vector graphics come out
+byte-identical to a full render. An image scaled by a fractional factor may differ by a few levels in some rows: MuPDF
+decodes and scales only the part of an image a pixmap covers, which shifts the sampling slightly.
+
+Only the formats which can be written row by row are supported: PNG, PNM/PAM and uncompressed TIFF (BigTIFF when the
+image exceeds 4GB).
+"""
+
+import os
+import struct
+import zlib
+from pathlib import Path
+from typing import BinaryIO
+
+import pymupdf
+
+from ._codecs import EncodeOptions, to_pil_image
+from ._constants import ImageFormat
+
+# extra rows rendered above and below a band and cropped afterward, without them the anti-aliasing along the band
+# edges differs slightly from a full render
+_BAND_MARGIN = 2
+# the suffix of the temporary file the bands are written to, until the output is complete
+_PART_SUFFIX = ".part"
+
+_COLORSPACES = {
+    "RGB": pymupdf.csRGB,
+    "GRAY": pymupdf.csGRAY,
+    "CMYK": pymupdf.csCMYK,
+}
+
+# file extension -> image format, for ImageFormat.Auto
+_STREAMABLE_EXTENSIONS = {
+    ".png": ImageFormat.PNG,
+    ".pnm": ImageFormat.PNM,
+    ".pgm": ImageFormat.PNM,
+    ".ppm": ImageFormat.PNM,
+    ".pam": ImageFormat.PNM,
+    ".tif": ImageFormat.TIFF,
+    ".tiff": ImageFormat.TIFF,
+}
+# the (color components, alpha) a PNM extension stands for, the other extensions take any
+_PNM_EXTENSION_PIXELS = {
+    ".pgm": (1, False),
+    ".ppm": (3, False),
+}
+
+
+def _colorspace(colorspace: str) -> pymupdf.Colorspace:
+    return _COLORSPACES.get(colorspace.upper(), pymupdf.csRGB)
+
+
+def _pixel_rect(page_rect: pymupdf.Rect, dpi: int) -> pymupdf.IRect:
+    zoom = dpi / 72
+    return (page_rect * pymupdf.Matrix(zoom, zoom)).irect
+
+
+def raster_size(page_rect: pymupdf.Rect, dpi: int, alpha: bool, colorspace: str) -> int:
+    """Return the number of bytes of the full raster of the page."""
+    irect = _pixel_rect(page_rect, dpi)
+    return irect.width * irect.height * (_colorspace(colorspace).n + int(alpha))
+
+
+def rasterize(
+    display_list: pymupdf.DisplayList, dpi: int, alpha: bool, colorspace: str
+) -> pymupdf.Pixmap:
+    """Rasterize the whole page at once, the same as `page.get_pixmap()` but without interpreting the page again."""
+    zoom = dpi / 72
+    pixmap = display_list.get_pixmap(
+        matrix=pymupdf.Matrix(zoom, zoom),
+        colorspace=_colorspace(colorspace),
+        alpha=alpha,
+    )
+    pixmap.set_dpi(dpi, dpi)
+    return pixmap
+
+
+class _BandWriter(object):
+    def __init__(self, file: BinaryIO):
+        self._file = file
+
+    def write_rows(self, samples, rows: int):
+        self._file.write(samples)
+
+    def close(self):
+        pass
+
+
+class _PNGWriter(_BandWriter):
+    _COLOR_TYPES = {
+        (1, False): 0,
+        (1, True): 4,
+        (3, False): 2,
+        (3, True): 6,
+    }
+
+    def __init__(
+        self,
+        file: BinaryIO,
+        width: int,
+        height: int,
+        components: int,
+        alpha: bool,
+        dpi: tuple[int, int],
+        compress_level: int,
+    ):
+        super().__init__(file)
+        color_type = self._COLOR_TYPES.get((components, alpha), None)
+        if color_type is None:
+            raise ValueError(f"PNG cannot store images with {components} components")
+        self._row_size = width * (components + int(alpha))
+        self._compressor = zlib.compressobj(compress_level)
+        file.write(b"\x89PNG\r\n\x1a\n")
+        self._write_chunk(
+            b"IHDR", struct.pack(">IIBBBBB", width, height, 8, color_type, 0, 0, 0)
+        )
+        # pixels per meter
+        self._write_chunk(
+            b"pHYs",
+            struct.pack(">IIB", round(dpi[0] / 0.0254), round(dpi[1] / 0.0254), 1),
+        )
+
+    def _write_chunk(self, chunk_type: bytes, data: bytes):
+        self._file.write(struct.pack(">I", len(data)))
+        self._file.write(chunk_type)
+        self._file.write(data)
+        self._file.write(struct.pack(">I", zlib.crc32(data, zlib.crc32(chunk_type))))
+
+    def write_rows(self, samples, rows: int):
+        samples = memoryview(samples)
+        compressed = []
+        for row in range(rows):
+            # filter type 0 (none) for each row
+            compressed.append(self._compressor.compress(b"\x00"))
+            compressed.append(
+                self._compressor.compress(
+                    samples[row * self._row_size : (row + 1) * self._row_size]
+                )
+            )
+        data = b"".join(compressed)
+        if data:
+            self._write_chunk(b"IDAT", data)
+
+    def close(self):
+        data = self._compressor.flush()
+        if data:
+            self._write_chunk(b"IDAT", data)
+        self._write_chunk(b"IEND", b"")
+
+
+class _PNMWriter(_BandWriter):
+    _TUPLE_TYPES = {
+        (1, False): "GRAYSCALE",
+        (1, True): "GRAYSCALE_ALPHA",
+        (3, False): "RGB",
+        (3, True): "RGB_ALPHA",
+        (4, False): "CMYK",
+        (4, True): "CMYK_ALPHA",
+    }
+
+    def __init__(
+        self, file: BinaryIO, width: int, height: int, components: int, alpha: bool
+    ):
+        super().__init__(file)
+        if not alpha and components in (1, 3):
+            magic = "P5" if components == 1 else "P6"
+            header = f"{magic}\n{width} {height}\n255\n"
+        else:
+            # like MuPDF, write a PAM file for alpha and CMYK
+            tuple_type = self._TUPLE_TYPES[(components, alpha)]
+            header = (
+                f"P7\nWIDTH {width}\nHEIGHT {height}\nDEPTH {components + int(alpha)}\n"
+                f"MAXVAL 255\nTUPLTYPE {tuple_type}\nENDHDR\n"
+            )
+        file.write(header.encode("ascii"))
+
+
+class _TIFFWriter(_BandWriter):
+    # the strips are written first, the IFD is appended at the end, when the offsets of the strips are known
+    _SHORT = 3
+    _LONG = 4
+    _RATIONAL = 5
+    _LONG8 = 16
+    _TYPE_FORMATS = {_SHORT: "H", _LONG: "I", _RATIONAL: "II", _LONG8: "Q"}
+    _PHOTOMETRICS = {1: 1, 3: 2, 4: 5}
+    _CLASSIC_LIMIT = 2**32 - 2**20
+
+    def __init__(
+        self,
+        file: BinaryIO,
+        width: int,
+        height: int,
+        components: int,
+        alpha: bool,
+        dpi: tuple[int, int],
+    ):
+        super().__init__(file)
+        self._width = width
+        self._height = height
+        self._components = components
+        self._alpha = alpha
+        self._dpi = dpi
+        self._big = width * height * (components + int(alpha)) > self._CLASSIC_LIMIT
+        self._strip_offsets = []
+        self._strip_byte_counts = []
+        self._rows_per_strip = 0
+        if self._big:
+            file.write(b"II+\x00" + struct.pack("<HHQ", 8, 0, 0))
+        else:
+            file.write(b"II*\x00" + struct.pack("<I", 0))
+
+    def write_rows(self, samples, rows: int):
+        self._rows_per_strip = self._rows_per_strip or rows
+        self._strip_offsets.append(self._file.tell())
+        self._strip_byte_counts.append(memoryview(samples).nbytes)
+        self._file.write(samples)
+
+    def close(self):
+        offset_type = self._LONG8 if self._big else self._LONG
+        samples_per_pixel = self._components + int(self._alpha)
+        entries = [
+            (256, self._LONG, [self._width]),
+            (257, self._LONG, [self._height]),
+            (258, self._SHORT, [8] * samples_per_pixel),
+            # no compression
+            (259, self._SHORT, [1]),
+            (262, self._SHORT, [self._PHOTOMETRICS[self._components]]),
+            (273, offset_type, self._strip_offsets),
+            (277, self._SHORT, [samples_per_pixel]),
+            (278, self._LONG, [self._rows_per_strip or self._height]),
+            (279, offset_type, self._strip_byte_counts),
+            (282, self._RATIONAL, [self._dpi[0], 1]),
+            (283, self._RATIONAL, [self._dpi[1], 1]),
+            (284, self._SHORT, [1]),
+            # inch
+            (296, self._SHORT, [2]),
+        ]
+        if self._alpha:
+            # unassociated alpha
+            entries.append((338, self._SHORT, [2]))
+        self._write_ifd(entries)
+
+    def _write_ifd(self, entries: list[tuple[int, int, list[int]]]):
+        if self._big:
+            count_format, entry_format, next_format, inline_size = "<Q", "<HHQ", "<Q", 8
+        else:
+            count_format, entry_format, next_format, inline_size = "<H", "<HHI", "<I", 4
+        if self._file.tell() % 2:
+            self._file.write(b"\x00")
+        ifd_offset = self._file.tell()
+        entry_size = struct.calcsize(entry_format) + inline_size
+        external_offset = (
+            ifd_offset
+            + struct.calcsize(count_format)
+            + len(entries) * entry_size
+            + struct.calcsize(next_format)
+        )
+        ifd = [struct.pack(count_format, len(entries))]
+        external = []
+        for tag, value_type, values in entries:
+            value_format = self._TYPE_FORMATS[value_type]
+            count = len(values) // len(value_format)
+            data = struct.pack(f"<{len(values)}{value_format[0]}", *values)
+            ifd.append(struct.pack(entry_format, tag, value_type, count))
+            if len(data) <= inline_size:
+                ifd.append(data.ljust(inline_size, b"\x00"))
+            else:
+                ifd.append(struct.pack("<Q" if self._big else "<I", external_offset))
+                external.append(data)
+                external_offset += len(data)
+        ifd.append(struct.pack(next_format, 0))
+        self._file.write(b"".join(ifd))
+        self._file.write(b"".join(external))
+        # point the header to the IFD
+        self._file.seek(8 if self._big else 4)
+        self._file.write(struct.pack("<Q" if self._big else "<I", ifd_offset))
+
+
+def _streamable_format(output_filepath: Path, options: EncodeOptions) -> ImageFormat:
+    image_format = options.image_format
+    if image_format == ImageFormat.Auto:
+        image_format = _STREAMABLE_EXTENSIONS.get(output_filepath.suffix.lower(), None)
+    if image_format not in (ImageFormat.PNG, ImageFormat.PNM, ImageFormat.TIFF):
+        raise ValueError(
+            f"cannot write {output_filepath.name} in tiles, only PNG, PNM and TIFF are supported in tiled mode"
+        )
+    return image_format
+
+
+def _check_pnm_extension(output_filepath: Path, components: int, alpha: bool):
+    # a PNM file is a graymap or a pixmap by its header, which must agree with its extension
+    expected = _PNM_EXTENSION_PIXELS.get(output_filepath.suffix.lower(), None)
+    if expected is not None and expected != (components, alpha):
+        kind = "gray" if expected[0] == 1 else "RGB"
+        raise ValueError(
+            f"cannot write {output_filepath.name}, a {output_filepath.suffix} file stores {kind} images without alpha"
+        )
+
+
+def _open_band_writer(
+    file: BinaryIO,
+    image_format: ImageFormat,
+    options: EncodeOptions,
+    width: int,
+    height: int,
+    components: int,
+    alpha: bool,
+    dpi: tuple[int, int],
+) -> _BandWriter:
+    if image_format == ImageFormat.PNG:
+        return _PNGWriter(
+            file, width, height, components, alpha, dpi, options.png_compress_level
+        )
+    if image_format == ImageFormat.PNM:
+        return _PNMWriter(file, width, height, components, alpha)
+    return _TIFFWriter(file, width, height, components, alpha, dpi)
+
+
+def _render_band(
+    display_list: pymupdf.DisplayList,
+    matrix: pymupdf.Matrix,
+    colorspace: pymupdf.Colorspace,
+    alpha: bool,
+    band_rect: pymupdf.IRect,
+) -> pymupdf.Pixmap:
+    # what page.get_pixmap() does, only into a pixmap of the rows of the band (pymupdf.Pixmap() would create it with
+    # other separations, which renders differently)
+    mupdf = pymupdf.mupdf
+    pixmap = mupdf.fz_new_pixmap_with_bbox(
+        colorspace.this, mupdf.FzIrect(*band_rect), mupdf.FzSeparations(), alpha
+    )
+    # the background of a full render: transparent, or white
+    if alpha:
+        mupdf.fz_clear_pixmap(pixmap)
+    else:
+        mupdf.fz_clear_pixmap_with_value(pixmap, 0xFF)
+    device = mupdf.fz_new_draw_device(mupdf.FzMatrix(*matrix), pixmap)
+    # only what is entirely outside the band is skipped, one pixel around it is kept to be safe
+    area = (pymupdf.Rect(band_rect) + (-1, -1, 1, 1)) * ~matrix
+    mupdf.fz_run_display_list(
+        display_list.this,
+        device,
+        mupdf.FzMatrix(),
+        mupdf.FzRect(*area),
+        mupdf.FzCookie(),
+    )
+    mupdf.fz_close_device(device)
+    return pymupdf.Pixmap("raw", pixmap)
+
+
+def render_page_tiled(
+    display_list: pymupdf.DisplayList,
+    page_rect: pymupdf.Rect,
+    output_filepath: Path,
+    dpi: int,
+    alpha: bool,
+    colorspace: str,
+    options: EncodeOptions,
+    memory_limit: int,
+):
+    """
+    Render the page band by band into the output file. The bands are sized so that a band (and its converted copy
+    when the colors have to be un-premultiplied) fits into `memory_limit` bytes. The bands are written to a temporary
+    file next to the output, which replaces it once complete, so that a failure never leaves a truncated image behind
+    (which would be skipped as existing by the next run).
+    """
+    image_format = _streamable_format(output_filepath, options)
+    colorspace = _colorspace(colorspace)
+    components = colorspace.n
+    if alpha and components not in (1, 3):
+        raise ValueError("alpha is not supported for CMYK in tiled mode")
+    if image_format == ImageFormat.PNM:
+        _check_pnm_extension(output_filepath, components, alpha)
+
+    zoom = dpi / 72
+    matrix = pymupdf.Matrix(zoom, zoom)
+    irect = _pixel_rect(page_rect, dpi)
+    width, height = irect.width, irect.height
+    stride = width * (components + int(alpha))
+    band_rows = max(memory_limit // (2 * stride) - 2 * _BAND_MARGIN, 1)
+
+    part_filepath = output_filepath.with_name(output_filepath.name + _PART_SUFFIX)
+    try:
+        with open(part_filepath, "wb") as file:
+            writer = _open_band_writer(
+                file,
+                image_format,
+                options,
+                width,
+                height,
+                components,
+                alpha,
+                (dpi, dpi),
+            )
+            y = irect.y0
+            while y < irect.y1:
+                y1 = min(y + band_rows, irect.y1)
+                top = max(y - _BAND_MARGIN, irect.y0)
+                bottom = min(y1 + _BAND_MARGIN, irect.y1)
+                band = _render_band(
+                    display_list,
+                    matrix,
+                    colorspace,
+                    alpha,
+                    pymupdf.IRect(irect.x0, top, irect.x1, bottom),
+                )
+                rows = y1 - y
+                samples = band.samples_mv[
+                    (y - top) * band.stride : (y1 - top) * band.stride
+                ]
+                if alpha:
+                    samples = to_pil_image(
+                        samples, width, rows, components, alpha, band.stride
+                    ).tobytes()
+                writer.write_rows(samples, rows)
+                del samples, band
+                y = y1
+            writer.close()
+    except BaseException:
+        if part_filepath.exists():
+            part_filepath.unlink()
+        raise
+    os.replace(part_filepath, output_filepath)
@@ -1,31 +1,49 @@
 import time
 from pathlib import Path
 
-import pymupdf
 from pyguiadapter.exceptions import ParameterError
 from pyguiadapter.extend_types import file_list_t, file_t
 
-from ...utils import pprint
+from ..commons.constants import SaveProfile
+from ..commons.reporter import pprint, report
+from ...utils import close_safely
 
 
-def pdfmerger(pdf_files: file_list_t, output_file: file_t = "merged.pdf"):
+def pdfmerger(
+    pdf_files: file_list_t,
+    output_file: file_t = "merged.pdf",
+    # the pages are copied as they are, compressing their streams can take longer than merging them
+    save_profile: SaveProfile = SaveProfile.Fast,
+):
     if not pdf_files:
         raise ParameterError("pdf_files", "No PDF files provided")
 
     if not output_file:
         raise ParameterError("output_file", "No output file provided")
 
+    # imported when the tool runs, not when it is added to the GUI
+    import pymupdf
+    from ..commons.save_profiles import save_document
+
     start_time = time.time_ns()
 
     merged_pdf = pymupdf.open()
-
-    for pdf_file in pdf_files:
-        input_pdf = pymupdf.open(pdf_file)
-        merged_pdf.insert_pdf(input_pdf, 0, 200, show_progress=True)
-        input_pdf.close()
-    merged_pdf.save(output_file)
-    merged_pdf.close()
+    try:
+        for pdf_file in pdf_files:
+            input_pdf = pymupdf.open(pdf_file)
+            try:
+                # all the pages of each file
+                merged_pdf.insert_pdf(input_pdf)
+                report("file", input_file=pdf_file, page_count=input_pdf.page_count)
+            finally:
+                close_safely(input_pdf)
+        save_document(merged_pdf, output_file, save_profile)
+        page_count = merged_pdf.page_count
+    finally:
+        close_safely(merged_pdf)
+    time_elapsed = (time.time_ns() - start_time) / 1e9
     pprint(
         f"Merged PDF saved to: {Path(output_file).absolute().as_posix()}", verbose=True
     )
-    pprint(f"Time elapsed: {(time.time_ns() - start_time)/1e9} seconds", verbose=True)
+    pprint(f"Time elapsed: {time_elapsed} seconds", verbose=True)
+    return {"elapsed_seconds": time_elapsed, "page_count": page_count}
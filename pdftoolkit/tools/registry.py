@@ -0,0 +1,37 @@
+"""
+The tools of the application, described by lightweight descriptors.
+
+A descriptor only names the package of a tool. The package is imported when the tool is added to the GUI, and the
+functions it adds import their implementation (pymupdf, py_multitasking...) when they are run for the first time, so
+the application starts without loading them.
+"""
+
+import dataclasses
+import importlib
+from typing import TYPE_CHECKING, Iterable
+
+if TYPE_CHECKING:
+    from pyguiadapter.adapter import GUIAdapter
+
+
+@dataclasses.dataclass(frozen=True)
+class ToolDescriptor(object):
+    name: str
+    # the package of the tool, it provides use(adapter)
+    package: str
+
+    def use(self, adapter: "GUIAdapter"):
+        importlib.import_module(self.package).use(adapter)
+
+
+TOOLS = (
+    ToolDescriptor("pdf2images", "pdftoolkit.tools.pdf2images"),
+    ToolDescriptor("images2pdf", "pdftoolkit.tools.images2pdf"),
+    ToolDescriptor("pdfmerger", "pdftoolkit.tools.pdfmerger"),
+)
+
+
+def use_tools(adapter: "GUIAdapter", tools: Iterable[ToolDescriptor] = TOOLS):
+    """Add the tools to the GUI, in order."""
+    for tool in tools:
+        tool.use(adapter)
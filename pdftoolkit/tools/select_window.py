@@ -26,7 +26,7 @@ from pyguiadapter.windows.fnselect import FnSelectWindowConfig, FnSelectWindow
 from .commons.winconf import DEFAULT_WINDOW_SIZE, DEFAULT_DOCUMENT_DOCK_WIDTH
 from ..assets import license_file, locales_file
 from ..configuration import (
-    GlobalConfig,
+    global_config,
     DEFAULT_LANGUAGE,
     get_theme_safely,
     get_language_map,
@@ -119,8 +119,9 @@ def on_action_change_language(window: BaseWindow, action: Action):
         )
         return
     i18n.set("locale", lang_code)
-    GlobalConfig.language = lang_code
-    GlobalConfig.save()
+    config = global_config()
+    config.language = lang_code
+    config.save()
     show_info_message(
         window,
         title=app_t("success_dlg_title"),
@@ -132,13 +133,15 @@ def on_action_change_theme(window: BaseWindow, action: Action):
     unused(window)
     theme, _ = get_theme_safely(cast(str, action.data))
     qdarktheme.setup_theme(theme)
-    GlobalConfig.theme = theme
-    GlobalConfig.save()
+    config = global_config()
+    config.theme = theme
+    config.save()
 
 
 def _create_language_actions() -> List[Action]:
-    lang_map = get_language_map(GlobalConfig.language_map)
-    cur_lang = GlobalConfig.language or DEFAULT_LANGUAGE
+    config = global_config()
+    lang_map = get_language_map(config.language_map)
+    cur_lang = config.language or DEFAULT_LANGUAGE
     actions = []
     for lang_code, lang_name in lang_map.items():
         action = Action(
@@ -152,69 +155,53 @@ def _create_language_actions() -> List[Action]:
     return actions
 
 
-ACTION_LICENSE = Action(
-    text=_menu_t("action_license"),
-    icon="fa.file-text",
-    on_triggered=on_action_license,
-)
-ACTION_ABOUT = Action(
-    text=_menu_t("action_about"),
-    icon="fa.info-circle",
-    on_triggered=on_action_about,
-)
-ACTION_HOMEPAGE = Action(
-    text=_menu_t("action_homepage"),
-    icon="fa.home",
-    on_triggered=on_action_homepage,
-)
-
-LANGUAGE_ACTIONS = _create_language_actions()
-
-
-_current_theme, _ = get_theme_safely(GlobalConfig.theme)
-
-ACTION_THEME_AUTO = Action(
-    text=_menu_t(f"action_theme_auto"),
-    checkable=True,
-    checked=(_current_theme == "auto"),
-    on_triggered=on_action_change_theme,
-    data="auto",
-)
-ACTION_THEME_LIGHT = Action(
-    text=_menu_t("action_theme_light"),
-    checkable=True,
-    checked=(_current_theme == "light"),
-    on_triggered=on_action_change_theme,
-    data="light",
-)
-ACTION_THEME_DARK = Action(
-    text=_menu_t("action_theme_dark"),
-    checkable=True,
-    checked=(_current_theme == "dark"),
-    on_triggered=on_action_change_theme,
-    data="dark",
-)
-
-MENU_HELP = Menu(
-    title=_menu_t("menu_help"),
-    actions=[ACTION_ABOUT, Separator(), ACTION_HOMEPAGE, ACTION_LICENSE],
-)
-
-MENU_LANGUAGE = Menu(
-    title=_menu_t("menu_language"),
-    actions=LANGUAGE_ACTIONS,
-    exclusive=True,
-)
-
-MENU_THEME = Menu(
-    title=_menu_t("menu_theme"),
-    actions=[
-        ACTION_THEME_AUTO,
-        ACTION_THEME_LIGHT,
-        ACTION_THEME_DARK,
-    ],
-    exclusive=True,
-)
+def _create_theme_actions() -> List[Action]:
+    current_theme, _ = get_theme_safely(global_config().theme)
+    actions = []
+    for theme in ("auto", "light", "dark"):
+        action = Action(
+            text=_menu_t(f"action_theme_{theme}"),
+            checkable=True,
+            checked=(current_theme == theme),
+            on_triggered=on_action_change_theme,
+            data=theme,
+        )
+        actions.append(action)
+    return actions
 
 
-WINDOW_MENUS = (MENU_LANGUAGE, MENU_THEME, MENU_HELP)
+def create_window_menus() -> tuple[Menu, ...]:
+    """
+    Create the menus of the select window. They reflect the current configuration, so they are created when the window
+    is about to be shown instead of when this module is imported.
+    """
+    action_license = Action(
+        text=_menu_t("action_license"),
+        icon="fa.file-text",
+        on_triggered=on_action_license,
+    )
+    action_about = Action(
+        text=_menu_t("action_about"),
+        icon="fa.info-circle",
+        on_triggered=on_action_about,
+    )
+    action_homepage = Action(
+        text=_menu_t("action_homepage"),
+        icon="fa.home",
+        on_triggered=on_action_homepage,
+    )
+    menu_help = Menu(
+        title=_menu_t("menu_help"),
+        actions=[action_about, Separator(), action_homepage, action_license],
+    )
+    menu_language = Menu(
+        title=_menu_t("menu_language"),
+        actions=_create_language_actions(),
+        exclusive=True,
+    )
+    menu_theme = Menu(
+        title=_menu_t("menu_theme"),
+        actions=_create_theme_actions(),
+        exclusive=True,
+    )
+    return menu_language, menu_theme, menu_help
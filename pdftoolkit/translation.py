@@ -10,17 +10,19 @@ from typing import Optional
 import i18n
 
 from .assets import locales_dir
-from .configuration import DEFAULT_LANGUAGE, GlobalConfig
+from .configuration import DEFAULT_LANGUAGE, global_config
 
 
 def _init_i18n():
     i18n.load_path.append(locales_dir().as_posix())
     i18n.set("fallback", DEFAULT_LANGUAGE)
     i18n.set("filename_format", "{namespace}.{locale}.{format}")
+    # the locale files are json, python-i18n defaults to yml when PyYAML is installed
+    i18n.set("file_format", "json")
     i18n.set("enable_memoization", True)
     # i18n.set("error_on_missing_translation", True)
     i18n.set("skip_locale_root_data", True)  # IMPORTANT
-    i18n.set("locale", GlobalConfig.language)
+    i18n.set("locale", global_config().language)
 
 
 _init_i18n()
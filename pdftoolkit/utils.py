@@ -14,8 +14,6 @@ from os import PathLike
 from pathlib import Path
 from typing import Any, Type, Sequence, Optional, Generator
 
-from pyguiadapter.adapter import ucontext, uoutput
-
 from .assets import assets_file
 
 
@@ -236,6 +234,9 @@ def pprint(
     """
     if not verbose:
         return
+    # imported here, pyguiadapter.adapter starts Qt and the headless tools do not need it
+    from pyguiadapter.adapter import ucontext, uoutput
+
     if ucontext.get_current_window() is None:
         print(*args, sep=sep, end=end)
         return